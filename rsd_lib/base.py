@@ -0,0 +1,419 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import threading
+import weakref
+
+import six
+from sushy import exceptions
+from sushy.resources import base
+from sushy import utils
+
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+# Note: The $expand query supported by the service behind a connector. It
+# is registered by the service root object and shared by every resource
+# created from the same connector.
+_EXPAND_QUERIES = weakref.WeakKeyDictionary()
+
+# Note: The conditional refresh counters of the resources created from a
+# connector.
+_REFRESH_STATS = weakref.WeakKeyDictionary()
+_REFRESH_STATS_LOCK = threading.Lock()
+
+
+def set_expand_query(connector, expand_query):
+    """Record the $expand query supported by the service of a connector
+
+    :param connector: A Connector instance
+    :param expand_query: The query string used to expand collection
+        members, or None when the service doesn't support it
+    """
+    _EXPAND_QUERIES[connector] = expand_query
+
+
+def get_expand_query(connector):
+    """Return the $expand query supported by the service of a connector
+
+    :param connector: A Connector instance
+    :returns: The query string, or None when the service doesn't advertise
+        $expand support or it is not known yet
+    """
+    return _EXPAND_QUERIES.get(connector)
+
+
+class RefreshStats(object):
+    """Counters of the conditional refreshes issued through a connector"""
+
+    def __init__(self):
+        self.hits = 0
+        """Number of refreshes answered with 304 Not Modified"""
+
+        self.misses = 0
+        """Number of refreshes which downloaded the resource again"""
+
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self):
+        """The ratio of refreshes answered with 304 Not Modified"""
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+def get_refresh_stats(connector):
+    """Return the conditional refresh counters of a connector
+
+    :param connector: A Connector instance
+    :returns: A RefreshStats instance
+    """
+    with _REFRESH_STATS_LOCK:
+        stats = _REFRESH_STATS.get(connector)
+        if stats is None:
+            stats = _REFRESH_STATS[connector] = RefreshStats()
+        return stats
+
+
+class LazyResourceList(object):
+    """A read only list of linked resources loaded on demand
+
+    Indexing the list loads the requested resources only. Iterating over
+    it loads all the missing resources at once using a bounded pool of
+    threads. Loaded resources are kept, so each resource is fetched at
+    most once.
+    """
+
+    def __init__(self, identities, loader,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """A class representing a list of linked resources
+
+        :param identities: The identities of the resources
+        :param loader: A callable returning the resource of an identity
+        :param concurrency: The maximum number of resources loaded at once
+        """
+        self.identities = list(identities)
+        self._loader = loader
+        self._concurrency = concurrency
+        self._resources = {}
+
+    def __len__(self):
+        return len(self.identities)
+
+    def _load(self, indexes):
+        missing = [i for i in indexes if i not in self._resources]
+        if len(missing) == 1:
+            self._resources[missing[0]] = self._loader(
+                self.identities[missing[0]])
+        elif missing:
+            for index, resource, error in rsd_lib_utils.iter_concurrently(
+                    lambda i: self._loader(self.identities[i]), missing,
+                    self._concurrency):
+                if error is not None:
+                    raise error
+                self._resources[index] = resource
+        return [self._resources[i] for i in indexes]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._load(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('list index out of range')
+        return self._load([index])[0]
+
+    def __iter__(self):
+        return iter(self._load(range(len(self))))
+
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, self.identities)
+
+
+class _PreloadedResponse(object):
+
+    status_code = 200
+
+    def __init__(self, json_doc):
+        self._json_doc = json_doc
+        self.headers = {}
+
+    def json(self):
+        return self._json_doc
+
+
+class _PreloadedConnector(object):
+    """Connector answering the first GET of a resource from memory
+
+    Every other request is delegated to the wrapped connector.
+    """
+
+    def __init__(self, connector, path, json_doc):
+        self._connector = connector
+        self._path = path
+        self._json_doc = json_doc
+
+    def get(self, path='', *args, **kwargs):
+        if self._json_doc is not None and path == self._path:
+            json_doc, self._json_doc = self._json_doc, None
+            return _PreloadedResponse(json_doc)
+        return self._connector.get(path, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._connector, name)
+
+
+class ResourceBase(base.ResourceBase):
+    """Base of the rsd_lib resources supporting conditional refresh
+
+    The ETag of the resource is remembered and sent back as If-None-Match
+    on refresh. When the service answers 304 Not Modified the attributes
+    are not parsed again and the cached sub-resources are kept.
+    """
+
+    _etag = None
+
+    _preloaded_json = None
+    """A representation of the resource used instead of the first GET"""
+
+    def _get_json(self, headers=None):
+        if self._preloaded_json is not None:
+            json_doc, self._preloaded_json = self._preloaded_json, None
+            return json_doc.get('@odata.etag'), json_doc
+
+        reader = getattr(self, '_reader', None)
+        if reader is not None and type(reader) is not base.JsonDataReader:
+            # Note: Custom readers don't expose the response, they don't
+            # take part in conditional refreshes.
+            return None, reader.get_json()
+
+        if headers:
+            response = self._conn.get(path=self._path, headers=headers)
+        else:
+            response = self._conn.get(path=self._path)
+        if getattr(response, 'status_code', None) == 304:
+            return None, None
+
+        json_doc = response.json()
+        etag = (getattr(response, 'headers', None) or {}).get('ETag')
+        if etag is None and isinstance(json_doc, dict):
+            etag = json_doc.get('@odata.etag')
+        if not isinstance(etag, six.string_types):
+            etag = None
+        return etag, json_doc
+
+    def refresh(self, force=True):
+        """Refresh the resource
+
+        The resource is fetched with a conditional GET when its ETag is
+        known, if it has not changed on the service the attributes are not
+        parsed again and neither the resource nor its sub-resources are
+        refreshed.
+
+        :param force: if set to False, will only refresh if the resource is
+            marked as stale, otherwise neither it nor its subresources will
+            be refreshed.
+        :raises: ResourceNotFoundError
+        :raises: ConnectionError
+        :raises: HTTPError
+        """
+        if not self._is_stale and not force:
+            return
+
+        headers = None
+        if self._etag is not None and self._json is not None:
+            headers = {'If-None-Match': self._etag}
+
+        etag, json_doc = self._get_json(headers)
+        if headers is not None:
+            get_refresh_stats(self._conn).record(json_doc is None)
+
+        if json_doc is None:
+            LOG.debug('%(type)s %(path)s is not modified',
+                      {'type': self.__class__.__name__, 'path': self._path})
+            self._is_stale = False
+            return
+
+        self._etag = etag
+        self._json = json_doc
+        LOG.debug('Received representation of %(type)s %(path)s: %(json)s',
+                  {'type': self.__class__.__name__,
+                   'path': self._path, 'json': self._json})
+        self._parse_attributes()
+        self._do_refresh(force)
+
+        # Mark it fresh
+        self._is_stale = False
+
+
+class ResourceCollectionBase(ResourceBase, base.ResourceCollectionBase):
+
+    def _build_member(self, json_doc):
+        """Create a ``_resource_type`` object from an inline representation
+
+        No request is issued, the object is parsed from ``json_doc`` and is
+        then bound to the collection connector for later refreshes.
+
+        :param json_doc: The JSON representation of the member
+        :returns: The ``_resource_type`` object
+        """
+        identity = json_doc['@odata.id']
+        member = self._resource_type(
+            _PreloadedConnector(self._conn, identity, json_doc), identity,
+            redfish_version=self.redfish_version)
+        member._conn = self._conn
+        reader = getattr(member, '_reader', None)
+        if reader is not None:
+            reader.set_connection(self._conn, identity)
+        rsd_lib_cache.add(self._conn, member, self._resource_type)
+        return member
+
+    def get_member(self, identity):
+        """Given the identity return a ``_resource_type`` object
+
+        The object is shared with the other users of the resource cache
+        registered for the connector, if any.
+
+        :param identity: The identity of the ``_resource_type``
+        :returns: The ``_resource_type`` object
+        :raises: ResourceNotFoundError
+        """
+        return rsd_lib_cache.get_resource(
+            self._conn, self._resource_type, identity,
+            redfish_version=self.redfish_version)
+
+    def _load_expanded_members(self):
+        """Load all the members with a single $expand request
+
+        :returns: A list of ``_resource_type`` objects, or None when the
+            service can't return the members inline
+        """
+        expand_query = get_expand_query(self._conn)
+        if expand_query is None:
+            LOG.debug('The service does not advertise $expand support, '
+                      'loading the members of %s one by one', self._path)
+            return None
+
+        try:
+            json_doc = self._conn.get(
+                path='%s?%s' % (self._path, expand_query)).json()
+        except exceptions.HTTPError as e:
+            LOG.warning('Failed to expand the members of %(path)s, loading '
+                        'them one by one: %(error)s',
+                        {'path': self._path, 'error': e})
+            return None
+
+        json_members = [m for m in json_doc.get('Members', ())
+                        if '@odata.id' in m]
+        if not any(len(m) > 1 for m in json_members):
+            return None
+
+        members = []
+        for json_member in json_members:
+            if len(json_member) > 1:
+                members.append(self._build_member(json_member))
+            else:
+                members.append(self.get_member(json_member['@odata.id']))
+        return members
+
+    def iter_members_parallel(self,
+                              concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Load the members of the collection using a bounded thread pool
+
+        Members are yielded in the order of ``members_identities``. A member
+        which fails to load doesn't abort the listing, the error is returned
+        in its place instead.
+
+        :param concurrency: The maximum number of member GETs in flight
+        :returns: A generator of ``(identity, member, error)`` tuples where
+            ``error`` is the exception raised while loading the member or
+            None
+        """
+        return rsd_lib_utils.iter_concurrently(
+            self.get_member, self.members_identities, concurrency)
+
+    def _load_members_parallel(self, concurrency):
+        members = []
+        complete = True
+        for identity, member, error in self.iter_members_parallel(
+                concurrency):
+            if error is not None:
+                LOG.warning('Failed to load member %(identity)s of '
+                            '%(path)s: %(error)s',
+                            {'identity': identity, 'path': self._path,
+                             'error': error})
+                complete = False
+            else:
+                members.append(member)
+        return members, complete
+
+    def get_members(self, concurrency=None, expand=False):
+        """Return a list of ``_resource_type`` objects present in collection
+
+        :param concurrency: When set, the members are loaded using up to
+            ``concurrency`` parallel requests. Members which fail to load are
+            logged and left out of the result, which is only cached when the
+            whole collection was loaded. Use ``iter_members_parallel`` to
+            inspect the individual errors.
+        :param expand: When True and the service advertises $expand support
+            in ProtocolFeaturesSupported, all the members are returned
+            inline by a single request. Otherwise the members are loaded
+            one request per member.
+        :returns: A list of ``_resource_type`` objects
+        """
+        if getattr(self, '_cache_get_members', None) is None:
+            members = None
+            if expand:
+                members = self._load_expanded_members()
+
+            if members is None and concurrency is not None:
+                members, complete = self._load_members_parallel(concurrency)
+                if not complete:
+                    return members
+
+            if members is not None:
+                self._cache_get_members = members
+                utils.setdefaultattr(self, utils.CACHE_ATTR_NAMES_VAR_NAME,
+                                     set()).add('_cache_get_members')
+
+        return super(ResourceCollectionBase, self).get_members()
+
+    def _do_refresh(self, force):
+        # Note: The cached members are only refreshed by cache_clear(), the
+        # list itself has to be rebuilt when the membership changed.
+        members = getattr(self, '_cache_get_members', None)
+        if members is not None:
+            cached = [rsd_lib_utils.normalize_identity(m.path)
+                      for m in members]
+            current = [rsd_lib_utils.normalize_identity(identity)
+                       for identity in self.members_identities]
+            if cached != current:
+                self._cache_get_members = None
+        super(ResourceCollectionBase, self)._do_refresh(force)
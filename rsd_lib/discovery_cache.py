@@ -0,0 +1,102 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import logging
+import threading
+import time
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+_ROOT_FIELDS = ('@odata.id', '@odata.etag', 'RedfishVersion')
+_ROOT_OEM_FIELDS = ('ApiVersion',)
+
+
+def _is_link(value):
+    return isinstance(value, dict) and '@odata.id' in value and len(value) == 1
+
+
+def summarize_root(json_doc):
+    """Keep the parts of a service root needed to discover the service
+
+    Only the Redfish version, the RSD API version, the links to the top
+    level collections and the protocol features are kept.
+
+    :param json_doc: The JSON representation of the service root
+    :returns: A dict with the same layout as the service root
+    """
+    summary = {}
+    for key, value in json_doc.items():
+        if key in _ROOT_FIELDS or _is_link(value) or (
+                key == 'ProtocolFeaturesSupported'):
+            summary[key] = value
+
+    oem = json_doc.get('Oem', {}).get('Intel_RackScale')
+    if oem is not None:
+        summary['Oem'] = {'Intel_RackScale': dict(
+            (key, value) for key, value in oem.items()
+            if key in _ROOT_OEM_FIELDS or _is_link(value))}
+    return summary
+
+
+class DiscoveryCache(object):
+    """A JSON file holding the service roots of RSD services
+
+    The entries are keyed by the base URL of the service. The file is
+    rewritten atomically, so a cache can be shared by many processes.
+    """
+
+    def __init__(self, path):
+        """A class representing a discovery cache
+
+        :param path: The path of the cache file, created on first write
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError as e:
+            LOG.warning('Ignoring corrupted discovery cache %(path)s: '
+                        '%(error)s', {'path': self.path, 'error': e})
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, base_url):
+        """Return the cached service root of a service
+
+        :param base_url: The base URL of the service
+        :returns: The summary of the service root or None
+        """
+        entry = self._load().get(base_url)
+        return entry['root'] if entry else None
+
+    def set(self, base_url, json_doc):
+        """Store the service root of a service
+
+        :param base_url: The base URL of the service
+        :param json_doc: The JSON representation of the service root
+        """
+        with self._lock:
+            entries = self._load()
+            entries[base_url] = {'root': summarize_root(json_doc),
+                                 'updated_at': time.time()}
+            rsd_lib_utils.write_json_atomically(self.path, entries)
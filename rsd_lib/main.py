@@ -13,17 +13,67 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from distutils import version
+import copy
+import importlib
+import logging
+import threading
+import weakref
 
 from sushy import connector
 from sushy.resources import base
+from sushy import utils
 
-from rsd_lib.resources import v2_1
-from rsd_lib.resources import v2_2
-from rsd_lib.resources import v2_3
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import discovery_cache as rsd_lib_discovery
 
+LOG = logging.getLogger(__name__)
 
-class RSDLib(base.ResourceBase):
+# Note: The interface of each supported RSD API version, sorted by version.
+# The package of a version is only imported when the factory selects it.
+_VERSION_MODULES = (
+    ((2, 2, 0), 'rsd_lib.resources.v2_1', 'RSDLibV2_1'),
+    ((2, 3, 0), 'rsd_lib.resources.v2_2', 'RSDLibV2_2'),
+    ((2, 4, 0), 'rsd_lib.resources.v2_3', 'RSDLibV2_3'),
+)
+
+
+def _swap_root(resource, json_doc):
+    """Parse a new representation of a service root and install it at once
+
+    The representation is parsed by a copy of the resource, without the
+    cached sub-resources which are built again when next used, then the
+    state of the copy replaces the state of the resource in one update.
+    Threads using the resource meanwhile see either the previous or the new
+    state, never a partially refreshed one.
+
+    :param resource: The service root object to update
+    :param json_doc: The new representation of the service root
+    """
+    fresh = copy.copy(resource)
+    cache_attr_names = set(getattr(resource, utils.CACHE_ATTR_NAMES_VAR_NAME,
+                                   ()))
+    setattr(fresh, utils.CACHE_ATTR_NAMES_VAR_NAME, cache_attr_names)
+    for cache_attr_name in cache_attr_names:
+        setattr(fresh, cache_attr_name, None)
+    fresh._preloaded_json = json_doc
+    fresh.refresh()
+    resource.__dict__.update(fresh.__dict__)
+
+
+def _parse_version(version):
+    """Parse a dotted version string into a tuple of integers
+
+    :param version: A version string like '2.1.0'
+    :returns: A tuple of integers, padded to three items
+    :raises: ValueError if the version string is malformed
+    """
+    parts = tuple(int(part) for part in version.split('.'))
+    if not 1 <= len(parts) <= 3:
+        raise ValueError("invalid version number '%s'" % version)
+    return parts + (0,) * (3 - len(parts))
+
+
+class RSDLib(rsd_lib_base.ResourceBase):
 
     _redfish_version = base.Field(['RedfishVersion'], required=True)
     """FabricCollection path"""
@@ -33,7 +83,8 @@ class RSDLib(base.ResourceBase):
     """RSD API version"""
 
     def __init__(self, base_url, username=None, password=None,
-                 root_prefix='/redfish/v1/', verify=True):
+                 root_prefix='/redfish/v1/', verify=True,
+                 discovery_cache=None, resource_cache=None):
         """A class representing a RootService
 
         :param base_url: The base URL to the Redfish controller. It
@@ -50,34 +101,137 @@ class RSDLib(base.ResourceBase):
             the driver will ignore verifying the SSL certificate; if it's
             a path the driver will use the specified certificate or one of
             the certificates in the directory. Defaults to True.
+        :param discovery_cache: The path of a file caching the service root
+            of the RSD services. When the service root of ``base_url`` is
+            cached no request is sent to discover the service, the cached
+            root is revalidated in a background thread instead.
+        :param resource_cache: A ResourceCache instance shared by the
+            resources loaded through the object returned by ``factory()``.
+            Resources are not cached when None, each getter call then
+            returns a new object.
         """
         self._root_prefix = root_prefix
+        self._base_url = base_url
+        self._discovery_cache = None
+        self._revalidation_thread = None
+        self._resource_cache = resource_cache
+        # Note: The objects returned by factory(), updated by the
+        # revalidation of the service root
+        self._versioned = weakref.WeakSet()
+        self._versioned_lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        cached_json = None
+        if discovery_cache is not None:
+            self._discovery_cache = rsd_lib_discovery.DiscoveryCache(
+                discovery_cache)
+            cached_json = self._discovery_cache.get(base_url)
+            self._preloaded_json = cached_json
+
         super(RSDLib, self).__init__(
             connector.Connector(base_url, username, password, verify),
             path=self._root_prefix)
 
+        if cached_json is not None:
+            self._revalidation_thread = threading.Thread(
+                target=self._revalidate, name='rsd-lib-discovery')
+            self._revalidation_thread.daemon = True
+            self._revalidation_thread.start()
+        elif self._discovery_cache is not None:
+            self._update_discovery_cache(self._json)
+
+    def _revalidate(self):
+        """Fetch the service root and update the discovery cache"""
+        try:
+            json_doc = self._conn.get(path=self._root_prefix).json()
+        except Exception as e:
+            LOG.warning('Failed to revalidate the service root of %(url)s: '
+                        '%(error)s', {'url': self._base_url, 'error': e})
+            return
+
+        summary = rsd_lib_discovery.summarize_root(json_doc)
+        if summary != rsd_lib_discovery.summarize_root(self._json):
+            LOG.info('The service root of %s changed', self._base_url)
+            try:
+                self._update_root(json_doc)
+            except Exception as e:
+                LOG.warning('Failed to apply the service root of %(url)s: '
+                            '%(error)s', {'url': self._base_url, 'error': e})
+                return
+        self._update_discovery_cache(json_doc)
+
+    def _update_root(self, json_doc):
+        """Apply a changed service root to the objects using it
+
+        This object and the objects returned by ``factory()`` parse the
+        new service root, and the cached resources are dropped. The objects
+        are never refreshed in place, each one swaps in the parsed state at
+        once as they may be used by other threads. An object which no
+        longer matches the RSD API version of the service is only marked as
+        stale, ``factory()`` has to be called again.
+
+        :param json_doc: The new representation of the service root
+        """
+        with self._update_lock:
+            previous = self._get_version_class()
+            _swap_root(self, json_doc)
+            current = self._get_version_class()
+            if self._resource_cache is not None:
+                self._resource_cache.invalidate()
+
+            with self._versioned_lock:
+                versioned = list(self._versioned)
+            for rsd in versioned:
+                if current != previous:
+                    LOG.warning('The RSD API version of %(url)s changed to '
+                                '%(version)s, call factory() again',
+                                {'url': self._base_url,
+                                 'version': self._rsd_api_version})
+                    rsd.invalidate()
+                    continue
+                _swap_root(rsd, json_doc)
+
+    def _update_discovery_cache(self, json_doc):
+        try:
+            self._discovery_cache.set(self._base_url, json_doc)
+        except (IOError, OSError) as e:
+            LOG.warning('Failed to update the discovery cache %(path)s: '
+                        '%(error)s', {'path': self._discovery_cache.path,
+                                      'error': e})
+
+    def _get_version_class(self):
+        """Return the module and class name of the RSD API version
+
+        :returns: A (module name, class name) tuple, or None when the
+            version is not supported
+        """
+        rsd_version = _parse_version(self._rsd_api_version)
+        # Note: The interface of RSD API 2.1.0 is used to interact with RSD
+        # 2.1.0 and all previous versions.
+        for upper_bound, module_name, class_name in _VERSION_MODULES:
+            if rsd_version < upper_bound:
+                return module_name, class_name
+        return None
+
     def factory(self):
         """Return different resource module according to RSD API Version
 
+        The returned object is updated when the background revalidation of
+        a cached service root finds that the service root changed.
+
         :returns: a resource module
         """
-        rsd_version = version.StrictVersion(self._rsd_api_version)
-        if rsd_version < version.StrictVersion("2.2.0"):
-            # Use the interface of RSD API 2.1.0 to interact with RSD 2.1.0 and
-            # all previous version.
-            return v2_1.RSDLibV2_1(self._conn, self._root_prefix,
-                                   redfish_version=self._redfish_version)
-        elif version.StrictVersion("2.2.0") <= rsd_version \
-            and rsd_version < version.StrictVersion("2.3.0"):
-            # Specific interface for RSD 2.2 version
-            return v2_2.RSDLibV2_2(self._conn, self._root_prefix,
-                                   redfish_version=self._redfish_version)
-        elif version.StrictVersion("2.3.0") <= rsd_version \
-            and rsd_version < version.StrictVersion("2.4.0"):
-            # Specific interface for RSD 2.2 version
-            return v2_3.RSDLibV2_3(self._conn, self._root_prefix,
-                                   redfish_version=self._redfish_version)
-        else:
+        version_class = self._get_version_class()
+        if version_class is None:
             raise NotImplementedError(
                 "The rsd-lib library doesn't support RSD API "
                 "version {0}.".format(self._rsd_api_version))
+
+        module = importlib.import_module(version_class[0])
+        rsd = getattr(module, version_class[1])(
+            self._conn, self._root_prefix,
+            redfish_version=self._redfish_version,
+            resource_cache=self._resource_cache,
+            json_doc=self._json)
+        with self._versioned_lock:
+            self._versioned.add(rsd)
+        return rsd
@@ -0,0 +1,282 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+from concurrent import futures
+import logging
+import threading
+import time
+import weakref
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 1024
+"""Default maximum number of resources held by a ResourceCache"""
+
+DEFAULT_TTL = 60
+"""Default time in seconds a cached resource is reused before reloading"""
+
+# Note: The resource cache shared by every resource created from the same
+# connector. It is registered by the RSDLib object owning the cache.
+_CACHES = weakref.WeakKeyDictionary()
+
+
+class ResourceCache(object):
+    """A thread safe LRU cache of resources keyed by their @odata.id
+
+    Entries expire ``ttl`` seconds after they were loaded, after which the
+    resource is fetched again. When more than ``max_size`` resources are
+    cached the least recently used ones are evicted. A ``max_size`` of 0
+    disables caching.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        """A class representing a resource cache
+
+        :param max_size: The maximum number of cached resources
+        :param ttl: The number of seconds a resource stays in the cache,
+            None to never expire entries
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        # Note: Key -> Future of the resource being loaded by a thread
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, resource_type, identity):
+        """Return the cached resource of the given type and identity
+
+        :param resource_type: The resource class
+        :param identity: The identity of the resource
+        :returns: The resource object or None when it is not cached or
+            has expired
+        """
+        with self._lock:
+            return self._get(
+                (rsd_lib_utils.normalize_identity(identity), resource_type))
+
+    def _get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        loaded_at, resource = entry
+        if self.ttl is not None and time.time() - loaded_at > self.ttl:
+            self.misses += 1
+            return None
+
+        # Re-insert the entry to mark it as the most recently used
+        self._entries[key] = entry
+        self.hits += 1
+        return resource
+
+    def add(self, resource, resource_type=None):
+        """Add a resource to the cache
+
+        :param resource: The resource object
+        :param resource_type: The class the resource is looked up by,
+            defaults to the class of ``resource``
+        """
+        if resource_type is None:
+            resource_type = type(resource)
+        key = (rsd_lib_utils.normalize_identity(resource.path), resource_type)
+        self._put(key, resource)
+
+    def _put(self, key, resource):
+        if not self.max_size:
+            return
+
+        with self._lock:
+            self._store(key, resource)
+
+    def _store(self, key, resource):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.time(), resource)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_or_create(self, resource_type, connector, identity,
+                      redfish_version=None):
+        """Return the cached resource, loading it on a cache miss
+
+        A resource missed by several threads at once is only loaded by the
+        first one, the others wait for it and get the same object.
+
+        :param resource_type: The resource class
+        :param connector: A Connector instance
+        :param identity: The identity of the resource
+        :param redfish_version: The version of RedFish. Used to construct
+            the object according to schema of the given version.
+        :returns: The resource object
+        """
+        key = (rsd_lib_utils.normalize_identity(identity), resource_type)
+        with self._lock:
+            future = self._loading.get(key)
+            if future is None:
+                resource = self._get(key)
+                if resource is not None:
+                    return resource
+                owner = True
+                future = self._loading[key] = futures.Future()
+            else:
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            resource = resource_type(connector, identity,
+                                     redfish_version=redfish_version)
+        except Exception as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self.max_size:
+                self._store(key, resource)
+            del self._loading[key]
+        future.set_result(resource)
+        return resource
+
+    def invalidate(self, *identities):
+        """Drop resources from the cache
+
+        The dropped resources are marked as stale, so an object still
+        referenced by the caller is reloaded the next time it is refreshed
+        without ``force``.
+
+        :param identities: The identities of the resources to drop. When
+            none is given the whole cache is cleared.
+        """
+        with self._lock:
+            if identities:
+                paths = set(rsd_lib_utils.normalize_identity(i)
+                            for i in identities)
+                keys = [key for key in self._entries if key[0] in paths]
+            else:
+                keys = list(self._entries)
+            entries = [self._entries.pop(key) for key in keys]
+
+        for _, resource in entries:
+            resource.invalidate()
+        LOG.debug('Invalidated %d cached resource(s)', len(entries))
+
+
+def register(connector, resource_cache):
+    """Share a resource cache with every resource using a connector
+
+    :param connector: A Connector instance
+    :param resource_cache: A ResourceCache instance, or None to stop
+        caching the resources of the connector
+    """
+    if resource_cache is None:
+        _CACHES.pop(connector, None)
+    else:
+        _CACHES[connector] = resource_cache
+
+
+def get_cache(connector):
+    """Return the resource cache registered for a connector
+
+    :param connector: A Connector instance
+    :returns: A ResourceCache instance or None
+    """
+    return _CACHES.get(connector)
+
+
+def get_resource(connector, resource_type, identity, redfish_version=None):
+    """Return a resource, going through the cache of its connector
+
+    :param connector: A Connector instance
+    :param resource_type: The resource class
+    :param identity: The identity of the resource
+    :param redfish_version: The version of RedFish. Used to construct
+        the object according to schema of the given version.
+    :returns: The resource object
+    """
+    resource_cache = _CACHES.get(connector)
+    if resource_cache is None:
+        return resource_type(connector, identity,
+                             redfish_version=redfish_version)
+    return resource_cache.get_or_create(resource_type, connector, identity,
+                                        redfish_version=redfish_version)
+
+
+def add(connector, resource, resource_type=None):
+    """Add a resource to the cache of its connector, if any
+
+    :param connector: A Connector instance
+    :param resource: The resource object
+    :param resource_type: The class the resource is looked up by
+    """
+    resource_cache = _CACHES.get(connector)
+    if resource_cache is not None:
+        resource_cache.add(resource, resource_type)
+
+
+def get_loaded_member(connector, collection_type, identity):
+    """Return a member already loaded by its cached parent collection
+
+    :param connector: A Connector instance
+    :param collection_type: The class of the parent collection
+    :param identity: The identity of the member, the parent collection
+        identity is derived from it
+    :returns: The member object, or None when the parent collection is not
+        cached or hasn't loaded its members
+    """
+    resource_cache = _CACHES.get(connector)
+    if resource_cache is None:
+        return None
+
+    parent = rsd_lib_utils.normalize_identity(identity).rsplit('/', 1)[0]
+    collection = resource_cache.get(collection_type, parent)
+    identity = rsd_lib_utils.normalize_identity(identity)
+    for member in getattr(collection, '_cache_get_members', None) or ():
+        if rsd_lib_utils.normalize_identity(member.path) == identity:
+            return member
+    return None
+
+
+def invalidate(connector, *identities):
+    """Drop resources from the cache of a connector, if any
+
+    :param connector: A Connector instance
+    :param identities: The identities of the resources to drop
+    """
+    resource_cache = _CACHES.get(connector)
+    if resource_cache is not None and identities:
+        resource_cache.invalidate(*identities)
+
+
+def invalidate_member(connector, identity):
+    """Drop a resource and the collection it belongs to from the cache
+
+    :param connector: A Connector instance
+    :param identity: The identity of the resource, the parent collection
+        identity is derived from it
+    """
+    parent = rsd_lib_utils.normalize_identity(identity).rsplit('/', 1)[0]
+    invalidate(connector, identity, parent)
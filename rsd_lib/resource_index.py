@@ -0,0 +1,391 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+import json
+import logging
+import threading
+import weakref
+
+import six
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 2
+
+# Note: The indexes built for the collections of a connector, keyed by the
+# path of the collection.
+_INDEXES = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def _key_from_json(key):
+    return tuple(key) if isinstance(key, list) else key
+
+
+def _get_etag(json_doc, resource=None):
+    etag = getattr(resource, '_etag', None)
+    if not isinstance(etag, six.string_types):
+        etag = (json_doc or {}).get('@odata.etag')
+    return etag if isinstance(etag, six.string_types) else None
+
+
+@six.add_metaclass(abc.ABCMeta)
+class ResourceIndex(object):
+    """A thread safe map of lookup keys to the resources of a collection
+
+    The keys of a resource are computed from its JSON representation by
+    ``get_keys()``. A key is a string or a tuple of strings.
+    """
+
+    def __init__(self, path=None):
+        """A class representing a resource index
+
+        :param path: The path of the file the index is persisted to by
+            ``persist()``, None to keep the index in memory only
+        """
+        self.path = path
+        self._identities = {}
+        self._keys = {}
+        # Note: Identity -> ETag of the indexed representation
+        self._etags = {}
+        # Note: Identities loaded from a file, not checked against the
+        # service yet
+        self._unverified = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, identity):
+        return rsd_lib_utils.normalize_identity(identity) in self._keys
+
+    @property
+    def identities(self):
+        """The identities of the indexed resources"""
+        with self._lock:
+            return list(self._keys)
+
+    @abc.abstractmethod
+    def get_keys(self, json_doc):
+        """Return the lookup keys of a resource
+
+        :param json_doc: The JSON representation of the resource
+        :returns: An iterable of keys
+        """
+
+    def resource_created(self, identity, json_doc):
+        """Update the index after a resource was created elsewhere
+
+        Called for every index of the connector when a resource is created
+        through rsd-lib, so an index can record the links the new resource
+        has to the indexed resources. Does nothing by default.
+
+        :param identity: The identity of the created resource
+        :param json_doc: The JSON representation of the resource
+        :returns: True if the index changed
+        """
+        return False
+
+    def resource_deleted(self, identity):
+        """Update the index after a resource was deleted elsewhere
+
+        Called for every index of the connector when a resource is deleted
+        through rsd-lib. Does nothing by default.
+
+        :param identity: The identity of the deleted resource
+        :returns: True if the index changed
+        """
+        return False
+
+    def _set(self, identity, keys, etag=None):
+        self._discard(identity)
+        self._keys[identity] = keys
+        if etag is not None:
+            self._etags[identity] = etag
+        for key in keys:
+            self._identities.setdefault(key, set()).add(identity)
+
+    def add(self, identity, json_doc, etag=None):
+        """Index a resource, replacing its previous keys
+
+        :param identity: The identity of the resource
+        :param json_doc: The JSON representation of the resource
+        :param etag: The ETag of the representation, defaults to its
+            @odata.etag
+        """
+        keys = frozenset(self.get_keys(json_doc))
+        with self._lock:
+            self._set(rsd_lib_utils.normalize_identity(identity), keys,
+                      etag or _get_etag(json_doc))
+
+    def add_keys(self, identity, keys):
+        """Add lookup keys to an indexed resource
+
+        Nothing is done when the resource is not indexed.
+
+        :param identity: The identity of the resource
+        :param keys: An iterable of keys
+        :returns: True if the index changed
+        """
+        identity = rsd_lib_utils.normalize_identity(identity)
+        with self._lock:
+            current = self._keys.get(identity)
+            if current is None or current.issuperset(keys):
+                return False
+            # Note: The indexed representation is outdated now
+            self._set(identity, current.union(keys))
+            return True
+
+    def remove_key(self, key):
+        """Remove a lookup key from every resource
+
+        :param key: The lookup key
+        :returns: True if the index changed
+        """
+        with self._lock:
+            identities = self._identities.pop(key, ())
+            for identity in identities:
+                self._keys[identity] = self._keys[identity] - {key}
+                self._etags.pop(identity, None)
+            return bool(identities)
+
+    def _discard(self, identity):
+        self._etags.pop(identity, None)
+        self._unverified.discard(identity)
+        for key in self._keys.pop(identity, ()):
+            identities = self._identities[key]
+            identities.discard(identity)
+            if not identities:
+                del self._identities[key]
+
+    def discard(self, identity):
+        """Remove a resource from the index, if present
+
+        :param identity: The identity of the resource
+        """
+        with self._lock:
+            self._discard(rsd_lib_utils.normalize_identity(identity))
+
+    def find(self, key):
+        """Return the resources indexed by a key
+
+        :param key: The lookup key
+        :returns: A sorted list of resource identities
+        """
+        with self._lock:
+            return sorted(self._identities.get(key, ()))
+
+    def save(self, path=None):
+        """Write the index to a file
+
+        The file is replaced atomically.
+
+        :param path: The path of the file, defaults to ``path``
+        """
+        with self._lock:
+            entries = dict(
+                (identity, {'keys': sorted(keys, key=repr),
+                            'etag': self._etags.get(identity)})
+                for identity, keys in self._keys.items())
+        rsd_lib_utils.write_json_atomically(
+            path or self.path,
+            {'version': _FORMAT_VERSION, 'entries': entries})
+
+    def persist(self):
+        """Write the index to its file, if it has one
+
+        A failure is logged, the file is written again on the next change.
+        """
+        if self.path is None:
+            return
+        try:
+            self.save(self.path)
+        except (IOError, OSError) as e:
+            LOG.warning('Failed to persist the index %(path)s: %(error)s',
+                        {'path': self.path, 'error': e})
+
+    def load(self, path=None):
+        """Replace the content of the index by the one saved in a file
+
+        The loaded entries are only trusted once ``sync()`` revalidated
+        them against the service.
+
+        :param path: The path of the file written by ``save()``, defaults
+            to ``path``
+        :returns: True if the file was loaded, False if it is missing or
+            can't be read
+        """
+        path = path or self.path
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            entries = data['entries'] if (
+                data.get('version') == _FORMAT_VERSION) else None
+            if entries is not None:
+                entries = dict(
+                    (identity, (frozenset(_key_from_json(k)
+                                          for k in entry['keys']),
+                                entry.get('etag')))
+                    for identity, entry in entries.items())
+        except (IOError, OSError):
+            return False
+        except (ValueError, KeyError, AttributeError, TypeError) as e:
+            LOG.warning('Ignoring corrupted index %(path)s: %(error)s',
+                        {'path': path, 'error': e})
+            return False
+        if entries is None:
+            return False
+
+        with self._lock:
+            self._identities = {}
+            self._keys = {}
+            self._etags = {}
+            for identity, (keys, etag) in entries.items():
+                self._set(identity, keys, etag)
+            self._unverified = set(self._keys)
+        return True
+
+    def _revalidate(self, collection, identity):
+        """Check a loaded entry against the service
+
+        :returns: None if the entry is up to date, the new (JSON, ETag) of
+            the resource otherwise
+        """
+        normalized = rsd_lib_utils.normalize_identity(identity)
+        etag = self._etags.get(normalized)
+        if normalized in self._unverified and etag is not None:
+            response = collection._conn.get(
+                path=identity, headers={'If-None-Match': etag})
+            if getattr(response, 'status_code', None) == 304:
+                return None
+            json_doc = response.json()
+            return json_doc, _get_etag(json_doc)
+        member = collection.get_member(identity)
+        return member._json, _get_etag(member._json, member)
+
+    def sync(self, collection, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Bring the index up to date with the members of a collection
+
+        The resources which left the collection are removed and the
+        members missing from the index are loaded. The entries read by
+        ``load()`` are revalidated, with a conditional GET when their ETag
+        is known. Members which fail to load are logged and left out of
+        the index.
+
+        :param collection: The collection the index is built for
+        :param concurrency: The maximum number of members loaded at once
+        """
+        members = dict((rsd_lib_utils.normalize_identity(identity), identity)
+                       for identity in collection.members_identities)
+        for identity in set(self.identities) - set(members):
+            self.discard(identity)
+
+        with self._lock:
+            unverified = set(self._unverified)
+        missing = [identity for normalized, identity in members.items()
+                   if normalized not in self or normalized in unverified]
+        for identity, result, error in rsd_lib_utils.iter_concurrently(
+                lambda identity: self._revalidate(collection, identity),
+                sorted(missing), concurrency):
+            if error is not None:
+                LOG.warning('Leaving %(identity)s out of the index: '
+                            '%(error)s', {'identity': identity,
+                                          'error': error})
+                self.discard(identity)
+            elif result is not None:
+                self.add(identity, result[0], etag=result[1])
+            with self._lock:
+                self._unverified.discard(
+                    rsd_lib_utils.normalize_identity(identity))
+
+
+def get_index(connector, collection_path):
+    """Return the index built for a collection, if any
+
+    :param connector: A Connector instance
+    :param collection_path: The path of the collection
+    :returns: A ResourceIndex instance or None
+    """
+    collection_path = rsd_lib_utils.normalize_identity(collection_path)
+    return _INDEXES.get(connector, {}).get(collection_path)
+
+
+def set_index(connector, collection_path, index):
+    """Share the index of a collection with its other users
+
+    :param connector: A Connector instance
+    :param collection_path: The path of the collection
+    :param index: A ResourceIndex instance
+    """
+    with _INDEXES_LOCK:
+        _INDEXES.setdefault(connector, {})[
+            rsd_lib_utils.normalize_identity(collection_path)] = index
+
+
+def get_indexes(connector):
+    """Return all the indexes built for the collections of a connector
+
+    :param connector: A Connector instance
+    :returns: A list of ResourceIndex instances
+    """
+    with _INDEXES_LOCK:
+        return list(_INDEXES.get(connector, {}).values())
+
+
+def add_to_index(connector, identity, json_doc):
+    """Index a new resource in the index of its collection, if any
+
+    The other indexes of the connector are notified of the creation
+    through ``ResourceIndex.resource_created()``.
+
+    :param connector: A Connector instance
+    :param identity: The identity of the resource, the collection path is
+        derived from it
+    :param json_doc: The JSON representation of the resource
+    """
+    identity = rsd_lib_utils.normalize_identity(identity)
+    collection_path = identity.rsplit('/', 1)[0]
+    index = get_index(connector, collection_path)
+    if index is not None:
+        index.add(identity, json_doc)
+        index.persist()
+    for other in get_indexes(connector):
+        if other is not index and other.resource_created(identity,
+                                                         json_doc):
+            other.persist()
+
+
+def discard_from_index(connector, identity):
+    """Remove a deleted resource from the index of its collection, if any
+
+    The other indexes of the connector are notified of the deletion
+    through ``ResourceIndex.resource_deleted()``.
+
+    :param connector: A Connector instance
+    :param identity: The identity of the resource, the collection path is
+        derived from it
+    """
+    identity = rsd_lib_utils.normalize_identity(identity)
+    collection_path = identity.rsplit('/', 1)[0]
+    index = get_index(connector, collection_path)
+    if index is not None:
+        index.discard(identity)
+        index.persist()
+    for other in get_indexes(connector):
+        if other is not index and other.resource_deleted(identity):
+            other.persist()
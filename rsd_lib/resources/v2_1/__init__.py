@@ -15,16 +15,33 @@
 
 from sushy.resources import base
 
-from rsd_lib.resources.v2_1.chassis import chassis
-from rsd_lib.resources.v2_1.ethernet_switch import ethernet_switch
-from rsd_lib.resources.v2_1.fabric import fabric
-from rsd_lib.resources.v2_1.manager import manager
-from rsd_lib.resources.v2_1.node import node
-from rsd_lib.resources.v2_1.storage_service import storage_service
-from rsd_lib.resources.v2_1.system import system
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib import utils as rsd_lib_utils
 
+# Note: The resource modules are only imported when first used.
+v2_1_chassis = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_1.chassis.chassis')
+v2_1_ethernet_switch = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_1.ethernet_switch.ethernet_switch')
+v2_1_fabric = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_1.fabric.fabric')
+v2_1_manager = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_1.manager.manager')
+v2_1_node = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_1.node.node')
+v2_1_storage_service = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_1.storage_service.storage_service')
+v2_1_system = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_1.system.system')
 
-class RSDLibV2_1(base.ResourceBase):
+
+class ExpandQueryField(base.CompositeField):
+    levels = base.Field('Levels', adapter=bool)
+    """Whether the $levels qualifier is supported"""
+
+    no_links = base.Field('NoLinks', adapter=bool)
+    """Whether expanding the dependent resources ('.') is supported"""
+
+
+class RSDLibV2_1(rsd_lib_base.ResourceBase):
 
     _systems_path = base.Field(['Systems', '@odata.id'], required=True)
     """SystemCollection path"""
@@ -56,17 +73,39 @@ class RSDLibV2_1(base.ResourceBase):
                                   required=True)
     """RSD API version"""
 
+    _expand_query = ExpandQueryField(
+        ['ProtocolFeaturesSupported', 'ExpandQuery'])
+    """The $expand query support advertised by the service"""
+
     def __init__(self, connector, identity="/redfish/v1/",
-                 redfish_version=None):
+                 redfish_version=None, resource_cache=None, json_doc=None):
         """A class representing a ComposedNode
 
         :param connector: A Connector instance
         :param identity: The identity of the Node resource
         :param redfish_version: The version of RedFish. Used to construct
             the object according to schema of the given version.
+        :param resource_cache: A ResourceCache instance shared by all the
+            resources loaded through this object, None to not cache them
+        :param json_doc: The representation of the service root when it was
+            already retrieved, the service root is not fetched again then.
         """
+        self._preloaded_json = json_doc
+        self.resource_cache = resource_cache
+        rsd_lib_cache.register(connector, resource_cache)
         super(RSDLibV2_1, self).__init__(connector, identity, redfish_version)
 
+    def _do_refresh(self, force):
+        super(RSDLibV2_1, self)._do_refresh(force)
+
+        expand_query = None
+        if self._expand_query is not None and self._expand_query.no_links:
+            if self._expand_query.levels:
+                expand_query = '$expand=.($levels=1)'
+            else:
+                expand_query = '$expand=.'
+        rsd_lib_base.set_expand_query(self._conn, expand_query)
+
     def get_system_collection(self):
         """Get the SystemCollection object
 
@@ -74,8 +113,9 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a SystemCollection object
         """
-        return system.SystemCollection(self._conn, self._systems_path,
-                                       redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_system.SystemCollection, self._systems_path,
+            redfish_version=self.redfish_version)
 
     def get_system(self, identity):
         """Given the identity return a System object
@@ -83,8 +123,9 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the System resource
         :returns: The System object
         """
-        return system.System(self._conn, identity,
-                             redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_system.System, identity,
+            redfish_version=self.redfish_version)
 
     def get_node_collection(self):
         """Get the NodeCollection object
@@ -93,8 +134,9 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a NodeCollection object
         """
-        return node.NodeCollection(self._conn, self._nodes_path,
-                                   redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_node.NodeCollection, self._nodes_path,
+            redfish_version=self.redfish_version)
 
     def get_node(self, identity):
         """Given the identity return a Node object
@@ -102,8 +144,9 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the Node resource
         :returns: The Node object
         """
-        return node.Node(self._conn, identity,
-                         redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_node.Node, identity,
+            redfish_version=self.redfish_version)
 
     def get_storage_service_collection(self):
         """Get the StorageServiceCollection object
@@ -112,8 +155,9 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a StorageServiceCollection object
         """
-        return storage_service.StorageServiceCollection(
-            self._conn, self._storage_service_path,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_storage_service.StorageServiceCollection,
+            self._storage_service_path,
             redfish_version=self.redfish_version)
 
     def get_storage_service(self, identity):
@@ -122,8 +166,8 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the StorageService resource
         :returns: The StorageService object
         """
-        return storage_service.StorageService(
-            self._conn, identity,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_storage_service.StorageService, identity,
             redfish_version=self.redfish_version)
 
     def get_chassis_collection(self):
@@ -133,9 +177,9 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a ChassisCollection object
         """
-        return chassis.ChassisCollection(self._conn,
-                                         self._chassis_path,
-                                         redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_chassis.ChassisCollection, self._chassis_path,
+            redfish_version=self.redfish_version)
 
     def get_chassis(self, identity):
         """Given the identity return a Chassis object
@@ -143,9 +187,9 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the Chassis resource
         :returns: The Chassis object
         """
-        return chassis.Chassis(self._conn,
-                               identity,
-                               redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_chassis.Chassis, identity,
+            redfish_version=self.redfish_version)
 
     def get_fabric_collection(self):
         """Get the FabricCollection object
@@ -154,9 +198,9 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a FabricCollection object
         """
-        return fabric.FabricCollection(self._conn,
-                                       self._fabrics_path,
-                                       redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_fabric.FabricCollection, self._fabrics_path,
+            redfish_version=self.redfish_version)
 
     def get_fabric(self, identity):
         """Given the identity return a Fabric object
@@ -164,9 +208,9 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the Fabric resource
         :returns: The Fabric object
         """
-        return fabric.Fabric(self._conn,
-                             identity,
-                             redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_fabric.Fabric, identity,
+            redfish_version=self.redfish_version)
 
     def get_manager_collection(self):
         """Get the ManagerCollection object
@@ -175,9 +219,9 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a ManagerCollection object
         """
-        return manager.ManagerCollection(self._conn,
-                                         self._managers_path,
-                                         redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_manager.ManagerCollection, self._managers_path,
+            redfish_version=self.redfish_version)
 
     def get_manager(self, identity):
         """Given the identity return a Manager object
@@ -185,9 +229,9 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the Manager resource
         :returns: The Manager object
         """
-        return manager.Manager(self._conn,
-                               identity,
-                               redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_manager.Manager, identity,
+            redfish_version=self.redfish_version)
 
     def get_ethernet_switch_collection(self):
         """Get the EthernetSwitchCollection object
@@ -196,11 +240,10 @@ class RSDLibV2_1(base.ResourceBase):
             not found
         :returns: a EthernetSwitchCollection object
         """
-        return ethernet_switch.EthernetSwitchCollection(
-            self._conn,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_ethernet_switch.EthernetSwitchCollection,
             self._ethernet_switches_path,
-            redfish_version=self.redfish_version
-        )
+            redfish_version=self.redfish_version)
 
     def get_ethernet_switch(self, identity):
         """Given the identity return a EthernetSwitch object
@@ -208,7 +251,6 @@ class RSDLibV2_1(base.ResourceBase):
         :param identity: The identity of the EthernetSwitch resource
         :returns: The EthernetSwitch object
         """
-        return ethernet_switch.EthernetSwitch(
-            self._conn,
-            identity,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_1_ethernet_switch.EthernetSwitch, identity,
             redfish_version=self.redfish_version)
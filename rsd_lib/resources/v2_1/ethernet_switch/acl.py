@@ -16,10 +16,12 @@
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.ethernet_switch import acl_rule
 
 
-class ACL(base.ResourceBase):
+class ACL(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The acl identity string"""
@@ -58,12 +60,13 @@ class ACL(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return acl_rule.ACLRuleCollection(
-            self._conn, self._get_acl_rule_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, acl_rule.ACLRuleCollection,
+            self._get_acl_rule_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class ACLCollection(base.ResourceCollectionBase):
+class ACLCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
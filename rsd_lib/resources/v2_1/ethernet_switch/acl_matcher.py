@@ -0,0 +1,300 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+
+import six
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+Flow = collections.namedtuple(
+    'Flow', ['ip_source', 'ip_destination', 'mac_source', 'mac_destination',
+             'vlan_id', 'l4_source_port', 'l4_destination_port',
+             'l4_protocol'])
+"""A flow evaluated against the ACL rules
+
+IP addresses are dotted strings or integers, MAC addresses colon separated
+strings or integers and the other fields integers. A field left to None is
+unknown, it only matches the rules which don't check it.
+"""
+Flow.__new__.__defaults__ = (None,) * len(Flow._fields)
+
+ACLRuleEntry = collections.namedtuple(
+    'ACLRuleEntry', ['identity', 'rule_id', 'action', 'conditions'])
+"""A compiled ACL rule
+
+``conditions`` maps the Flow fields checked by the rule to their
+``(value, mask)``, the value being already masked.
+"""
+
+_IP_MASK = 0xFFFFFFFF
+_MAC_MASK = 0xFFFFFFFFFFFF
+_VLAN_MASK = 0xFFF
+_PORT_MASK = 0xFFFF
+_PROTOCOL_MASK = 0xFF
+
+_CACHE_SIZE = 65536
+
+
+def parse_ipv4(value):
+    """Convert an IPv4 address to an integer
+
+    :param value: A dotted string or an integer
+    :returns: The address as an integer
+    :raises: ValueError if the address is invalid
+    """
+    if isinstance(value, six.integer_types):
+        return value
+    octets = [int(octet) for octet in value.split('.')]
+    if len(octets) != 4 or not all(0 <= o <= 255 for o in octets):
+        raise ValueError('Invalid IPv4 address %s' % value)
+    return (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | (
+        octets[3])
+
+
+def parse_mac(value):
+    """Convert a MAC address to an integer
+
+    :param value: A string of six hexadecimal bytes separated by colons or
+        dashes, or an integer
+    :returns: The address as an integer
+    :raises: ValueError if the address is invalid
+    """
+    if isinstance(value, six.integer_types):
+        return value
+    octets = value.replace('-', ':').split(':')
+    if len(octets) != 6:
+        raise ValueError('Invalid MAC address %s' % value)
+    result = 0
+    for octet in octets:
+        result = (result << 8) | int(octet, 16)
+    return result
+
+
+def _parse_int(value):
+    return int(value)
+
+
+# Note: Flow field -> (Condition key, value key, parser, full mask)
+_FIELDS = (
+    ('ip_source', 'IPSource', 'IPv4Address', parse_ipv4, _IP_MASK),
+    ('ip_destination', 'IPDestination', 'IPv4Address', parse_ipv4, _IP_MASK),
+    ('mac_source', 'MACSource', ('Address', 'MACAddress'), parse_mac,
+     _MAC_MASK),
+    ('mac_destination', 'MACDestination', ('Address', 'MACAddress'),
+     parse_mac, _MAC_MASK),
+    ('vlan_id', 'VLANId', 'Id', _parse_int, _VLAN_MASK),
+    ('l4_source_port', 'L4SourcePort', 'Port', _parse_int, _PORT_MASK),
+    ('l4_destination_port', 'L4DestinationPort', 'Port', _parse_int,
+     _PORT_MASK),
+    ('l4_protocol', 'L4Protocol', None, _parse_int, _PROTOCOL_MASK),
+)
+
+
+def _parse_condition(condition, value_keys, parser, full_mask):
+    if condition is None:
+        return None
+    if not isinstance(condition, dict):
+        return parser(condition) & full_mask, full_mask
+
+    if isinstance(value_keys, tuple):
+        value = next((condition[k] for k in value_keys
+                      if condition.get(k) is not None), None)
+    else:
+        value = condition.get(value_keys)
+    if value is None:
+        return None
+
+    mask = condition.get('Mask')
+    if mask is None:
+        mask = full_mask
+    else:
+        mask = parser(mask) & full_mask
+    return parser(value) & mask, mask
+
+
+def compile_rule(json_doc):
+    """Compile the condition of an ACL rule
+
+    A condition field compares the bits set in its mask, a field without
+    mask is compared entirely and a missing field matches any value.
+
+    :param json_doc: The JSON representation of the rule
+    :returns: An ACLRuleEntry
+    :raises: ValueError if the condition can't be parsed
+    """
+    condition = json_doc.get('Condition') or {}
+    conditions = {}
+    for field, key, value_keys, parser, full_mask in _FIELDS:
+        parsed = _parse_condition(condition.get(key), value_keys, parser,
+                                  full_mask)
+        if parsed is not None:
+            conditions[field] = parsed
+    return ACLRuleEntry(
+        identity=json_doc.get('@odata.id'),
+        rule_id=rsd_lib_utils.int_or_none(json_doc.get('RuleId')),
+        action=json_doc.get('Action'), conditions=conditions)
+
+
+class _MaskedIndex(object):
+    """The rules checking one field, grouped by mask
+
+    Each group is a hash table of the masked values, so a lookup costs one
+    probe per distinct mask. IP prefixes, MAC OUIs, VLAN and port masks
+    only use a handful of distinct masks. The result of a lookup is a
+    bitmap of the matching rules, memoized per value.
+    """
+
+    def __init__(self, parser):
+        self._parser = parser
+        self._wildcard = 0
+        # Note: mask -> {masked value: bitmap of the rules}
+        self._tables = {}
+        self._cache = {}
+
+    def add(self, bit, condition):
+        if condition is None:
+            self._wildcard |= bit
+            return
+        value, mask = condition
+        table = self._tables.setdefault(mask, {})
+        table[value] = table.get(value, 0) | bit
+
+    def lookup(self, value):
+        if value is None:
+            return self._wildcard
+        bits = self._cache.get(value)
+        if bits is None:
+            number = self._parser(value)
+            bits = self._wildcard
+            for mask, table in self._tables.items():
+                bits |= table.get(number & mask, 0)
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            self._cache[value] = bits
+        return bits
+
+
+def _covers(condition, other):
+    # Note: Whether every value matching other matches condition
+    if condition is None:
+        return True
+    if other is None:
+        return False
+    value, mask = condition
+    other_value, other_mask = other
+    return mask & other_mask == mask and other_value & mask == value
+
+
+class ACLMatcher(object):
+    """The rules of an ACL compiled for local evaluation
+
+    The rules are evaluated in increasing RuleId order. Each field of the
+    condition is indexed separately, a flow is matched by intersecting the
+    bitmaps of the rules matching each of its fields, so no request is
+    sent and no rule is scanned one by one.
+    """
+
+    def __init__(self, rules):
+        """A class representing compiled ACL rules
+
+        :param rules: The JSON representations of the rules
+        :raises: ValueError if a rule condition can't be parsed
+        """
+        entries = [compile_rule(json_doc) for json_doc in rules]
+        entries.sort(key=lambda e: (e.rule_id is None, e.rule_id,
+                                    e.identity or ''))
+        self.rules = tuple(entries)
+        """The compiled rules, in evaluation order"""
+
+        self._indexes = []
+        for field, _, _, parser, _ in _FIELDS:
+            index = _MaskedIndex(parser)
+            for position, entry in enumerate(self.rules):
+                index.add(1 << position, entry.conditions.get(field))
+            self._indexes.append(index)
+        self._all = (1 << len(self.rules)) - 1
+
+    @classmethod
+    def from_collection(cls, rule_collection,
+                        concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Compile the rules of an ACLRuleCollection
+
+        :param rule_collection: An ACLRuleCollection instance
+        :param concurrency: The maximum number of rules loaded at once
+        :returns: An ACLMatcher instance
+        """
+        members = rule_collection.get_members(concurrency=concurrency)
+        return cls([member.json for member in members])
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _match_bits(self, flow):
+        bits = self._all
+        for index, value in zip(self._indexes, flow):
+            bits &= index.lookup(value)
+            if not bits:
+                break
+        return bits
+
+    def match(self, flow):
+        """Return the rule applied to a flow
+
+        :param flow: A Flow
+        :returns: The first ACLRuleEntry matching the flow, or None
+        """
+        bits = self._match_bits(flow)
+        if not bits:
+            return None
+        return self.rules[(bits & -bits).bit_length() - 1]
+
+    def match_all(self, flow):
+        """Return all the rules matching a flow
+
+        Only the first one is applied, the others are shadowed for this
+        flow.
+
+        :param flow: A Flow
+        :returns: A list of ACLRuleEntry, in evaluation order
+        """
+        bits = self._match_bits(flow)
+        matches = []
+        while bits:
+            lowest = bits & -bits
+            matches.append(self.rules[lowest.bit_length() - 1])
+            bits ^= lowest
+        return matches
+
+    def shadowed_rules(self):
+        """Return the rules which can never be applied
+
+        A rule is shadowed when an earlier rule matches every flow it
+        matches.
+
+        :returns: A list of ``(shadowed, shadowing)`` ACLRuleEntry pairs
+        """
+        shadowed = []
+        for position, entry in enumerate(self.rules):
+            for earlier in self.rules[:position]:
+                if all(_covers(earlier.conditions.get(field),
+                               entry.conditions.get(field))
+                       for field in Flow._fields):
+                    shadowed.append((entry, earlier))
+                    break
+        return shadowed
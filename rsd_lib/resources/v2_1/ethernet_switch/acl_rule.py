@@ -13,17 +13,57 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import logging
 
-from jsonschema import validate
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib.resources.v2_1.ethernet_switch import acl_matcher
 from rsd_lib.resources.v2_1.ethernet_switch import schemas as acl_rule_schema
 from rsd_lib import utils as rsd_lib_utils
+from rsd_lib import validation as rsd_lib_validation
 
 LOG = logging.getLogger(__name__)
 
+ApplyACLRuleResult = collections.namedtuple(
+    'ApplyACLRuleResult', ['request', 'identity', 'added', 'error'])
+"""The outcome of one rule of apply_acl_rules()
+
+``added`` is False when an equivalent rule was already present, then
+``identity`` is the uri of that rule. ``identity`` is None when ``error``,
+the exception raised by the POST, is set.
+"""
+
+
+def _link_identity(link):
+    if isinstance(link, dict):
+        link = link.get('@odata.id')
+    return link.rstrip('/') if link else None
+
+
+def get_acl_rule_key(json_doc):
+    """Return what makes two ACL rules equivalent
+
+    Two rules are equivalent when they have the same action, the same
+    mirroring settings and the same conditions once normalized: masks
+    applied, missing masks and missing fields made explicit.
+
+    :param json_doc: The JSON representation of a rule or a rule request
+    :returns: A hashable key
+    :raises: ValueError if the condition can't be parsed
+    """
+    entry = acl_matcher.compile_rule(json_doc)
+    region = json_doc.get('MirrorPortRegion') or ()
+    return (entry.action,
+            _link_identity(json_doc.get('ForwardMirrorInterface')),
+            tuple(sorted(filter(None, (_link_identity(link)
+                                       for link in region)))),
+            json_doc.get('MirrorType'),
+            tuple(sorted(entry.conditions.items())))
+
 
 class IPSourceField(base.CompositeField):
     ipv4_address = base.Field('IPv4Address')
@@ -57,7 +97,7 @@ class ConditionField(base.CompositeField):
     l4_protocol = base.Field('L4Protocol')
 
 
-class ACLRule(base.ResourceBase):
+class ACLRule(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id')
     """The acl rule identity string"""
@@ -106,7 +146,7 @@ class ACLRule(base.ResourceBase):
         super(ACLRule, self).__init__(connector, identity, redfish_version)
 
 
-class ACLRuleCollection(base.ResourceCollectionBase):
+class ACLRuleCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -124,15 +164,115 @@ class ACLRuleCollection(base.ResourceCollectionBase):
                                                 path,
                                                 redfish_version)
 
+    def _post_acl_rule(self, acl_rule_req):
+        resp = self._conn.post(self._path, data=acl_rule_req)
+        acl_rule_url = resp.headers['Location']
+        LOG.info("ACL Rule add at %s", acl_rule_url)
+        return acl_rule_url[acl_rule_url.find(self._path):]
+
     def add_acl_rule(self, acl_rule_req):
         """Add a acl rule
 
         :param acl_rule: JSON for acl_rule
         :returns: The location of the acl rule
         """
-        target_uri = self._path
-        validate(acl_rule_req, acl_rule_schema.acl_rule_req_schema)
-        resp = self._conn.post(target_uri, data=acl_rule_req)
-        acl_rule_url = resp.headers['Location']
-        LOG.info("ACL Rule add at %s", acl_rule_url)
-        return acl_rule_url[acl_rule_url.find(self._path):]
+        rsd_lib_validation.validate(
+            acl_rule_req, acl_rule_schema.acl_rule_req_schema)
+        acl_rule_url = self._post_acl_rule(acl_rule_req)
+        rsd_lib_cache.invalidate(self._conn, self._path)
+        self._cache_matcher = None
+        return acl_rule_url
+
+    def apply_acl_rules(self, acl_rule_reqs,
+                        concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Add the missing rules of a policy
+
+        Every request is validated before the first rule is added. The
+        collection is then reloaded and the requests equivalent to a rule
+        already present, or to an earlier request, are skipped, see
+        ``get_acl_rule_key()``. Applying the same policy again only adds
+        the rules which failed.
+
+        The missing rules are added using up to ``concurrency`` concurrent
+        requests when they all carry a RuleId, which orders them. Otherwise
+        they are added one at a time, in the order of the requests.
+
+        :param acl_rule_reqs: A list of JSON for acl_rule, in rule order
+        :param concurrency: The maximum number of concurrent requests
+        :returns: A list of ApplyACLRuleResult, in the order of
+            ``acl_rule_reqs``
+        :raises: ValidationError if a request is invalid
+        """
+        keys = []
+        for acl_rule_req in acl_rule_reqs:
+            rsd_lib_validation.validate(
+                acl_rule_req, acl_rule_schema.acl_rule_req_schema)
+            keys.append(get_acl_rule_key(acl_rule_req))
+
+        # Note: Picks up the rules added since the collection was loaded,
+        # the members are loaded from the refreshed identities rather than
+        # from a previously cached listing.
+        self.invalidate()
+        self.refresh(force=False)
+        members, _ = self._load_members_parallel(concurrency)
+        present = {}
+        for member in members:
+            try:
+                present.setdefault(get_acl_rule_key(member.json),
+                                   member.path)
+            except (TypeError, ValueError) as e:
+                LOG.warning('Ignoring the condition of %(rule)s: %(error)s',
+                            {'rule': member.path, 'error': e})
+
+        results = [None] * len(acl_rule_reqs)
+        missing = []
+        # Note: Index of a request -> index of the earlier equivalent one
+        duplicates = {}
+        requested = {}
+        for index, key in enumerate(keys):
+            if key in present:
+                results[index] = ApplyACLRuleResult(
+                    acl_rule_reqs[index], present[key], False, None)
+            elif key in requested:
+                duplicates[index] = requested[key]
+            else:
+                requested[key] = index
+                missing.append(index)
+
+        if not all(acl_rule_reqs[index].get('RuleId') is not None
+                   for index in missing):
+            concurrency = 1
+        try:
+            for index, identity, error in rsd_lib_utils.iter_concurrently(
+                    lambda i: self._post_acl_rule(acl_rule_reqs[i]),
+                    missing, concurrency):
+                if error is not None:
+                    LOG.warning('Failed to add ACL rule %(index)d: '
+                                '%(error)s', {'index': index, 'error': error})
+                results[index] = ApplyACLRuleResult(
+                    acl_rule_reqs[index], identity, error is None, error)
+        finally:
+            if missing:
+                rsd_lib_cache.invalidate(self._conn, self._path)
+                self._cache_matcher = None
+
+        for index, first in duplicates.items():
+            results[index] = results[first]._replace(
+                request=acl_rule_reqs[index], added=False)
+        return results
+
+    def get_matcher(self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Return the rules compiled for local evaluation
+
+        The matcher is cached until the collection is refreshed or a rule
+        is added through ``add_acl_rule()``.
+
+        :param concurrency: The maximum number of rules loaded at once
+        :returns: An ACLMatcher instance
+        """
+        if getattr(self, '_cache_matcher', None) is None:
+            self._cache_matcher = acl_matcher.ACLMatcher.from_collection(
+                self, concurrency=concurrency)
+            utils.setdefaultattr(self, utils.CACHE_ATTR_NAMES_VAR_NAME,
+                                 set()).add('_cache_matcher')
+        return self._cache_matcher
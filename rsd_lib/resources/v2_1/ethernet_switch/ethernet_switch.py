@@ -18,8 +18,12 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.ethernet_switch import acl
+from rsd_lib.resources.v2_1.ethernet_switch import mac_table
 from rsd_lib.resources.v2_1.ethernet_switch import port
+from rsd_lib.resources.v2_1.ethernet_switch import vlan_reconciler
 from rsd_lib import utils as rsd_lib_utils
 
 LOG = logging.getLogger(__name__)
@@ -41,7 +45,7 @@ class LinksField(base.CompositeField):
     """Link to manager of this  ethernet switch"""
 
 
-class EthernetSwitch(base.ResourceBase):
+class EthernetSwitch(rsd_lib_base.ResourceBase):
     identity = base.Field('Id', required=True)
     """The ethernet switch identity string"""
 
@@ -108,8 +112,8 @@ class EthernetSwitch(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return port.PortCollection(
-            self._conn, self._get_port_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, port.PortCollection, self._get_port_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_acl_collection_path(self):
@@ -124,12 +128,12 @@ class EthernetSwitch(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return acl.ACLCollection(
-            self._conn, self._get_acl_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, acl.ACLCollection, self._get_acl_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class EthernetSwitchCollection(base.ResourceCollectionBase):
+class EthernetSwitchCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -147,3 +151,45 @@ class EthernetSwitchCollection(base.ResourceCollectionBase):
         super(EthernetSwitchCollection, self).__init__(connector,
                                                        path,
                                                        redfish_version)
+
+    def get_mac_table(self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                      refresh=False):
+        """Return the static MACs of every port of the switches
+
+        The switches, their ports and static MACs are crawled in parallel
+        the first time. The same table is returned by later calls,
+        refreshed incrementally when ``refresh`` is True.
+
+        :param concurrency: The maximum number of resources loaded at once
+        :param refresh: Whether to update a previously built table
+        :returns: A MACTable instance
+        """
+        table = getattr(self, '_mac_table', None)
+        if table is None:
+            table = self._mac_table = mac_table.MACTable(
+                self, concurrency=concurrency)
+            table.refresh()
+        elif refresh:
+            table.refresh()
+        return table
+
+    def reconcile_vlans(self, desired, dry_run=False,
+                        concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                        switch_rate_limit=None):
+        """Bring the VLANs of the switch ports to a desired state
+
+        :param desired: A dict mapping port identities to the set of
+            ``(vlan_id, tagged)`` the port should have, see
+            ``VLANReconciler.plan()``
+        :param dry_run: When True nothing is changed and the planned
+            changes are returned instead
+        :param concurrency: The maximum number of concurrent requests
+        :param switch_rate_limit: The maximum number of changes per second
+            sent to each switch, None to not limit them
+        :returns: A list of VLANChangeResult, or a list of VLANChange when
+            ``dry_run`` is True
+        """
+        reconciler = vlan_reconciler.VLANReconciler(
+            self, concurrency=concurrency,
+            switch_rate_limit=switch_rate_limit)
+        return reconciler.reconcile(desired, dry_run=dry_run)
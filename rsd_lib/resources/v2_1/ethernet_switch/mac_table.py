@@ -0,0 +1,238 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import threading
+
+from sushy import exceptions
+
+from rsd_lib.resources.v2_1.ethernet_switch import acl_matcher
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+MACTableEntry = collections.namedtuple(
+    'MACTableEntry',
+    ['switch', 'port', 'static_mac', 'mac_address', 'vlan_id'])
+"""A static MAC of the MAC table
+
+``switch``, ``port`` and ``static_mac`` are identities, ``mac_address``
+is normalized by ``normalize_mac()``.
+"""
+
+
+def normalize_mac(address):
+    """Return the canonical form of a MAC address
+
+    :param address: A MAC address, its bytes separated by colons or dashes
+    :returns: The address in lower case, its bytes separated by colons
+    :raises: ValueError if the address is invalid
+    """
+    digits = '%012x' % acl_matcher.parse_mac(address)
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+class MACTable(object):
+    """The static MACs of every port of the Ethernet switches
+
+    The table is built by a single parallel crawl of the switches, their
+    ports and the static MACs of the ports, and answers which port a MAC
+    address is pinned to from memory.
+    """
+
+    def __init__(self, ethernet_switch_collection,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """A class representing a MAC table
+
+        The table is empty until ``refresh()`` is called.
+
+        :param ethernet_switch_collection: An EthernetSwitchCollection
+            instance
+        :param concurrency: The maximum number of resources loaded at once
+        """
+        self._switch_col = ethernet_switch_collection
+        self._concurrency = concurrency
+        self._loaded = False
+        self._lock = threading.RLock()
+        # Note: StaticMACCollection identity -> (switch, port, collection)
+        self._collections = {}
+        # Note: StaticMAC identity -> (StaticMAC, MACTableEntry or None)
+        self._static_macs = {}
+        # Note: (mac address, vlan id) and mac address -> StaticMAC
+        # identities
+        self._by_key = collections.defaultdict(set)
+        self._by_mac = collections.defaultdict(set)
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for _, entry in self._static_macs.values()
+                       if entry is not None)
+
+    def _crawl(self, items, func):
+        return rsd_lib_utils.crawl(func, items, 'the MAC table',
+                                   self._concurrency)
+
+    def _load_collection(self, col):
+        if self._loaded:
+            col.refresh()
+        return col
+
+    def _load_ports(self, switch_id):
+        return self._load_collection(
+            self._switch_col.get_member(switch_id).ports)
+
+    def _load_static_macs(self, item):
+        switch_id, port_col, port_id = item
+        return self._load_collection(
+            port_col.get_member(port_id).static_macs)
+
+    def _load_static_mac(self, item):
+        col, identity = item
+        entry = self._static_macs.get(
+            rsd_lib_utils.normalize_identity(identity))
+        if entry is None:
+            return col.get_member(identity)
+        entry[0].refresh()
+        return entry[0]
+
+    def refresh(self):
+        """Load the static MACs of every port
+
+        The first call crawls the switches, ports and static MACs in
+        parallel. Later calls refresh the collections and the known static
+        MACs with conditional requests and only load the added static MACs.
+        Resources which fail to load are logged and left out of the table.
+        """
+        with self._lock:
+            if self._loaded:
+                self._switch_col.refresh()
+            switches = self._crawl(self._switch_col.members_identities,
+                                   self._load_ports)
+            items = [(switch_id, port_col, port_id)
+                     for switch_id, port_col in switches
+                     for port_id in port_col.members_identities]
+            cols = self._crawl(items, self._load_static_macs)
+            items = [(col, identity) for _, col in cols
+                     for identity in col.members_identities]
+            static_macs = self._crawl(items, self._load_static_mac)
+            self._loaded = True
+
+            self._collections = dict(
+                (rsd_lib_utils.normalize_identity(col.path),
+                 (rsd_lib_utils.normalize_identity(item[0]),
+                  rsd_lib_utils.normalize_identity(item[2]), col))
+                for item, col in cols)
+            loaded = dict(
+                (rsd_lib_utils.normalize_identity(item[1]), static_mac)
+                for item, static_mac in static_macs)
+            for identity in set(self._static_macs) - set(loaded):
+                self._update(identity, None)
+            for identity, static_mac in loaded.items():
+                self._update(identity, static_mac)
+
+    def invalidate(self, *identities):
+        """Reload static MACs known to have changed
+
+        Only the given static MACs are fetched again. A static MAC which no
+        longer exists is removed from the table, a static MAC added to a
+        port known by the table is added to it.
+
+        :param identities: The identities of the static MACs
+        :raises: ConnectionError
+        :raises: HTTPError
+        """
+        with self._lock:
+            for identity in identities:
+                identity = rsd_lib_utils.normalize_identity(identity)
+                entry = self._static_macs.get(identity)
+                try:
+                    if entry is not None:
+                        static_mac = entry[0]
+                        static_mac.refresh()
+                    else:
+                        col = self._collections.get(
+                            identity.rsplit('/', 1)[0])
+                        if col is None:
+                            LOG.debug('Not adding %s to the MAC table, its '
+                                      'port is unknown', identity)
+                            continue
+                        static_mac = col[2].get_member(identity)
+                except exceptions.ResourceNotFoundError as e:
+                    LOG.debug('Removing %(identity)s from the MAC table: '
+                              '%(error)s', {'identity': identity, 'error': e})
+                    static_mac = None
+                self._update(identity, static_mac)
+
+    def _get_entry(self, identity, static_mac):
+        col = self._collections.get(identity.rsplit('/', 1)[0])
+        if col is None or not static_mac.mac_address:
+            return None
+        try:
+            mac_address = normalize_mac(static_mac.mac_address)
+        except ValueError as e:
+            LOG.warning('Leaving %(identity)s out of the MAC table: '
+                        '%(error)s', {'identity': identity, 'error': e})
+            return None
+        return MACTableEntry(col[0], col[1], identity, mac_address,
+                             static_mac.vlan_id)
+
+    def _update(self, identity, static_mac):
+        previous = self._static_macs.pop(identity, (None, None))[1]
+        if previous is not None:
+            key = (previous.mac_address, previous.vlan_id)
+            self._by_key[key].discard(identity)
+            if not self._by_key[key]:
+                del self._by_key[key]
+            self._by_mac[previous.mac_address].discard(identity)
+            if not self._by_mac[previous.mac_address]:
+                del self._by_mac[previous.mac_address]
+        if static_mac is None:
+            return
+
+        entry = self._get_entry(identity, static_mac)
+        self._static_macs[identity] = (static_mac, entry)
+        if entry is not None:
+            self._by_key[(entry.mac_address, entry.vlan_id)].add(identity)
+            self._by_mac[entry.mac_address].add(identity)
+
+    def lookup(self, mac_address, vlan_id=None):
+        """Return the ports a MAC address is pinned to
+
+        :param mac_address: The MAC address, in any case, its bytes
+            separated by colons or dashes
+        :param vlan_id: The VLAN of the static MAC, None for any VLAN
+        :returns: A list of MACTableEntry sorted by static MAC identity,
+            empty when the address is not pinned
+        :raises: ValueError if the address is invalid
+        """
+        mac_address = normalize_mac(mac_address)
+        with self._lock:
+            if vlan_id is None:
+                identities = self._by_mac.get(mac_address, ())
+            else:
+                identities = self._by_key.get((mac_address, int(vlan_id)),
+                                              ())
+            return [self._static_macs[identity][1]
+                    for identity in sorted(identities)]
+
+    def get_entries(self):
+        """Return every static MAC of the table
+
+        :returns: A list of MACTableEntry sorted by static MAC identity
+        """
+        with self._lock:
+            return [entry for _, (_, entry) in sorted(
+                self._static_macs.items()) if entry is not None]
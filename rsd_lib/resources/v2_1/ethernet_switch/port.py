@@ -18,6 +18,8 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.ethernet_switch import static_mac
 from rsd_lib.resources.v2_1.ethernet_switch import vlan
 from rsd_lib import utils as rsd_lib_utils
@@ -82,7 +84,7 @@ class LinksField(base.CompositeField):
                              adapter=utils.get_members_identities)
 
 
-class Port(base.ResourceBase):
+class Port(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The port identity string"""
@@ -171,8 +173,9 @@ class Port(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return static_mac.StaticMACCollection(
-            self._conn, self._get_static_mac_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, static_mac.StaticMACCollection,
+            self._get_static_mac_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_vlan_collection_path(self):
@@ -187,12 +190,12 @@ class Port(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return vlan.VLANCollection(
-            self._conn, self._get_vlan_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, vlan.VLANCollection, self._get_vlan_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class PortCollection(base.ResourceCollectionBase):
+class PortCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -15,10 +15,11 @@
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
-class StaticMAC(base.ResourceBase):
+class StaticMAC(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The static mac identity string"""
@@ -49,7 +50,7 @@ class StaticMAC(base.ResourceBase):
         super(StaticMAC, self).__init__(connector, identity, redfish_version)
 
 
-class StaticMACCollection(base.ResourceCollectionBase):
+class StaticMACCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
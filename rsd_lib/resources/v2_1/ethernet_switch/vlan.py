@@ -13,18 +13,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from jsonschema import validate
 import logging
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.ethernet_switch import schemas as \
     ethernet_switch_schemas
 from rsd_lib import utils as rsd_lib_utils
+from rsd_lib import validation as rsd_lib_validation
 
 LOG = logging.getLogger(__name__)
 
 
-class VLAN(base.ResourceBase):
+class VLAN(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The vlan network interface identity"""
@@ -44,6 +46,9 @@ class VLAN(base.ResourceBase):
     oem = base.Field('Oem')
     """The vlan network interface oem info"""
 
+    tagged = base.Field(['Oem', 'Intel_RackScale', 'Tagged'], adapter=bool)
+    """Whether the vlan network interface is tagged"""
+
     def __init__(self, connector, identity, redfish_version=None):
         """A class representing an VLAN network interface
 
@@ -54,8 +59,13 @@ class VLAN(base.ResourceBase):
         """
         super(VLAN, self).__init__(connector, identity, redfish_version)
 
+    def delete(self):
+        """Remove the vlan from the port"""
+        self._conn.delete(self.path)
+        rsd_lib_cache.invalidate_member(self._conn, self.path)
+
 
-class VLANCollection(base.ResourceCollectionBase):
+class VLANCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -79,9 +89,11 @@ class VLANCollection(base.ResourceCollectionBase):
         :returns: The location of the vlan network interface
         """
         target_uri = self._path
-        validate(vlan_network_interface_req,
-                 ethernet_switch_schemas.vlan_network_interface_req_schema)
+        rsd_lib_validation.validate(
+            vlan_network_interface_req,
+            ethernet_switch_schemas.vlan_network_interface_req_schema)
         resp = self._conn.post(target_uri, data=vlan_network_interface_req)
+        rsd_lib_cache.invalidate(self._conn, self._path)
         LOG.info("VLAN add at %s", resp.headers['Location'])
         vlan_network_interface_url = resp.headers['Location']
         return vlan_network_interface_url[vlan_network_interface_url.
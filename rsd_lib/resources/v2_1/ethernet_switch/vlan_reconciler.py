@@ -0,0 +1,222 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+VLAN_ADD = 'add'
+VLAN_DELETE = 'delete'
+
+VLANChange = collections.namedtuple(
+    'VLANChange', ['action', 'port', 'vlan_id', 'tagged', 'vlan'])
+"""A change planned by VLANReconciler.plan()
+
+``action`` is VLAN_ADD or VLAN_DELETE, ``port`` the identity of the port
+and ``vlan`` the identity of the VLAN to delete, None for VLAN_ADD.
+"""
+
+VLANChangeResult = collections.namedtuple(
+    'VLANChangeResult', ['change', 'identity', 'error'])
+"""The outcome of a VLANChange applied by VLANReconciler.apply()
+
+``identity`` is the identity of the VLAN, the new one for added VLANs or
+None when the addition failed, and ``error`` the exception raised while
+applying the change or None.
+"""
+
+
+class VLANReconciler(object):
+    """Bring the VLANs of switch ports to a desired state
+
+    The switches, the ports and their VLANs are crawled in parallel, the
+    collections being refreshed so every plan starts from the current
+    state of the service. The current VLANs of each port are compared
+    with the desired ones and only the VLANs which differ are deleted or
+    added. A VLAN whose tagging differs is deleted and added again.
+    """
+
+    def __init__(self, ethernet_switch_collection,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                 switch_rate_limit=None):
+        """A class representing a VLAN reconciler
+
+        :param ethernet_switch_collection: An EthernetSwitchCollection
+            instance
+        :param concurrency: The maximum number of concurrent requests
+        :param switch_rate_limit: The maximum number of changes per second
+            sent to each switch, None to not limit them
+        """
+        self._switch_col = ethernet_switch_collection
+        self._concurrency = concurrency
+        self._switch_rate_limit = switch_rate_limit
+        # Note: Port identity -> (switch identity, VLANCollection)
+        self._ports = {}
+        # Note: Port identity -> list of VLAN
+        self._vlans = {}
+
+    def _crawl(self, items, func):
+        return rsd_lib_utils.crawl(func, items, 'the VLAN reconciliation',
+                                   self._concurrency)
+
+    def _load_switch(self, switch_id):
+        port_col = self._switch_col.get_member(switch_id).ports
+        port_col.refresh()
+        return port_col
+
+    def _load_port(self, item):
+        switch_id, port_col, port_id = item
+        vlan_col = port_col.get_member(port_id).vlans
+        # Note: The VLANs may have been changed by a previous reconciliation
+        # or another client, this costs a conditional GET when unchanged.
+        vlan_col.refresh()
+        return vlan_col
+
+    def _load(self, ports):
+        self._switch_col.refresh()
+        switches = self._crawl(self._switch_col.members_identities,
+                               self._load_switch)
+        items = [(switch_id, port_col, port_id)
+                 for switch_id, port_col in switches
+                 for port_id in port_col.members_identities
+                 if rsd_lib_utils.normalize_identity(port_id) in ports]
+        vlan_cols = self._crawl(items, self._load_port)
+        items = [(item, vlan_col, vlan_id)
+                 for item, vlan_col in vlan_cols
+                 for vlan_id in vlan_col.members_identities]
+        vlans = self._crawl(items, lambda item: item[1].get_member(item[2]))
+
+        loaded = set(item for item, _ in vlans)
+        failed = set(rsd_lib_utils.normalize_identity(item[0][2])
+                     for item in items if item not in loaded)
+        self._ports = {}
+        self._vlans = {}
+        for item, vlan_col in vlan_cols:
+            port_id = rsd_lib_utils.normalize_identity(item[2])
+            if port_id in failed:
+                continue
+            self._ports[port_id] = (item[0], vlan_col)
+            self._vlans[port_id] = []
+        for item, vlan in vlans:
+            port_id = rsd_lib_utils.normalize_identity(item[0][2])
+            if port_id in self._vlans:
+                self._vlans[port_id].append(vlan)
+
+    def plan(self, desired):
+        """Compute the changes bringing the ports to the desired VLANs
+
+        Only the ports listed in ``desired`` are loaded and changed. Ports
+        which are not found or whose VLANs fail to load are logged and left
+        unchanged.
+
+        :param desired: A dict mapping port identities to the set of
+            ``(vlan_id, tagged)`` the port should have, an empty set
+            removes every VLAN of the port
+        :returns: A list of VLANChange, empty when the ports already have
+            the desired VLANs
+        """
+        wanted = dict((rsd_lib_utils.normalize_identity(port_id),
+                       frozenset((int(vlan_id), bool(tagged))
+                                 for vlan_id, tagged in vlans))
+                      for port_id, vlans in desired.items())
+        self._load(set(wanted))
+
+        changes = []
+        for port_id in sorted(wanted):
+            if port_id not in self._ports:
+                LOG.warning('Not reconciling the VLANs of port %s which '
+                            'could not be loaded', port_id)
+                continue
+            missing = set(wanted[port_id])
+            for vlan in sorted(self._vlans[port_id], key=lambda v: v.path):
+                if vlan.tagged is None:
+                    # Note: The tagging is unknown, any is accepted
+                    keys = [(vlan.vlan_id, True), (vlan.vlan_id, False)]
+                else:
+                    keys = [(vlan.vlan_id, vlan.tagged)]
+                key = next((k for k in keys if k in missing), None)
+                if key is not None:
+                    missing.discard(key)
+                else:
+                    changes.append(VLANChange(
+                        VLAN_DELETE, port_id, vlan.vlan_id, vlan.tagged,
+                        vlan.path))
+            for vlan_id, tagged in sorted(missing):
+                changes.append(VLANChange(VLAN_ADD, port_id, vlan_id, tagged,
+                                          None))
+        return changes
+
+    def _apply_change(self, change, limiters):
+        switch_id, vlan_col = self._ports[change.port]
+        limiters[switch_id].wait()
+        if change.action == VLAN_DELETE:
+            vlan_col.get_member(change.vlan).delete()
+            return change.vlan
+        return vlan_col.add_vlan({
+            'VLANId': change.vlan_id,
+            'VLANEnable': True,
+            'Oem': {'Intel_RackScale': {'Tagged': change.tagged}}})
+
+    def apply(self, changes):
+        """Apply changes computed by ``plan()``
+
+        The deletions are applied first, so an untagged VLAN or a VLAN
+        whose tagging changes is removed before its replacement is added.
+        The changes are applied using up to ``concurrency`` concurrent
+        requests, and at most ``switch_rate_limit`` per second to each
+        switch. A failed change doesn't stop the others.
+
+        :param changes: A list of VLANChange returned by ``plan()``
+        :returns: A list of VLANChangeResult, in the order of ``changes``
+        """
+        switches = set(entry[0] for entry in self._ports.values())
+        limiters = dict(
+            (switch_id, rsd_lib_utils.RateLimiter(self._switch_rate_limit))
+            for switch_id in switches)
+
+        results = [None] * len(changes)
+        for action in (VLAN_DELETE, VLAN_ADD):
+            for index, identity, error in rsd_lib_utils.iter_concurrently(
+                    lambda i: self._apply_change(changes[i], limiters),
+                    [i for i, c in enumerate(changes) if c.action == action],
+                    self._concurrency):
+                change = changes[index]
+                if error is not None:
+                    LOG.warning('Failed to %(action)s VLAN %(vlan)s on port '
+                                '%(port)s: %(error)s',
+                                {'action': change.action,
+                                 'vlan': change.vlan_id,
+                                 'port': change.port, 'error': error})
+                    identity = change.vlan
+                results[index] = VLANChangeResult(change, identity, error)
+        return results
+
+    def reconcile(self, desired, dry_run=False):
+        """Bring the ports to the desired VLANs
+
+        :param desired: A dict mapping port identities to the set of
+            ``(vlan_id, tagged)`` the port should have, see ``plan()``
+        :param dry_run: When True nothing is changed and the planned
+            changes are returned instead
+        :returns: A list of VLANChangeResult, or a list of VLANChange when
+            ``dry_run`` is True
+        """
+        changes = self.plan(desired)
+        if dry_run or not changes:
+            return changes
+        return self.apply(changes)
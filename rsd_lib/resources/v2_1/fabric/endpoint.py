@@ -17,11 +17,65 @@ import logging
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_index as rsd_lib_index
 from rsd_lib import utils
 
 LOG = logging.getLogger(__name__)
 
 
+def get_endpoint_keys(json_doc):
+    """Return the lookup keys of an endpoint
+
+    The keys are the durable names (NQN, iQN, UUID...) of the endpoint and
+    of its connected entities, the links to the connected entities and the
+    IP addresses of the transports.
+
+    :param json_doc: The JSON representation of the endpoint, or an
+        endpoint creation request
+    :returns: A set of keys
+    """
+    keys = set()
+
+    def _add_identifiers(identifiers):
+        for identifier in identifiers or ():
+            if identifier.get('DurableName'):
+                keys.add(identifier['DurableName'])
+
+    _add_identifiers(json_doc.get('Identifiers'))
+    for entity in json_doc.get('ConnectedEntities') or ():
+        link = utils.get_resource_identity(entity.get('EntityLink'))
+        if link:
+            keys.add(utils.normalize_identity(link))
+        _add_identifiers(entity.get('Identifiers'))
+    for transport in json_doc.get('IPTransportDetails') or ():
+        for family in ('IPv4Address', 'IPv6Address'):
+            address = (transport.get(family) or {}).get('Address')
+            if address:
+                keys.add(address)
+    return keys
+
+
+class EndpointIndex(rsd_lib_index.ResourceIndex):
+    """A map of lookup keys to endpoint identities
+
+    See ``get_endpoint_keys()`` for the keys an endpoint is indexed by.
+    """
+
+    def get_keys(self, json_doc):
+        return get_endpoint_keys(json_doc)
+
+    def find(self, key):
+        """Return the endpoints indexed by a key
+
+        :param key: A durable name, connected entity link or IP address
+        :returns: A sorted list of endpoint identities
+        """
+        if key.startswith('/'):
+            key = utils.normalize_identity(key)
+        return super(EndpointIndex, self).find(key)
+
+
 class IdentifiersField(base.ListField):
     name_format = base.Field('DurableNameFormat')
     name = base.Field('DurableName')
@@ -46,7 +100,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class Endpoint(base.ResourceBase):
+class Endpoint(rsd_lib_base.ResourceBase):
 
     connected_entities = ConnectedEntitiesField('ConnectedEntities')
     """Entities connected to endpoint"""
@@ -87,7 +141,7 @@ class Endpoint(base.ResourceBase):
                                        redfish_version)
 
 
-class EndpointCollection(base.ResourceCollectionBase):
+class EndpointCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -103,3 +157,34 @@ class EndpointCollection(base.ResourceCollectionBase):
         """
         super(EndpointCollection, self).__init__(connector, path,
                                                  redfish_version)
+
+    def get_endpoint_index(self, concurrency=utils.DEFAULT_CONCURRENCY,
+                           rebuild=False):
+        """Return the index of the endpoints of the collection
+
+        The index is built the first time by loading the endpoints with up
+        to ``concurrency`` parallel requests. It is shared by the
+        collections of the same connector and kept current when endpoints
+        are created or deleted through rsd_lib.
+
+        :param concurrency: The maximum number of endpoints loaded at once
+        :param rebuild: Whether to crawl the endpoints again
+        :returns: An EndpointIndex instance
+        """
+        index = rsd_lib_index.get_index(self._conn, self._path)
+        if index is not None and not rebuild:
+            return index
+
+        index = EndpointIndex()
+        index.sync(self, concurrency=concurrency)
+        rsd_lib_index.set_index(self._conn, self._path, index)
+        return index
+
+    def find_endpoints(self, key):
+        """Return the endpoints matching a lookup key
+
+        :param key: A durable name such as an NQN or iQN, the link to a
+            connected entity or an IP address of the endpoint
+        :returns: A sorted list of endpoint identities
+        """
+        return self.get_endpoint_index().find(key)
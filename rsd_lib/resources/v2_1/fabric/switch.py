@@ -17,6 +17,7 @@ import logging
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 LOG = logging.getLogger(__name__)
@@ -32,7 +33,7 @@ class PortsField(base.CompositeField):
     identity = base.Field('@odata.id')
 
 
-class Switch(base.ResourceBase):
+class Switch(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id')
     """The switch identity"""
@@ -97,7 +98,7 @@ class Switch(base.ResourceBase):
                                      redfish_version)
 
 
-class SwitchCollection(base.ResourceCollectionBase):
+class SwitchCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -13,15 +13,43 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import logging
 
+from sushy import exceptions
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.fabric import endpoint
+from rsd_lib import utils as rsd_lib_utils
 
 LOG = logging.getLogger(__name__)
 
+ZONE_CREATE = 'create'
+ZONE_UPDATE = 'update'
+ZONE_DELETE = 'delete'
+
+ZoneChange = collections.namedtuple(
+    'ZoneChange', ['action', 'zone', 'endpoints', 'added', 'removed'])
+"""A change planned by ZoneCollection.reconcile()
+
+``action`` is one of ZONE_CREATE, ZONE_UPDATE or ZONE_DELETE and ``zone``
+the key of the zone in the desired membership, which is the identity of
+the zone unless it is created. ``endpoints`` is the sorted tuple of the
+desired endpoint identities, ``added`` and ``removed`` are the frozensets
+of endpoints joining and leaving the zone.
+"""
+
+ZoneChangeResult = collections.namedtuple(
+    'ZoneChangeResult', ['change', 'identity', 'error'])
+"""The outcome of a ZoneChange applied by ZoneCollection.reconcile()
+
+``identity`` is the identity of the zone, the new one for created zones,
+and ``error`` the exception raised while applying the change or None.
+"""
+
 
 class ZoneLinksField(base.CompositeField):
     endpoint_identities = base.Field('Endpoints', default=[],
@@ -33,7 +61,7 @@ class StatusField(base.CompositeField):
     health = base.Field('Health')
 
 
-class Zone(base.ResourceBase):
+class Zone(rsd_lib_base.ResourceBase):
 
     description = base.Field('Description')
     """The zone description"""
@@ -64,14 +92,37 @@ class Zone(base.ResourceBase):
     @property
     @utils.cache_it
     def endpoints(self):
-        """Return a list of Endpoints present in the Zone
+        """Return the Endpoints present in the Zone
+
+        The endpoints are loaded on demand: indexing the returned
+        LazyResourceList loads the requested endpoints only, iterating over
+        it loads the missing ones concurrently. Endpoints already loaded by
+        the EndpointCollection of the fabric are reused. Use
+        ``get_endpoints()`` to get a plain list.
 
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return [
-            endpoint.Endpoint(self._conn, id_, self.redfish_version)
-            for id_ in self.links.endpoint_identities]
+        return rsd_lib_base.LazyResourceList(
+            self.links.endpoint_identities, self._get_endpoint)
+
+    def get_endpoints(self):
+        """Return a list of Endpoints present in the Zone
+
+        The endpoints are loaded concurrently, see ``endpoints``.
+
+        :returns: A list of Endpoint objects
+        """
+        return list(self.endpoints)
+
+    def _get_endpoint(self, identity):
+        member = rsd_lib_cache.get_loaded_member(
+            self._conn, endpoint.EndpointCollection, identity)
+        if member is not None:
+            return member
+        return rsd_lib_cache.get_resource(
+            self._conn, endpoint.Endpoint, identity,
+            redfish_version=self.redfish_version)
 
     def update(self, endpoints):
         """Add or remove Endpoints from a Zone
@@ -84,9 +135,10 @@ class Zone(base.ResourceBase):
         data['Endpoints'] = [{'@odata.id': endpoint} for endpoint in endpoints]
 
         self._conn.patch(self.path, data=data)
+        rsd_lib_cache.invalidate(self._conn, self.path)
 
 
-class ZoneCollection(base.ResourceCollectionBase):
+class ZoneCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -102,3 +154,142 @@ class ZoneCollection(base.ResourceCollectionBase):
         """
         super(ZoneCollection, self).__init__(connector, path,
                                              redfish_version)
+
+    def _load_current_zone(self, identity):
+        zone = self.get_member(identity)
+        if rsd_lib_cache.get_cache(self._conn) is not None:
+            # Note: The zone may be served by the resource cache
+            zone.refresh()
+        return zone
+
+    def _get_current_membership(self, concurrency):
+        # Note: The zones may have been changed by another client, the plan
+        # is computed from their current membership.
+        self.refresh(force=True)
+        current = {}
+        for identity, zone, error in rsd_lib_utils.iter_concurrently(
+                self._load_current_zone, self.members_identities,
+                concurrency):
+            if isinstance(error, exceptions.ResourceNotFoundError):
+                LOG.debug('Zone %s was deleted meanwhile', identity)
+                continue
+            elif error is not None:
+                raise error
+            current[rsd_lib_utils.normalize_identity(identity)] = frozenset(
+                rsd_lib_utils.normalize_identity(e)
+                for e in zone.links.endpoint_identities)
+        return current
+
+    def plan_reconcile(self, desired, prune=False,
+                       concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Compute the changes bringing the zones to a desired membership
+
+        The zone collection is refreshed and every zone is loaded again,
+        so the plan reflects the zones created, changed or deleted by other
+        clients.
+
+        :param desired: A dict mapping zones to the endpoint identities
+            they should contain. Keys which are not the identity of an
+            existing zone are zones to create, a value of None deletes the
+            zone.
+        :param prune: Whether to delete the existing zones missing from
+            ``desired``
+        :param concurrency: The maximum number of zones loaded at once
+        :returns: A list of ZoneChange, empty when the zones already have
+            the desired membership
+        :raises: ValueError if a change is not supported by the service
+        :raises: ConnectionError
+        :raises: HTTPError if a zone fails to load for another reason than
+            being deleted
+        """
+        current = self._get_current_membership(concurrency)
+
+        changes = []
+        seen = set()
+        for key in sorted(desired):
+            identity = rsd_lib_utils.normalize_identity(key)
+            seen.add(identity)
+            wanted = desired[key]
+            if wanted is None:
+                if identity in current:
+                    changes.append(ZoneChange(
+                        ZONE_DELETE, key, (), frozenset(), current[identity]))
+                continue
+
+            wanted = frozenset(rsd_lib_utils.normalize_identity(e)
+                               for e in wanted)
+            existing = current.get(identity)
+            if existing is None:
+                changes.append(ZoneChange(
+                    ZONE_CREATE, key, tuple(sorted(wanted)), wanted,
+                    frozenset()))
+            elif wanted != existing:
+                changes.append(ZoneChange(
+                    ZONE_UPDATE, key, tuple(sorted(wanted)),
+                    wanted - existing, existing - wanted))
+
+        if prune:
+            for identity in sorted(set(current) - seen):
+                changes.append(ZoneChange(
+                    ZONE_DELETE, identity, (), frozenset(),
+                    current[identity]))
+
+        actions = set(change.action for change in changes)
+        if ZONE_CREATE in actions and not hasattr(self, 'create_zone'):
+            raise ValueError('Zones can not be created through %s' %
+                             self._path)
+        if ZONE_DELETE in actions and not hasattr(self._resource_type,
+                                                  'delete'):
+            raise ValueError('Zones can not be deleted through %s' %
+                             self._path)
+        return changes
+
+    def _apply_change(self, change):
+        if change.action == ZONE_CREATE:
+            return self.create_zone(list(change.endpoints))
+
+        zone = self.get_member(change.zone)
+        if change.action == ZONE_DELETE:
+            zone.delete()
+        else:
+            zone.update(list(change.endpoints))
+        return zone.path
+
+    def reconcile(self, desired, prune=False, dry_run=False,
+                  concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Bring the zones to a desired endpoint membership
+
+        The current membership of the zones is compared with ``desired``
+        and only the zones which differ are patched, created or deleted,
+        using up to ``concurrency`` concurrent requests. A failed change
+        doesn't stop the others.
+
+        :param desired: A dict mapping zones to the endpoint identities
+            they should contain, see ``plan_reconcile()``
+        :param prune: Whether to delete the existing zones missing from
+            ``desired``
+        :param dry_run: When True nothing is changed and the planned
+            changes are returned instead
+        :param concurrency: The maximum number of concurrent requests
+        :returns: A list of ZoneChangeResult, or a list of ZoneChange when
+            ``dry_run`` is True
+        :raises: ValueError if a change is not supported by the service
+        """
+        changes = self.plan_reconcile(desired, prune=prune,
+                                      concurrency=concurrency)
+        if dry_run or not changes:
+            return changes
+
+        results = []
+        for change, identity, error in rsd_lib_utils.iter_concurrently(
+                self._apply_change, changes, concurrency):
+            if error is not None:
+                LOG.warning('Failed to %(action)s zone %(zone)s: %(error)s',
+                            {'action': change.action, 'zone': change.zone,
+                             'error': error})
+                identity = None if change.action == ZONE_CREATE else (
+                    change.zone)
+            results.append(ZoneChangeResult(change, identity, error))
+
+        self.invalidate()
+        return results
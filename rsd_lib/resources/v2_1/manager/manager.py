@@ -16,6 +16,7 @@
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
@@ -59,7 +60,7 @@ class LinksField(base.CompositeField):
     """The oem options values of links (dict)"""
 
 
-class Manager(base.ResourceBase):
+class Manager(rsd_lib_base.ResourceBase):
     identity = base.Field('Id', required=True)
     """The manager identity string"""
 
@@ -125,7 +126,7 @@ class Manager(base.ResourceBase):
         super(Manager, self).__init__(connector, identity, redfish_version)
 
 
-class ManagerCollection(base.ResourceCollectionBase):
+class ManagerCollection(rsd_lib_base.ResourceCollectionBase):
     @property
     def _resource_type(self):
         return Manager
@@ -0,0 +1,270 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import collections
+import logging
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+SystemRecord = collections.namedtuple(
+    'SystemRecord', ['identity', 'chassis', 'processors', 'memory',
+                     'total_cores', 'total_memory_mib'])
+"""The parts of a computer system relevant to node composition
+
+``processors`` and ``memory`` are tuples of the JSON representations of the
+processors and memory modules of the system. ``total_cores`` and
+``total_memory_mib`` are None when the system doesn't report them. Every
+field but ``identity`` is None for a system which could not be loaded,
+see ``build_unknown_system_record()``.
+"""
+
+
+def _identities(links):
+    return frozenset(rsd_lib_utils.get_resource_identity(link)
+                     for link in links or ())
+
+
+def _oem(json_doc):
+    return (json_doc.get('Oem') or {}).get('Intel_RackScale') or {}
+
+
+def _total(devices, attr):
+    """Sum an attribute of devices, None if it is unknown for any of them"""
+    values = [device.get(attr) for device in devices]
+    if not values or None in values:
+        return None
+    return sum(values)
+
+
+def build_system_record(system_json, processors_json, memory_json):
+    """Summarize a computer system for the feasibility checks
+
+    :param system_json: The JSON representation of the system
+    :param processors_json: The JSON representations of its processors
+    :param memory_json: The JSON representations of its memory modules
+    :returns: A SystemRecord
+    """
+    processors = tuple(processors_json)
+    memory = tuple(memory_json)
+
+    total_memory_mib = _total(memory, 'CapacityMiB')
+    if total_memory_mib is None:
+        summary_gib = (system_json.get('MemorySummary') or {}).get(
+            'TotalSystemMemoryGiB')
+        if summary_gib is not None:
+            total_memory_mib = summary_gib * 1024
+
+    return SystemRecord(
+        identity=system_json.get('@odata.id'),
+        chassis=_identities((system_json.get('Links') or {}).get('Chassis')),
+        processors=processors,
+        memory=memory,
+        total_cores=_total(processors, 'TotalCores'),
+        total_memory_mib=total_memory_mib)
+
+
+def build_unknown_system_record(identity):
+    """Summarize a computer system which could not be loaded
+
+    Nothing is known about the system, it matches any requirement.
+
+    :param identity: The identity of the system
+    :returns: A SystemRecord
+    """
+    return SystemRecord(identity=identity, chassis=None, processors=None,
+                        memory=None, total_cores=None, total_memory_mib=None)
+
+
+def _at_least(required, available):
+    # Note: Unknown values are assumed to satisfy the requirement, the
+    # check must never reject a request the service could satisfy.
+    return available is None or available >= required
+
+
+def _same(required, available):
+    return available is None or available == required
+
+
+def _linked(required, identity):
+    return rsd_lib_utils.get_resource_identity(required) == identity
+
+
+def _processor_matches(req, processor, system):
+    oem_req = req.get('Oem') or {}
+    oem = _oem(processor)
+    capabilities = oem.get('Capabilities')
+    model = processor.get('Model')
+    if 'Model' in req and model and req['Model'] not in model:
+        return False
+    if 'TotalCores' in req and not _at_least(
+            req['TotalCores'], processor.get('TotalCores')):
+        return False
+    if 'AchievableSpeedMHz' in req and not _at_least(
+            req['AchievableSpeedMHz'], processor.get('MaxSpeedMHz')):
+        return False
+    if 'InstructionSet' in req and not _same(
+            req['InstructionSet'], processor.get('InstructionSet')):
+        return False
+    if 'ProcessorType' in req and not _same(
+            req['ProcessorType'], processor.get('ProcessorType')):
+        return False
+    if 'Brand' in oem_req and not _same(oem_req['Brand'], oem.get('Brand')):
+        return False
+    if 'Capabilities' in oem_req and capabilities is not None:
+        if not set(oem_req['Capabilities']).issubset(capabilities):
+            return False
+    if 'Resource' in req and not _linked(req['Resource'],
+                                         processor.get('@odata.id')):
+        return False
+    return _in_chassis(req, system)
+
+
+def _in_chassis(req, system):
+    if 'Chassis' not in req or system.chassis is None:
+        return True
+    return rsd_lib_utils.get_resource_identity(req['Chassis']) in (
+        system.chassis)
+
+
+def _memory_matches(req, memory, system):
+    speed = memory.get('OperatingSpeedMhz')
+    if memory.get('AllowedSpeedsMHz'):
+        speed = max(memory['AllowedSpeedsMHz'])
+    if 'CapacityMiB' in req and not _at_least(
+            req['CapacityMiB'], memory.get('CapacityMiB')):
+        return False
+    if 'MemoryDeviceType' in req and not _same(
+            req['MemoryDeviceType'], memory.get('MemoryDeviceType')):
+        return False
+    if 'SpeedMHz' in req and not _at_least(req['SpeedMHz'], speed):
+        return False
+    if 'Manufacturer' in req and not _same(
+            req['Manufacturer'], memory.get('Manufacturer')):
+        return False
+    if 'DataWidthBits' in req and not _same(
+            req['DataWidthBits'], memory.get('DataWidthBits')):
+        return False
+    if 'Resource' in req and not _linked(req['Resource'],
+                                         memory.get('@odata.id')):
+        return False
+    return _in_chassis(req, system)
+
+
+def _assign(reqs, devices, matches, system, used=()):
+    """Find a distinct device satisfying each requirement
+
+    :returns: True if every requirement can be given its own device, or
+        when the devices are unknown
+    """
+    if not reqs or devices is None:
+        return True
+    for index, device in enumerate(devices):
+        if index not in used and matches(reqs[0], device, system):
+            if _assign(reqs[1:], devices, matches, system,
+                       used + (index,)):
+                return True
+    return False
+
+
+class Inventory(object):
+    """An indexed snapshot of the computer systems free for composition
+
+    The checks are conservative: a request is only rejected when no free
+    system of the snapshot can satisfy it, values missing from the
+    snapshot are assumed to match. In particular a system whose total
+    cores or memory are unknown is never filtered out by the total core
+    or memory requirements, and a system which could not be loaded
+    matches any request.
+    """
+
+    def __init__(self, systems):
+        """A class representing an inventory snapshot
+
+        :param systems: A list of SystemRecord of the free systems
+        """
+        self._by_cores = sorted(
+            (s for s in systems if s.total_cores is not None),
+            key=lambda s: s.total_cores)
+        self._cores = [s.total_cores for s in self._by_cores]
+        self._unknown_cores = [s for s in systems if s.total_cores is None]
+
+    def __len__(self):
+        return len(self._by_cores) + len(self._unknown_cores)
+
+    @classmethod
+    def load(cls, system_collection, nodes,
+             concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Take a snapshot of the systems not used by composed nodes
+
+        The systems which fail to load are logged and kept as unknown
+        systems matching any request.
+
+        :param system_collection: A SystemCollection instance
+        :param nodes: The existing composed nodes
+        :param concurrency: The maximum number of systems loaded at once
+        :returns: An Inventory instance
+        """
+        used = set(node.links.system.rstrip('/') for node in nodes
+                   if node.links.system)
+        identities = [identity for identity in
+                      system_collection.members_identities
+                      if identity.rstrip('/') not in used]
+
+        def _load(identity):
+            system = system_collection.get_member(identity)
+            return build_system_record(
+                system._json,
+                [p._json for p in system.processors.get_members()],
+                [m._json for m in system.memory.get_members()])
+
+        loaded = dict(rsd_lib_utils.crawl(
+            _load, identities, 'the inventory details, assuming it matches '
+            'any request', concurrency))
+        return cls([loaded[identity] if identity in loaded
+                    else build_unknown_system_record(identity)
+                    for identity in identities])
+
+    def find_systems(self, processor_req=None, memory_req=None,
+                     total_system_core_req=None,
+                     total_system_memory_req=None):
+        """Return the free systems which may satisfy a composition request
+
+        The arguments have the same meaning as the ``compose_node()`` ones.
+
+        :returns: A list of the identities of the candidate systems, empty
+            when the request can't be satisfied. The systems whose total
+            cores are known come first, sorted by total cores.
+        """
+        start = 0
+        if total_system_core_req:
+            start = bisect.bisect_left(self._cores, total_system_core_req)
+
+        candidates = []
+        for system in self._by_cores[start:] + self._unknown_cores:
+            if total_system_memory_req and not _at_least(
+                    total_system_memory_req, system.total_memory_mib):
+                continue
+            if processor_req and not _assign(
+                    processor_req, system.processors, _processor_matches,
+                    system):
+                continue
+            if memory_req and not _assign(
+                    memory_req, system.memory, _memory_matches, system):
+                continue
+            candidates.append(system.identity)
+        return candidates
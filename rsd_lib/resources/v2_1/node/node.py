@@ -13,23 +13,63 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from jsonschema import validate
+import collections
+from concurrent import futures
 import logging
+import random
+import threading
+import time
 
 from sushy import exceptions
 from sushy.resources import base
 from sushy.resources import common
-from sushy.resources.system import system
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.node import constants as node_cons
+from rsd_lib.resources.v2_1.node import inventory as node_inventory
 from rsd_lib.resources.v2_1.node import mappings as node_maps
 from rsd_lib.resources.v2_1.node import schemas as node_schemas
+from rsd_lib.resources.v2_1.system import system as v2_1_system
+from rsd_lib import task_monitor as rsd_lib_task_monitor
 from rsd_lib import utils as rsd_lib_utils
+from rsd_lib import validation as rsd_lib_validation
 
 
 LOG = logging.getLogger(__name__)
 
+ComposeNodeResult = collections.namedtuple(
+    'ComposeNodeResult', ['spec', 'path', 'state', 'error', 'timings'])
+"""The outcome of the composition of one node by compose_nodes()
+
+``path`` is None when the node could not be allocated, ``state`` is the
+last ComposedNodeState seen and ``error`` the exception which interrupted
+the composition, if any. When a node is allocated but fails to assemble,
+``path`` is still set and ``state`` is None if the node was deleted by the
+rollback. ``timings`` maps the 'allocate', 'assemble' and 'settle' steps to
+their duration in seconds, and 'total' to the duration of the whole
+compose_nodes() call, the same for every node.
+"""
+
+_SETTLED_STATES = (node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+                   node_cons.COMPOSED_NODE_STATE_ASSEMBLED,
+                   node_cons.COMPOSED_NODE_STATE_FAILED)
+
+DEFAULT_MAX_POLL_INTERVAL = 30
+"""Default maximum number of seconds between two polls of a node"""
+
+POLL_JITTER = 0.2
+"""Relative random jitter applied to the interval between two node polls"""
+
+
+def _resolve(future, result=None, error=None):
+    future.resolved_at = time.time()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
 
 class AssembleActionField(base.CompositeField):
     target_uri = base.Field('target', required=True)
@@ -136,7 +176,7 @@ class LinksField(base.CompositeField):
     """Link to remote drives of this node"""
 
 
-class Node(base.ResourceBase):
+class Node(rsd_lib_base.ResourceBase):
 
     boot = BootField('Boot', required=True)
     """A dictionary containg the current boot device, frequency and mode"""
@@ -234,10 +274,15 @@ class Node(base.ResourceBase):
         self._conn.post(target_uri, data={'ResetType': value})
 
     def assemble_node(self):
-        """Assemble the composed node."""
+        """Assemble the composed node.
+
+        :returns: A TaskMonitor instance following the assembly when the
+            service runs it in the background
+        """
         target_uri = self._get_assemble_action_element().target_uri
 
-        self._conn.post(target_uri)
+        resp = self._conn.post(target_uri)
+        return rsd_lib_task_monitor.TaskMonitor.from_response(self._conn, resp)
 
     def get_allowed_node_boot_source_values(self):
         """Get the allowed values for changing the boot source.
@@ -300,6 +345,14 @@ class Node(base.ResourceBase):
                 node_maps.BOOT_SOURCE_MODE_MAP_REV[mode])
 
         self._conn.patch(self.path, data=data)
+        rsd_lib_cache.invalidate(self._conn, self.path)
+
+    @property
+    def _system_type(self):
+        # Note: The System class of the API version, so the system is
+        # shared in the resource cache with get_system() and
+        # SystemCollection.get_member()
+        return v2_1_system.System
 
     def _get_system_path(self):
         """Helper function to find the System path"""
@@ -314,8 +367,8 @@ class Node(base.ResourceBase):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return system.System(
-            self._conn, self._get_system_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, self._system_type, self._get_system_path(),
             redfish_version=self.redfish_version)
 
     def _get_attach_endpoint_action_element(self):
@@ -402,11 +455,16 @@ class Node(base.ResourceBase):
         shutdown is sent to the computer system, all VLANs except reserved ones
         are removed from associated ethernet switch ports, the computer system
         is deallocated and the remote target is deallocated.
+
+        :returns: A TaskMonitor instance following the deletion when the
+            service runs it in the background
         """
-        self._conn.delete(self.path)
+        resp = self._conn.delete(self.path)
+        rsd_lib_cache.invalidate_member(self._conn, self.path)
+        return rsd_lib_task_monitor.TaskMonitor.from_response(self._conn, resp)
 
 
-class NodeCollection(base.ResourceCollectionBase):
+class NodeCollection(rsd_lib_base.ResourceCollectionBase):
 
     _actions = NodeCollectionActionsField('Actions', required=True)
 
@@ -448,38 +506,41 @@ class NodeCollection(base.ResourceCollectionBase):
             request['Description'] = description
 
         if processor_req is not None:
-            validate(processor_req,
-                     node_schemas.processor_req_schema)
+            rsd_lib_validation.validate(
+                processor_req, node_schemas.processor_req_schema)
             request['Processors'] = processor_req
 
         if memory_req is not None:
-            validate(memory_req,
-                     node_schemas.memory_req_schema)
+            rsd_lib_validation.validate(
+                memory_req, node_schemas.memory_req_schema)
             request['Memory'] = memory_req
 
         if remote_drive_req is not None:
-            validate(remote_drive_req,
-                     node_schemas.remote_drive_req_schema)
+            rsd_lib_validation.validate(
+                remote_drive_req, node_schemas.remote_drive_req_schema)
             request['RemoteDrives'] = remote_drive_req
 
         if local_drive_req is not None:
-            validate(local_drive_req,
-                     node_schemas.local_drive_req_schema)
+            rsd_lib_validation.validate(
+                local_drive_req, node_schemas.local_drive_req_schema)
             request['LocalDrives'] = local_drive_req
 
         if ethernet_interface_req is not None:
-            validate(ethernet_interface_req,
-                     node_schemas.ethernet_interface_req_schema)
+            rsd_lib_validation.validate(
+                ethernet_interface_req,
+                node_schemas.ethernet_interface_req_schema)
             request['EthernetInterfaces'] = ethernet_interface_req
 
         if total_system_core_req is not None:
-            validate(total_system_core_req,
-                     node_schemas.total_system_core_req_schema)
+            rsd_lib_validation.validate(
+                total_system_core_req,
+                node_schemas.total_system_core_req_schema)
             request['TotalSystemCoreCount'] = total_system_core_req
 
         if total_system_memory_req is not None:
-            validate(total_system_memory_req,
-                     node_schemas.total_system_memory_req_schema)
+            rsd_lib_validation.validate(
+                total_system_memory_req,
+                node_schemas.total_system_memory_req_schema)
             request['TotalSystemMemoryMiB'] = total_system_memory_req
 
         return request
@@ -515,7 +576,6 @@ class NodeCollection(base.ResourceCollectionBase):
 
         'memory_req' and 'total_system_memory_req' is the same.
         """
-        target_uri = self._get_compose_action_element().target_uri
         properties = self._create_compose_request(
             name=name, description=description,
             processor_req=processor_req,
@@ -525,7 +585,288 @@ class NodeCollection(base.ResourceCollectionBase):
             ethernet_interface_req=ethernet_interface_req,
             total_system_core_req=total_system_core_req,
             total_system_memory_req=total_system_memory_req)
+        return self._compose(properties)
+
+    def _compose(self, properties):
+        target_uri = self._get_compose_action_element().target_uri
         resp = self._conn.post(target_uri, data=properties)
+        rsd_lib_cache.invalidate(self._conn, self._path)
+        # The composed node takes a system out of the free inventory
+        self._cache_inventory = None
         LOG.info("Node created at %s", resp.headers['Location'])
         node_url = resp.headers['Location']
         return node_url[node_url.find(self._path):]
+
+    def get_inventory(self, system_collection,
+                      concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Return a snapshot of the systems free for composition
+
+        The snapshot is taken on the first call and reused until the
+        collection is refreshed or a node is composed through it.
+
+        :param system_collection: A SystemCollection instance
+        :param concurrency: The maximum number of resources loaded at once
+        :returns: An Inventory instance
+        """
+        if getattr(self, '_cache_inventory', None) is None:
+            self._cache_inventory = node_inventory.Inventory.load(
+                system_collection, self.get_members(concurrency=concurrency),
+                concurrency=concurrency)
+            utils.setdefaultattr(self, utils.CACHE_ATTR_NAMES_VAR_NAME,
+                                 set()).add('_cache_inventory')
+        return self._cache_inventory
+
+    def check_feasibility(self, system_collection, processor_req=None,
+                          memory_req=None, total_system_core_req=None,
+                          total_system_memory_req=None):
+        """Check a composition request against the free systems
+
+        The request is evaluated locally against ``get_inventory()``, so a
+        request no free system can satisfy is rejected without sending an
+        Allocate request. The check is conservative, a feasible result
+        doesn't guarantee the composition succeeds.
+
+        :param system_collection: A SystemCollection instance
+        :param processor_req: JSON for node processors
+        :param memory_req: JSON for node memory modules
+        :param total_system_core_req: Total processor cores available in
+            composed node
+        :param total_system_memory_req: Total memory available in composed node
+        :returns: A list of the identities of the free systems which may
+            satisfy the request, empty when the request is not feasible
+        :raises: ValidationError if a requirement is invalid
+        """
+        self._create_compose_request(
+            processor_req=processor_req, memory_req=memory_req,
+            total_system_core_req=total_system_core_req,
+            total_system_memory_req=total_system_memory_req)
+        return self.get_inventory(system_collection).find_systems(
+            processor_req=processor_req, memory_req=memory_req,
+            total_system_core_req=total_system_core_req,
+            total_system_memory_req=total_system_memory_req)
+
+    def _allocate(self, properties, assemble, rollback):
+        timings = {}
+        start = time.time()
+        path = self._compose(properties)
+        node = None
+        try:
+            node = self.get_member(path)
+            timings['allocate'] = time.time() - start
+
+            if assemble:
+                step = time.time()
+                node.assemble_node()
+                timings['assemble'] = time.time() - step
+        except Exception as e:
+            LOG.warning('Failed to assemble node %(node)s: %(error)s',
+                        {'node': path, 'error': e})
+            if rollback and self._delete_allocated(path, node):
+                node = None
+            return path, node, timings, e
+        return path, node, timings, None
+
+    def _delete_allocated(self, path, node):
+        try:
+            if node is not None:
+                node.delete_node()
+            else:
+                self._conn.delete(path)
+                rsd_lib_cache.invalidate_member(self._conn, path)
+        except Exception as e:
+            LOG.warning('Failed to delete node %(node)s which is allocated '
+                        'but not assembled: %(error)s',
+                        {'node': path, 'error': e})
+            return False
+        LOG.info('Deleted node %s which failed to assemble', path)
+        return True
+
+    def compose_nodes(self, specs,
+                      concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                      assemble=True, timeout=600, poll_interval=5,
+                      rollback=True):
+        """Compose many nodes concurrently
+
+        Every spec is validated before the first request is sent, so an
+        invalid spec doesn't leave part of the nodes composed. Then each
+        node is allocated and optionally assembled using up to
+        ``concurrency`` threads, and all the nodes are polled together by
+        ``wait_for_nodes()`` until their ComposedNodeState settles.
+
+        :param specs: A list of dicts of ``compose_node()`` arguments
+        :param concurrency: The maximum number of concurrent requests
+        :param assemble: Whether to assemble the nodes once allocated
+        :param timeout: The maximum number of seconds to wait for the state
+            of the nodes to settle
+        :param poll_interval: The initial number of seconds between two
+            refreshes of a node which is still allocating or assembling
+        :param rollback: Whether to delete a node which is allocated but
+            fails to assemble. When False, or when the deletion fails, the
+            node is left allocated and its state is reported.
+        :returns: A list of ComposeNodeResult, in the order of ``specs``
+        :raises: ValidationError if a spec is invalid
+        :raises: MissingActionError if the collection can't compose nodes
+        """
+        specs = list(specs)
+        requests = [self._create_compose_request(**spec) for spec in specs]
+        self._get_compose_action_element()
+
+        start = time.time()
+        allocations = list(rsd_lib_utils.iter_concurrently(
+            lambda properties: self._allocate(properties, assemble,
+                                              rollback),
+            requests, concurrency))
+
+        if assemble:
+            target_states = (node_cons.COMPOSED_NODE_STATE_ASSEMBLED,
+                             node_cons.COMPOSED_NODE_STATE_FAILED)
+        else:
+            target_states = (node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+                             node_cons.COMPOSED_NODE_STATE_FAILED)
+        nodes = dict((allocation[0], allocation[1])
+                     for _, allocation, error in allocations
+                     if error is None and allocation[3] is None)
+        settle_start = time.time()
+        waiters = self._wait_for_nodes(nodes, target_states, timeout,
+                                       concurrency, poll_interval)
+        futures.wait(waiters.values())
+        total = time.time() - start
+
+        results = []
+        for spec, (_, allocation, error) in zip(specs, allocations):
+            if error is not None:
+                LOG.warning('Failed to compose a node: %s', error)
+                results.append(ComposeNodeResult(
+                    spec, None, None, error, {'total': total}))
+                continue
+
+            path, node, timings, error = allocation
+            if error is not None:
+                timings['total'] = total
+                results.append(ComposeNodeResult(
+                    spec, path,
+                    None if node is None else node.composed_node_state,
+                    error, timings))
+                continue
+
+            waiter = waiters[path]
+            timings['settle'] = waiter.resolved_at - settle_start
+            timings['total'] = total
+            error = waiter.exception()
+            if isinstance(error, futures.TimeoutError):
+                # Note: The node state is still reported on timeout
+                LOG.warning('%s', error)
+                error = None
+            results.append(ComposeNodeResult(
+                spec, path, node.composed_node_state, error, timings))
+        return results
+
+    def wait_for_nodes(self, node_ids, target_states=_SETTLED_STATES,
+                       timeout=600,
+                       concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                       poll_interval=1,
+                       max_poll_interval=DEFAULT_MAX_POLL_INTERVAL):
+        """Wait for nodes to reach one of the target ComposedNodeStates
+
+        A single background thread polls all the nodes. The refreshes which
+        are due are issued together through a pool of ``concurrency``
+        threads, and the interval between two refreshes of a node doubles,
+        with some random jitter, up to ``max_poll_interval``.
+
+        :param node_ids: The identities of the nodes to wait for
+        :param target_states: The composed node states ending the wait
+        :param timeout: The maximum number of seconds to wait
+        :param concurrency: The maximum number of concurrent refreshes
+        :param poll_interval: The initial number of seconds between two
+            refreshes of a node
+        :param max_poll_interval: The maximum number of seconds between two
+            refreshes of a node
+        :returns: A dict mapping each node identity to a Future. It resolves
+            to the refreshed Node once it reaches a target state, or fails
+            with the error raised while refreshing it, or with
+            ``concurrent.futures.TimeoutError`` when ``timeout`` expires.
+        """
+        nodes = dict((node_id, None) for node_id in node_ids)
+        return self._wait_for_nodes(nodes, target_states, timeout,
+                                    concurrency, poll_interval,
+                                    max_poll_interval)
+
+    def _wait_for_nodes(self, nodes, target_states, timeout, concurrency,
+                        poll_interval,
+                        max_poll_interval=DEFAULT_MAX_POLL_INTERVAL):
+        waiters = {}
+        for node_id in nodes:
+            waiter = waiters[node_id] = futures.Future()
+            waiter.set_running_or_notify_cancel()
+
+        if nodes:
+            poller = threading.Thread(
+                target=self._poll_nodes, name='rsd-lib-node-poller',
+                args=(nodes, waiters, frozenset(target_states),
+                      time.time() + timeout, concurrency, poll_interval,
+                      max_poll_interval))
+            poller.daemon = True
+            poller.start()
+        return waiters
+
+    def _refresh_node(self, node_id, node):
+        if node is None:
+            # Note: Don't trust a cached node, its state may be outdated
+            node = self._resource_type(self._conn, node_id,
+                                       redfish_version=self.redfish_version)
+            rsd_lib_cache.add(self._conn, node, self._resource_type)
+        else:
+            node.refresh()
+        return node
+
+    def _poll_nodes(self, nodes, waiters, target_states, deadline,
+                    concurrency, poll_interval, max_poll_interval):
+        # Note: node identity -> [node, time of next poll, poll interval]
+        pending = dict((node_id, [node, 0, poll_interval])
+                       for node_id, node in nodes.items())
+        executor = futures.ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            while pending:
+                now = time.time()
+                refreshes = dict(
+                    (executor.submit(self._refresh_node, node_id, entry[0]),
+                     node_id)
+                    for node_id, entry in pending.items() if entry[1] <= now)
+
+                for refresh in futures.as_completed(refreshes):
+                    node_id = refreshes[refresh]
+                    entry = pending[node_id]
+                    try:
+                        entry[0] = refresh.result()
+                    except Exception as e:
+                        del pending[node_id]
+                        _resolve(waiters[node_id], error=e)
+                        continue
+
+                    if entry[0].composed_node_state in target_states:
+                        del pending[node_id]
+                        _resolve(waiters[node_id], entry[0])
+                        continue
+
+                    entry[1] = time.time() + entry[2] * random.uniform(
+                        1 - POLL_JITTER, 1 + POLL_JITTER)
+                    entry[2] = min(entry[2] * 2, max_poll_interval)
+
+                if not pending:
+                    break
+
+                now = time.time()
+                if now >= deadline:
+                    for node_id, entry in pending.items():
+                        state = None
+                        if entry[0] is not None:
+                            state = entry[0].composed_node_state
+                        _resolve(waiters[node_id], error=futures.TimeoutError(
+                            'Node %s is still %s after the wait timed out'
+                            % (node_id, state)))
+                    break
+
+                next_poll = min(entry[1] for entry in pending.values())
+                time.sleep(max(0, min(next_poll, deadline) - now))
+        finally:
+            executor.shutdown(wait=False)
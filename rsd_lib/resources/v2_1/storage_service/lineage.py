@@ -0,0 +1,292 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import threading
+
+from sushy import exceptions
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+REMOTE_TARGET = 'remote_target'
+LOGICAL_DRIVE = 'logical_drive'
+PHYSICAL_DRIVE = 'physical_drive'
+
+
+def _link_identity(link):
+    if isinstance(link, dict):
+        link = link.get('@odata.id')
+    return rsd_lib_utils.normalize_identity(link) if link else None
+
+
+def get_edges(kind, identity, json_doc):
+    """Return the dependencies described by a storage resource
+
+    A remote target depends on the logical drives it exposes. A logical
+    drive depends on the drives listed in its LogicalDrives, PhysicalDrives
+    and MasterDrive links, and the drives in its UsedBy and Targets links
+    depend on it.
+
+    :param kind: REMOTE_TARGET, LOGICAL_DRIVE or PHYSICAL_DRIVE
+    :param identity: The identity of the resource
+    :param json_doc: The JSON representation of the resource
+    :returns: A frozenset of ``(resource, dependency)`` identity pairs
+    """
+    identity = rsd_lib_utils.normalize_identity(identity)
+    dependencies = []
+    users = []
+    if kind == REMOTE_TARGET:
+        for address in json_doc.get('Addresses') or ():
+            iscsi = (address or {}).get('iSCSI') or {}
+            for lun in iscsi.get('TargetLUN') or ():
+                dependencies.append((lun or {}).get('LogicalDrive'))
+    elif kind == LOGICAL_DRIVE:
+        links = json_doc.get('Links') or {}
+        dependencies.extend(links.get('LogicalDrives') or ())
+        dependencies.extend(links.get('PhysicalDrives') or ())
+        dependencies.append(links.get('MasterDrive'))
+        users.extend(links.get('UsedBy') or ())
+        users.extend(links.get('Targets') or ())
+
+    edges = set()
+    for link in dependencies:
+        dependency = _link_identity(link)
+        if dependency and dependency != identity:
+            edges.add((identity, dependency))
+    for link in users:
+        user = _link_identity(link)
+        if user and user != identity:
+            edges.add((user, identity))
+    return frozenset(edges)
+
+
+class StorageLineage(object):
+    """The dependency graph of the storage resources of a storage service
+
+    The graph links the remote targets to the logical drives they expose
+    and the logical drives to the logical and physical drives they are
+    built on. It is built by a single parallel crawl and answers the
+    forward (what a resource is built on) and reverse (what is built on a
+    resource) queries from memory. The answers are memoized, a change only
+    drops the memoized answers of the resources connected to it.
+    """
+
+    def __init__(self, storage_service,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """A class representing a storage lineage
+
+        The graph is empty until ``refresh()`` is called.
+
+        :param storage_service: A StorageService instance
+        :param concurrency: The maximum number of resources loaded at once
+        """
+        self._service = storage_service
+        self._concurrency = concurrency
+        self._loaded = False
+        self._lock = threading.RLock()
+        # Note: Identity -> (kind, resource)
+        self._resources = {}
+        # Note: Identity -> edges read from the resource
+        self._sources = {}
+        # Note: An edge is kept while one of the resources it was read from
+        # still describes it.
+        self._edge_counts = collections.Counter()
+        self._dependencies = collections.defaultdict(set)
+        self._users = collections.defaultdict(set)
+        self._forward = {}
+        self._reverse = {}
+
+    def __len__(self):
+        return len(self._resources)
+
+    def __contains__(self, identity):
+        return rsd_lib_utils.normalize_identity(identity) in self._resources
+
+    def _get_collections(self):
+        return [(REMOTE_TARGET, lambda: self._service.remote_targets),
+                (LOGICAL_DRIVE, lambda: self._service.logical_drives),
+                (PHYSICAL_DRIVE, lambda: self._service.physical_drives)]
+
+    def _load_collection(self, item):
+        kind, getter = item
+        col = getter()
+        if self._loaded:
+            col.refresh()
+        return col
+
+    def _load_resource(self, item):
+        kind, col, identity = item
+        entry = self._resources.get(rsd_lib_utils.normalize_identity(identity))
+        if entry is None:
+            return col.get_member(identity)
+        entry[1].refresh()
+        return entry[1]
+
+    def _crawl(self, items, func):
+        return rsd_lib_utils.crawl(func, items, 'the storage lineage',
+                                   self._concurrency)
+
+    def refresh(self):
+        """Load the remote targets, logical drives and physical drives
+
+        The first call crawls every resource in parallel. Later calls
+        refresh the collections and the known resources with conditional
+        requests and only load the added resources. The memoized answers
+        are dropped for the resources connected to the ones which changed.
+        Resources which fail to load are logged and left out of the graph.
+        """
+        with self._lock:
+            cols = self._crawl(self._get_collections(), self._load_collection)
+            items = [(item[0], col, identity) for item, col in cols
+                     for identity in col.members_identities]
+            resources = self._crawl(items, self._load_resource)
+            self._loaded = True
+
+            loaded = dict(
+                (rsd_lib_utils.normalize_identity(item[2]),
+                 (item[0], resource))
+                for item, resource in resources)
+            for identity in set(self._resources) - set(loaded):
+                self._update(identity, None)
+            for identity, entry in loaded.items():
+                self._update(identity, entry)
+
+    def invalidate(self, *identities):
+        """Reload resources known to have changed
+
+        Only the given resources are fetched again. A resource which no
+        longer exists is removed from the graph. Use ``refresh()`` to pick
+        up added resources.
+
+        :param identities: The identities of the resources
+        :raises: ConnectionError
+        :raises: HTTPError
+        """
+        with self._lock:
+            for identity in identities:
+                identity = rsd_lib_utils.normalize_identity(identity)
+                entry = self._resources.get(identity)
+                if entry is None:
+                    continue
+                try:
+                    entry[1].refresh()
+                except exceptions.ResourceNotFoundError as e:
+                    LOG.debug('Removing %(identity)s from the storage '
+                              'lineage: %(error)s',
+                              {'identity': identity, 'error': e})
+                    entry = None
+                self._update(identity, entry)
+
+    def _update(self, identity, entry):
+        # Note: The memoized answers hold the reachable resources, their
+        # kind is only checked when answering, so they only depend on the
+        # edges.
+        previous = self._sources.pop(identity, frozenset())
+        if entry is None:
+            self._resources.pop(identity, None)
+            edges = frozenset()
+        else:
+            self._resources[identity] = entry
+            edges = self._sources[identity] = get_edges(
+                entry[0], identity, entry[1]._json)
+        if edges == previous:
+            return
+
+        changed = edges ^ previous
+        self._forget_answers(changed)
+        for edge in previous - edges:
+            self._edge_counts[edge] -= 1
+            if self._edge_counts[edge] <= 0:
+                del self._edge_counts[edge]
+                self._dependencies[edge[0]].discard(edge[1])
+                self._users[edge[1]].discard(edge[0])
+        for edge in edges - previous:
+            self._edge_counts[edge] += 1
+            self._dependencies[edge[0]].add(edge[1])
+            self._users[edge[1]].add(edge[0])
+        # Note: Called again as removed edges no longer connect the graph
+        # and added edges didn't connect it before.
+        self._forget_answers(changed)
+
+    def _forget_answers(self, edges):
+        # Note: Only the forward answers of the resources built on the
+        # source of a changed edge and the reverse answers of the resources
+        # its target is built on are stale, the others are kept.
+        sources = set(edge[0] for edge in edges)
+        targets = set(edge[1] for edge in edges)
+        for node in self._closure(sources, self._users):
+            self._forward.pop(node, None)
+        for node in self._closure(targets, self._dependencies):
+            self._reverse.pop(node, None)
+
+    @staticmethod
+    def _closure(start, adjacency):
+        seen = set(start)
+        stack = list(start)
+        while stack:
+            for node in adjacency.get(stack.pop(), ()):
+                if node not in seen:
+                    seen.add(node)
+                    stack.append(node)
+        return seen
+
+    def _query(self, identity, answers, adjacency, kind):
+        identity = rsd_lib_utils.normalize_identity(identity)
+        with self._lock:
+            reachable = answers.get(identity)
+            if reachable is None:
+                reachable = answers[identity] = frozenset(
+                    self._closure([identity], adjacency) - set([identity]))
+            return sorted(node for node in reachable
+                          if self._resources.get(node, (None,))[0] == kind)
+
+    def get_physical_drives(self, identity):
+        """Return the physical drives backing a resource
+
+        :param identity: The identity of a remote target or logical drive
+        :returns: A sorted list of physical drive identities
+        """
+        return self._query(identity, self._forward, self._dependencies,
+                           PHYSICAL_DRIVE)
+
+    def get_logical_drives(self, identity):
+        """Return the logical drives a remote target is built on
+
+        :param identity: The identity of a remote target or logical drive
+        :returns: A sorted list of logical drive identities
+        """
+        return self._query(identity, self._forward, self._dependencies,
+                           LOGICAL_DRIVE)
+
+    def get_remote_targets(self, identity):
+        """Return the remote targets exposing a drive
+
+        :param identity: The identity of a physical or logical drive
+        :returns: A sorted list of remote target identities
+        """
+        return self._query(identity, self._reverse, self._users,
+                           REMOTE_TARGET)
+
+    def get_dependent_logical_drives(self, identity):
+        """Return the logical drives built on a drive
+
+        :param identity: The identity of a physical or logical drive
+        :returns: A sorted list of logical drive identities
+        """
+        return self._query(identity, self._reverse, self._users,
+                           LOGICAL_DRIVE)
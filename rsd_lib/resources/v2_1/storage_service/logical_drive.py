@@ -17,6 +17,8 @@ import logging
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
+
 LOG = logging.getLogger(__name__)
 
 
@@ -26,7 +28,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class LogicalDrive(base.ResourceBase):
+class LogicalDrive(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The logical drive identity string"""
@@ -67,7 +69,7 @@ class LogicalDrive(base.ResourceBase):
                                            redfish_version)
 
 
-class LogicalDriveCollection(base.ResourceCollectionBase):
+class LogicalDriveCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -17,6 +17,8 @@ import logging
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
+
 LOG = logging.getLogger(__name__)
 
 
@@ -49,7 +51,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class RemoteTarget(base.ResourceBase):
+class RemoteTarget(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The target identity string"""
@@ -76,7 +78,7 @@ class RemoteTarget(base.ResourceBase):
                                            redfish_version)
 
 
-class RemoteTargetCollection(base.ResourceCollectionBase):
+class RemoteTargetCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
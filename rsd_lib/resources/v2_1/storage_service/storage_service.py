@@ -18,9 +18,13 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib.resources.v2_1.storage_service import lineage
 from rsd_lib.resources.v2_1.storage_service import logical_drive
 from rsd_lib.resources.v2_1.storage_service import physical_drive
 from rsd_lib.resources.v2_1.storage_service import remote_target
+from rsd_lib import utils as rsd_lib_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -31,7 +35,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class StorageService(base.ResourceBase):
+class StorageService(rsd_lib_base.ResourceBase):
 
     description = base.Field('Description')
     """The storage service description"""
@@ -68,8 +72,9 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return logical_drive.LogicalDriveCollection(
-            self._conn, self._get_logical_drive_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, logical_drive.LogicalDriveCollection,
+            self._get_logical_drive_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_physical_drive_collection_path(self):
@@ -84,8 +89,9 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return physical_drive.PhysicalDriveCollection(
-            self._conn, self._get_physical_drive_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, physical_drive.PhysicalDriveCollection,
+            self._get_physical_drive_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_remote_target_collection_path(self):
@@ -100,12 +106,34 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return remote_target.RemoteTargetCollection(
-            self._conn, self._get_remote_target_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, remote_target.RemoteTargetCollection,
+            self._get_remote_target_collection_path(),
             redfish_version=self.redfish_version)
 
+    def get_lineage(self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                    refresh=False):
+        """Return the dependency graph of the storage resources
 
-class StorageServiceCollection(base.ResourceCollectionBase):
+        The remote targets, logical drives and physical drives are crawled
+        in parallel the first time. The same graph is returned by later
+        calls, refreshed incrementally when ``refresh`` is True.
+
+        :param concurrency: The maximum number of resources loaded at once
+        :param refresh: Whether to update a previously built graph
+        :returns: A StorageLineage instance
+        """
+        graph = getattr(self, '_lineage', None)
+        if graph is None:
+            graph = self._lineage = lineage.StorageLineage(
+                self, concurrency=concurrency)
+            graph.refresh()
+        elif refresh:
+            graph.refresh()
+        return graph
+
+
+class StorageServiceCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
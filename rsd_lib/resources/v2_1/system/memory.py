@@ -15,6 +15,7 @@
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
@@ -31,7 +32,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class Memory(base.ResourceBase):
+class Memory(rsd_lib_base.ResourceBase):
 
     name = base.Field('Name')
     """The memory name"""
@@ -123,7 +124,7 @@ class Memory(base.ResourceBase):
         super(Memory, self).__init__(connector, identity, redfish_version)
 
 
-class MemoryCollection(base.ResourceCollectionBase):
+class MemoryCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
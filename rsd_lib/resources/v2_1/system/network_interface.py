@@ -15,6 +15,7 @@
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
@@ -49,7 +50,7 @@ class VLANField(base.CompositeField):
                          adapter=rsd_lib_utils.int_or_none)
 
 
-class NetworkInterface(base.ResourceBase):
+class NetworkInterface(rsd_lib_base.ResourceBase):
 
     name = base.Field('Name')
     """The network interface name"""
@@ -136,7 +137,7 @@ class NetworkInterface(base.ResourceBase):
                                                redfish_version)
 
 
-class NetworkInterfaceCollection(base.ResourceCollectionBase):
+class NetworkInterfaceCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -16,6 +16,7 @@
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
@@ -48,7 +49,7 @@ class StorageControllersField(base.ListField):
     identifiers = IdentifiersField('Identifiers')
 
 
-class StorageSubsystem(base.ResourceBase):
+class StorageSubsystem(rsd_lib_base.ResourceBase):
 
     name = base.Field('Name')
     """The storage subsystem name"""
@@ -85,7 +86,7 @@ class StorageSubsystem(base.ResourceBase):
                                                redfish_version)
 
 
-class StorageSubsystemCollection(base.ResourceCollectionBase):
+class StorageSubsystemCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -16,12 +16,14 @@
 from sushy.resources.system import system
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.system import memory
 from rsd_lib.resources.v2_1.system import network_interface
 from rsd_lib.resources.v2_1.system import storage_subsystem
 
 
-class System(system.System):
+class System(system.System, rsd_lib_base.ResourceBase):
 
     def _get_memory_collection_path(self):
         """Helper function to find the memory path"""
@@ -35,8 +37,9 @@ class System(system.System):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return memory.MemoryCollection(
-            self._conn, self._get_memory_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, memory.MemoryCollection,
+            self._get_memory_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_storage_subsystem_collection_path(self):
@@ -51,8 +54,9 @@ class System(system.System):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return storage_subsystem.StorageSubsystemCollection(
-            self._conn, self._get_storage_subsystem_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, storage_subsystem.StorageSubsystemCollection,
+            self._get_storage_subsystem_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_network_interface_collection_path(self):
@@ -67,12 +71,13 @@ class System(system.System):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return network_interface.NetworkInterfaceCollection(
-            self._conn, self._get_network_interface_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, network_interface.NetworkInterfaceCollection,
+            self._get_network_interface_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class SystemCollection(system.SystemCollection):
+class SystemCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -15,11 +15,17 @@
 
 from sushy.resources import base
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources import v2_1
-from rsd_lib.resources.v2_2.ethernet_switch import ethernet_switch
-from rsd_lib.resources.v2_2.node import node
-from rsd_lib.resources.v2_2.system import system
-from rsd_lib.resources.v2_2.telemetry import telemetry
+from rsd_lib import utils as rsd_lib_utils
+
+# Note: The resource modules are only imported when first used.
+v2_2_ethernet_switch = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_2.ethernet_switch.ethernet_switch')
+v2_2_node = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_2.node.node')
+v2_2_system = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_2.system.system')
+v2_2_telemetry = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_2.telemetry.telemetry')
 
 
 class RSDLibV2_2(v2_1.RSDLibV2_1):
@@ -46,8 +52,9 @@ class RSDLibV2_2(v2_1.RSDLibV2_1):
         :param identity: The identity of the System resource
         :returns: The System object
         """
-        return system.System(self._conn, identity,
-                             redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_system.System, identity,
+            redfish_version=self.redfish_version)
 
     def get_system_collection(self):
         """Get the SystemCollection object
@@ -56,8 +63,19 @@ class RSDLibV2_2(v2_1.RSDLibV2_1):
             not found
         :returns: a SystemCollection object
         """
-        return system.SystemCollection(self._conn, self._systems_path,
-                                       redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_system.SystemCollection, self._systems_path,
+            redfish_version=self.redfish_version)
+
+    def get_node(self, identity):
+        """Given the identity return a Node object
+
+        :param identity: The identity of the Node resource
+        :returns: The Node object
+        """
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_node.Node, identity,
+            redfish_version=self.redfish_version)
 
     def get_node_collection(self):
         """Get the NodeCollection object
@@ -66,8 +84,9 @@ class RSDLibV2_2(v2_1.RSDLibV2_1):
             not found
         :returns: a NodeCollection object
         """
-        return node.NodeCollection(self._conn, self._nodes_path,
-                                   redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_node.NodeCollection, self._nodes_path,
+            redfish_version=self.redfish_version)
 
     def get_telemetry_service(self):
         """Given the identity return a Telemetry Service object
@@ -75,8 +94,9 @@ class RSDLibV2_2(v2_1.RSDLibV2_1):
         :param identity: The identity of the Telemetry Service resource
         :returns: The Telemetry Service object
         """
-        return telemetry.Telemetry(self._conn, self._telemetry_service_path,
-                                   redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_telemetry.Telemetry, self._telemetry_service_path,
+            redfish_version=self.redfish_version)
 
     def get_ethernet_switch_collection(self):
         """Get the EthernetSwitchCollection object
@@ -85,11 +105,10 @@ class RSDLibV2_2(v2_1.RSDLibV2_1):
             not found
         :returns: a EthernetSwitchCollection object
         """
-        return ethernet_switch.EthernetSwitchCollection(
-            self._conn,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_ethernet_switch.EthernetSwitchCollection,
             self._ethernet_switches_path,
-            redfish_version=self.redfish_version
-        )
+            redfish_version=self.redfish_version)
 
     def get_ethernet_switch(self, identity):
         """Given the identity return a EthernetSwitch object
@@ -97,7 +116,6 @@ class RSDLibV2_2(v2_1.RSDLibV2_1):
         :param identity: The identity of the EthernetSwitch resource
         :returns: The EthernetSwitch object
         """
-        return ethernet_switch.EthernetSwitch(
-            self._conn,
-            identity,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_2_ethernet_switch.EthernetSwitch, identity,
             redfish_version=self.redfish_version)
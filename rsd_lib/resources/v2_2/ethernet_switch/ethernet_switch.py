@@ -13,12 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.ethernet_switch import ethernet_switch \
     as v2_1_ethernet_switch
 from rsd_lib.resources.v2_2.ethernet_switch import port
+from rsd_lib.resources.v2_2.ethernet_switch import port_metrics_poller
+from rsd_lib import utils as rsd_lib_utils
 
 
 class EthernetSwitch(v2_1_ethernet_switch.EthernetSwitch):
@@ -31,12 +33,12 @@ class EthernetSwitch(v2_1_ethernet_switch.EthernetSwitch):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return port.PortCollection(
-            self._conn, self._get_port_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, port.PortCollection, self._get_port_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class EthernetSwitchCollection(base.ResourceCollectionBase):
+class EthernetSwitchCollection(v2_1_ethernet_switch.EthernetSwitchCollection):
 
     @property
     def _resource_type(self):
@@ -54,3 +56,22 @@ class EthernetSwitchCollection(base.ResourceCollectionBase):
         super(EthernetSwitchCollection, self).__init__(connector,
                                                        path,
                                                        redfish_version)
+
+    def get_port_metrics_poller(
+            self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Return the poller of the metrics of the ports of the switches
+
+        The ports are discovered the first time, later calls return the
+        same poller. Call ``start()`` on it to sample the ports
+        periodically or ``sample()`` to sample them once.
+
+        :param concurrency: The maximum number of requests in flight
+        :returns: A PortMetricsPoller instance
+        """
+        poller = getattr(self, '_port_metrics_poller', None)
+        if poller is None:
+            poller = self._port_metrics_poller = (
+                port_metrics_poller.PortMetricsPoller(
+                    self, concurrency=concurrency))
+            poller.discover()
+        return poller
@@ -13,9 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.ethernet_switch import port as v2_1_port
 from rsd_lib.resources.v2_2.ethernet_switch import port_metrics
 
@@ -34,12 +35,12 @@ class Port(v2_1_port.Port):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return port_metrics.PortMetrics(
-            self._conn, self._get_metrics_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, port_metrics.PortMetrics, self._get_metrics_path(),
             redfish_version=self.redfish_version)
 
 
-class PortCollection(base.ResourceCollectionBase):
+class PortCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -15,6 +15,7 @@
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
@@ -46,7 +47,7 @@ class TransmittedField(base.CompositeField):
     transmitted_bytes = base.Field('Bytes', adapter=rsd_lib_utils.int_or_none)
 
 
-class PortMetrics(base.ResourceBase):
+class PortMetrics(rsd_lib_base.ResourceBase):
     name = base.Field('Name')
     """The metrics name"""
 
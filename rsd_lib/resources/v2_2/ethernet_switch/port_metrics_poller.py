@@ -0,0 +1,275 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import array
+import logging
+import threading
+import time
+
+from sushy import exceptions
+from sushy import utils
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+# Note: Rate column -> path of the counter in the PortMetrics JSON
+COUNTERS = (
+    ('rx_bytes', ('Received', 'Bytes')),
+    ('tx_bytes', ('Transmitted', 'Bytes')),
+    ('rx_packets', ('Received', 'Packets')),
+    ('tx_packets', ('Transmitted', 'Packets')),
+    ('rx_dropped', ('Received', 'DroppedPackets')),
+    ('tx_dropped', ('Transmitted', 'DroppedPackets')),
+    ('rx_errors', ('Received', 'ErrorPackets')),
+    ('tx_errors', ('Transmitted', 'ErrorPackets')),
+)
+"""The counters sampled, by name of their rate column"""
+
+_NAN = float('nan')
+_WRAP_32 = 2 ** 32
+_WRAP_64 = 2 ** 64
+
+
+def counter_delta(previous, current):
+    """Return the increase of a counter between two samples
+
+    A counter lower than its previous value either wrapped around or was
+    reset, e.g. by a switch reboot. It is assumed to be a 32-bit counter
+    while the previous value fits in 32 bits, a 64-bit one otherwise, and
+    to have wrapped only when the increase through the boundary is below a
+    quarter of the counter range, i.e. when the previous value was close
+    to the boundary and the current one is close to 0.
+
+    :param previous: The previous value of the counter
+    :param current: The current value of the counter
+    :returns: The increase of the counter, None if it was reset
+    """
+    if current >= previous:
+        return current - previous
+    wrap = _WRAP_32 if previous < _WRAP_32 else _WRAP_64
+    delta = current + wrap - previous
+    return delta if delta < wrap // 4 else None
+
+
+def _read_counter(json_doc, path):
+    value = (json_doc.get(path[0]) or {}).get(path[1])
+    if value is None and path[1] == 'ErrorPackets':
+        value = (json_doc.get(path[0]) or {}).get('Errors')
+    if value is None:
+        return None
+    value = int(value)
+    return value if 0 <= value < _WRAP_64 else None
+
+
+class PortMetricsPoller(object):
+    """Sample the metrics of every port of the Ethernet switches
+
+    The counters and the rates computed from them are held in columnar
+    arrays preallocated by ``discover()``, one row per port. Sampling reads
+    the raw JSON of the PortMetrics resources and writes it to the arrays
+    in place, so no object is allocated per port and per sample. Read the
+    arrays while holding ``lock`` to get a consistent view.
+    """
+
+    def __init__(self, ethernet_switch_collection,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """A class representing a port metrics poller
+
+        The poller has no port until ``discover()`` is called.
+
+        :param ethernet_switch_collection: An EthernetSwitchCollection
+            instance
+        :param concurrency: The maximum number of requests in flight
+        """
+        self._switch_col = ethernet_switch_collection
+        self._conn = ethernet_switch_collection._conn
+        self._concurrency = concurrency
+        self._rows = {}
+        # Note: Column name -> whether each port has a previous value
+        self._known = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.lock = threading.Lock()
+        """Lock held while the arrays are updated"""
+
+        self.ports = ()
+        """The identities of the ports, in the order of the rows"""
+
+        self.metrics_paths = ()
+        """The identity of the metrics of each port"""
+
+        self.timestamps = array.array('d')
+        """The time of the last successful sample of each port"""
+
+        self.counters = {}
+        """The last value of each counter, by column name"""
+
+        self.rates = {}
+        """The rate per second of each counter, by column name. NaN until
+        two samples were read, when the last sample failed or when the
+        counter was reset"""
+
+    def __len__(self):
+        return len(self.ports)
+
+    def _list_ports(self, switch_id):
+        switch = self._switch_col.get_member(switch_id)
+        port_col = switch.ports
+        ports = []
+        for port_id, port, error in rsd_lib_utils.iter_concurrently(
+                port_col.get_member, port_col.members_identities,
+                self._concurrency):
+            if error is not None:
+                LOG.warning('Leaving port %(port)s out of the metrics '
+                            'poller: %(error)s',
+                            {'port': port_id, 'error': error})
+                continue
+            try:
+                ports.append((port_id,
+                              utils.get_sub_resource_path_by(port,
+                                                             'Metrics')))
+            except exceptions.MissingAttributeError as e:
+                LOG.debug('Port %(port)s has no metrics: %(error)s',
+                          {'port': port_id, 'error': e})
+        return ports
+
+    def discover(self):
+        """Find the ports of the switches and allocate the arrays
+
+        The previous samples are discarded.
+        """
+        ports = []
+        for switch_id, switch_ports, error in rsd_lib_utils.iter_concurrently(
+                self._list_ports, self._switch_col.members_identities,
+                self._concurrency):
+            if error is not None:
+                LOG.warning('Skipping the ports of %(switch)s: %(error)s',
+                            {'switch': switch_id, 'error': error})
+                continue
+            ports.extend(switch_ports)
+
+        size = len(ports)
+        with self.lock:
+            self.ports = tuple(p[0] for p in ports)
+            self.metrics_paths = tuple(p[1] for p in ports)
+            self._rows = dict((port, row)
+                              for row, port in enumerate(self.ports))
+            self.timestamps = array.array('d', [0.0]) * size
+            self.counters = dict((name, array.array('Q', [0]) * size)
+                                 for name, _ in COUNTERS)
+            self._known = dict((name, bytearray(size))
+                               for name, _ in COUNTERS)
+            self.rates = dict((name, array.array('d', [_NAN]) * size)
+                              for name, _ in COUNTERS)
+        LOG.debug('Polling the metrics of %d port(s)', size)
+
+    def _fetch(self, row):
+        json_doc = self._conn.get(path=self.metrics_paths[row]).json()
+        return time.time(), json_doc
+
+    def sample(self):
+        """Read the metrics of every port once and update the rates
+
+        The metrics are fetched in parallel. The rates of a port which
+        fails to load are set to NaN, its next successful sample is compared
+        to the last successful one.
+
+        :returns: The number of ports sampled successfully
+        """
+        sampled = 0
+        for row, result, error in rsd_lib_utils.iter_concurrently(
+                self._fetch, range(len(self.ports)), self._concurrency):
+            with self.lock:
+                if error is None:
+                    try:
+                        self._store(row, result[1], result[0])
+                        sampled += 1
+                        continue
+                    except (TypeError, ValueError, AttributeError) as e:
+                        error = e
+                LOG.debug('Failed to sample %(path)s: %(error)s',
+                          {'path': self.metrics_paths[row], 'error': error})
+                for rates in self.rates.values():
+                    rates[row] = _NAN
+        return sampled
+
+    def _store(self, row, json_doc, now):
+        values = [_read_counter(json_doc, path) for _, path in COUNTERS]
+        elapsed = now - self.timestamps[row]
+        for (name, _), value in zip(COUNTERS, values):
+            known = self._known[name]
+            if value is None:
+                known[row] = 0
+                self.rates[name][row] = _NAN
+                continue
+            counters = self.counters[name]
+            delta = None
+            if known[row] and elapsed > 0:
+                delta = counter_delta(counters[row], value)
+            if delta is None:
+                self.rates[name][row] = _NAN
+            else:
+                self.rates[name][row] = delta / elapsed
+            counters[row] = value
+            known[row] = 1
+        self.timestamps[row] = now
+
+    def get_rates(self, port):
+        """Return the latest rates of a port
+
+        :param port: The identity of the port
+        :returns: A dict mapping the column names to the rates per second
+        :raises: KeyError if the port is unknown
+        """
+        with self.lock:
+            row = self._rows[port]
+            return dict((name, rates[row])
+                        for name, rates in self.rates.items())
+
+    def start(self, interval=1.0):
+        """Sample the ports periodically from a background thread
+
+        :param interval: The number of seconds between two samples
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,),
+                                        name='rsd-lib-port-metrics-poller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop sampling the ports
+
+        :param timeout: The maximum number of seconds to wait for the
+            current sample to complete
+        """
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+
+    def _run(self, interval):
+        next_sample = time.time()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                LOG.warning('Failed to sample the port metrics: %s', e)
+            next_sample = max(next_sample + interval, time.time())
+            self._stop.wait(next_sample - time.time())
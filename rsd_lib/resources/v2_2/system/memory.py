@@ -16,6 +16,7 @@
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.system import memory
 from rsd_lib.resources.v2_2.system import memory_metrics
 
@@ -36,8 +37,8 @@ class Memory(memory.Memory):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return memory_metrics.MemoryMetrics(
-            self._conn, self._get_metrics_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, memory_metrics.MemoryMetrics, self._get_metrics_path(),
             redfish_version=self.redfish_version)
 
 
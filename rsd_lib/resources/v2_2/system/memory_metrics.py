@@ -15,10 +15,11 @@
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib import utils as rsd_lib_utils
 
 
-class MemoryMetrics(base.ResourceBase):
+class MemoryMetrics(rsd_lib_base.ResourceBase):
 
     name = base.Field('Name')
     """The metrics name"""
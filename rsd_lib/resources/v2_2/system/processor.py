@@ -17,6 +17,8 @@ from sushy.resources import base
 from sushy.resources.system import processor
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_2.system import processor_metrics
 
 
@@ -26,7 +28,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class Processor(processor.Processor):
+class Processor(processor.Processor, rsd_lib_base.ResourceBase):
 
     status = StatusField('Status')
     """The processor status"""
@@ -44,12 +46,13 @@ class Processor(processor.Processor):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return processor_metrics.ProcessorMetrics(
-            self._conn, self._get_metrics_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, processor_metrics.ProcessorMetrics,
+            self._get_metrics_path(),
             redfish_version=self.redfish_version)
 
 
-class ProcessorCollection(processor.ProcessorCollection):
+class ProcessorCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -15,6 +15,7 @@
 
 from sushy import utils
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.system import system
 from rsd_lib.resources.v2_2.system import memory
 from rsd_lib.resources.v2_2.system import metrics
@@ -36,8 +37,8 @@ class System(system.System):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return metrics.Metrics(
-            self._conn, self._get_metrics_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, metrics.Metrics, self._get_metrics_path(),
             redfish_version=self.redfish_version)
 
     @property
@@ -48,8 +49,9 @@ class System(system.System):
         It is calculated once when the first time it is queried. On refresh,
         this property gets reset.
         """
-        return processor.ProcessorCollection(
-            self._conn, self._get_processor_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, processor.ProcessorCollection,
+            self._get_processor_collection_path(),
             redfish_version=self.redfish_version)
 
         return self._processors
@@ -62,8 +64,9 @@ class System(system.System):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return memory.MemoryCollection(
-            self._conn, self._get_memory_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, memory.MemoryCollection,
+            self._get_memory_collection_path(),
             redfish_version=self.redfish_version)
 
 
@@ -15,8 +15,10 @@
 
 from sushy.resources import base
 
+from rsd_lib import base as rsd_lib_base
 
-class MetricDefinition(base.ResourceBase):
+
+class MetricDefinition(rsd_lib_base.ResourceBase):
 
     name = base.Field('Name')
     """The CPUHealth metric definition name"""
@@ -85,7 +87,7 @@ class MetricDefinition(base.ResourceBase):
     """The wildcards of the sensor"""
 
 
-class MetricDefinitionsCollection(base.ResourceCollectionBase):
+class MetricDefinitionsCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
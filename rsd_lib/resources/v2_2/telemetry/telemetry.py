@@ -16,6 +16,8 @@
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_2.telemetry.metric_definitions \
     import metric_definitions
 
@@ -25,7 +27,7 @@ class StatusField(base.CompositeField):
     health = base.Field('Health')
 
 
-class Telemetry(base.ResourceBase):
+class Telemetry(rsd_lib_base.ResourceBase):
 
     status = StatusField('Status')
     """The telemetry service status"""
@@ -42,6 +44,7 @@ class Telemetry(base.ResourceBase):
         It is calculated once the first time it is queried. On refresh,
         this property is reset.
         """
-        return metric_definitions.MetricDefinitionsCollection(
-            self._conn, self._get_metric_definitions_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, metric_definitions.MetricDefinitionsCollection,
+            self._get_metric_definitions_path(),
             redfish_version=self.redfish_version)
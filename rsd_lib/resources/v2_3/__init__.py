@@ -15,10 +15,15 @@
 
 from sushy.resources import base
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources import v2_2
-from rsd_lib.resources.v2_3.fabric import fabric
-from rsd_lib.resources.v2_3.node import node
-from rsd_lib.resources.v2_3.storage_service import storage_service
+from rsd_lib import utils as rsd_lib_utils
+
+# Note: The resource modules are only imported when first used.
+v2_3_fabric = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_3.fabric.fabric')
+v2_3_node = rsd_lib_utils.LazyModule('rsd_lib.resources.v2_3.node.node')
+v2_3_storage_service = rsd_lib_utils.LazyModule(
+    'rsd_lib.resources.v2_3.storage_service.storage_service')
 
 
 class RSDLibV2_3(v2_2.RSDLibV2_2):
@@ -42,8 +47,9 @@ class RSDLibV2_3(v2_2.RSDLibV2_2):
             not found
         :returns: a NodeCollection object
         """
-        return node.NodeCollection(self._conn, self._nodes_path,
-                                   redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_3_node.NodeCollection, self._nodes_path,
+            redfish_version=self.redfish_version)
 
     def get_node(self, identity):
         """Given the identity return a Node object
@@ -51,8 +57,9 @@ class RSDLibV2_3(v2_2.RSDLibV2_2):
         :param identity: The identity of the Node resource
         :returns: The Node object
         """
-        return node.Node(self._conn, identity,
-                         redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_3_node.Node, identity,
+            redfish_version=self.redfish_version)
 
     def get_storage_service_collection(self):
         """Get the StorageServiceCollection object
@@ -61,8 +68,9 @@ class RSDLibV2_3(v2_2.RSDLibV2_2):
             not found
         :returns: a StorageServiceCollection object
         """
-        return storage_service.StorageServiceCollection(
-            self._conn, self._storage_service_path,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_3_storage_service.StorageServiceCollection,
+            self._storage_service_path,
             redfish_version=self.redfish_version)
 
     def get_storage_service(self, identity):
@@ -71,8 +79,8 @@ class RSDLibV2_3(v2_2.RSDLibV2_2):
         :param identity: The identity of the StorageService resource
         :returns: The StorageService object
         """
-        return storage_service.StorageService(
-            self._conn, identity,
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_3_storage_service.StorageService, identity,
             redfish_version=self.redfish_version)
 
     def get_fabric_collection(self):
@@ -82,9 +90,9 @@ class RSDLibV2_3(v2_2.RSDLibV2_2):
             not found
         :returns: a FabricCollection object
         """
-        return fabric.FabricCollection(self._conn,
-                                       self._fabrics_path,
-                                       redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_3_fabric.FabricCollection, self._fabrics_path,
+            redfish_version=self.redfish_version)
 
     def get_fabric(self, identity):
         """Given the identity return a Fabric object
@@ -92,6 +100,6 @@ class RSDLibV2_3(v2_2.RSDLibV2_2):
         :param identity: The identity of the Fabric resource
         :returns: The Fabric object
         """
-        return fabric.Fabric(self._conn,
-                             identity,
-                             redfish_version=self.redfish_version)
+        return rsd_lib_cache.get_resource(
+            self._conn, v2_3_fabric.Fabric, identity,
+            redfish_version=self.redfish_version)
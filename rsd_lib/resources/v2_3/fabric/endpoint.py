@@ -13,18 +13,31 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import jsonschema
+import collections
 import logging
 
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib import resource_index as rsd_lib_index
+from rsd_lib.resources.v2_1.fabric import endpoint as v2_1_endpoint
 from rsd_lib.resources.v2_3.fabric import endpoint_schemas
 from rsd_lib import utils as rsd_lib_utils
+from rsd_lib import validation as rsd_lib_validation
 
 
 LOG = logging.getLogger(__name__)
 
+CreateEndpointResult = collections.namedtuple(
+    'CreateEndpointResult', ['request', 'identity', 'error'])
+"""The outcome of the creation of one endpoint by create_endpoints()
+
+``identity`` is the uri of the new endpoint, or None when ``error``, the
+exception raised by the last attempt, is set.
+"""
+
 
 class IdentifiersField(base.ListField):
     name_format = base.Field('DurableNameFormat')
@@ -69,7 +82,7 @@ class OemField(base.CompositeField):
     authentication = AuthenticationField(['Intel_RackScale', 'Authentication'])
 
 
-class Endpoint(base.ResourceBase):
+class Endpoint(rsd_lib_base.ResourceBase):
 
     connected_entities = ConnectedEntitiesField('ConnectedEntities')
     """Entities connected to endpoint"""
@@ -141,8 +154,19 @@ class Endpoint(base.ResourceBase):
 
         self._conn.patch(self.path, data=data)
 
+    def delete(self):
+        """Delete this endpoint
+
+        The endpoint is removed from the resource cache and the indexes of
+        the connector, so the endpoint index stays current without being
+        rebuilt.
+        """
+        self._conn.delete(self.path)
+        rsd_lib_cache.invalidate_member(self._conn, self.path)
+        rsd_lib_index.discard_from_index(self._conn, self.path)
 
-class EndpointCollection(base.ResourceCollectionBase):
+
+class EndpointCollection(v2_1_endpoint.EndpointCollection):
 
     @property
     def _resource_type(self):
@@ -165,27 +189,28 @@ class EndpointCollection(base.ResourceCollectionBase):
 
         request = {}
 
-        jsonschema.validate(identifiers,
-                            endpoint_schemas.identifiers_req_schema)
+        rsd_lib_validation.validate(
+            identifiers, endpoint_schemas.identifiers_req_schema)
         request['Identifiers'] = identifiers
 
-        jsonschema.validate(connected_entities,
-                            endpoint_schemas.connected_entities_req_schema)
+        rsd_lib_validation.validate(
+            connected_entities, endpoint_schemas.connected_entities_req_schema)
         request['ConnectedEntities'] = connected_entities
 
         if protocol is not None:
-            jsonschema.validate(protocol, endpoint_schemas.protocol_req_schema)
+            rsd_lib_validation.validate(
+                protocol, endpoint_schemas.protocol_req_schema)
             request['EndpointProtocol'] = protocol
 
         if ip_transport_details is not None:
-            jsonschema.validate(
+            rsd_lib_validation.validate(
                 ip_transport_details,
                 endpoint_schemas.ip_transport_details_req_schema)
             request['IPTransportDetails'] = ip_transport_details
 
         if interface is not None:
-            jsonschema.validate(interface,
-                                endpoint_schemas.interface_req_schema)
+            rsd_lib_validation.validate(
+                interface, endpoint_schemas.interface_req_schema)
             request['Links'] = {
                 "Oem": {
                     "Intel_RackScale": {
@@ -199,8 +224,8 @@ class EndpointCollection(base.ResourceCollectionBase):
             }
 
         if authentication is not None:
-            jsonschema.validate(authentication,
-                                endpoint_schemas.authentication_req_schema)
+            rsd_lib_validation.validate(
+                authentication, endpoint_schemas.authentication_req_schema)
             request['Oem'] = {"Intel_RackScale":
                               {"Authentication": authentication}}
 
@@ -227,7 +252,54 @@ class EndpointCollection(base.ResourceCollectionBase):
         properties = self._create_endpoint_request(
             identifiers, connected_entities, protocol, ip_transport_details,
             interface, authentication)
+        return self._post_endpoint(properties)
+
+    def _post_endpoint(self, properties):
         resp = self._conn.post(self._path, data=properties)
+        rsd_lib_cache.invalidate(self._conn, self._path)
         LOG.info("Endpoint created at %s", resp.headers['Location'])
         endpoint_url = resp.headers['Location']
-        return endpoint_url[endpoint_url.find(self._path):]
+        endpoint_path = endpoint_url[endpoint_url.find(self._path):]
+
+        # The request holds the keys of the new endpoint
+        rsd_lib_index.add_to_index(self._conn, endpoint_path, properties)
+        return endpoint_path
+
+    def create_endpoints(self, requests,
+                         concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                         retries=2, retry_interval=1):
+        """Create many endpoints concurrently
+
+        Every request is validated before the first endpoint is created, so
+        an invalid request doesn't leave part of the endpoints created.
+        Then the endpoints are created using up to ``concurrency``
+        concurrent requests. A creation failing with 503 Service
+        Unavailable is retried, other errors are reported in the result of
+        the endpoint since the endpoint may have been created anyway.
+
+        :param requests: A list of dicts of ``create_endpoint()`` arguments
+        :param concurrency: The maximum number of concurrent requests
+        :param retries: The number of times a creation failing with 503
+            Service Unavailable is retried
+        :param retry_interval: The number of seconds to wait before the
+            first retry, doubled for the second one and so on
+        :returns: A list of CreateEndpointResult, in the order of
+            ``requests``
+        :raises: ValidationError if a request is invalid
+        """
+        properties = [self._create_endpoint_request(**request)
+                      for request in requests]
+
+        results = []
+        for index, identity, error in rsd_lib_utils.iter_concurrently(
+                lambda i: rsd_lib_utils.call_with_retry(
+                    lambda: self._post_endpoint(properties[i]),
+                    rsd_lib_utils.is_service_unavailable,
+                    retries=retries, retry_interval=retry_interval),
+                range(len(requests)), concurrency):
+            if error is not None:
+                LOG.warning('Failed to create endpoint %(index)d: %(error)s',
+                            {'index': index, 'error': error})
+            results.append(
+                CreateEndpointResult(requests[index], identity, error))
+        return results
@@ -18,6 +18,8 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_3.fabric import endpoint
 from rsd_lib.resources.v2_3.fabric import zone
 
@@ -30,7 +32,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class Fabric(base.ResourceBase):
+class Fabric(rsd_lib_base.ResourceBase):
 
     description = base.Field('Description')
     """The fabric description"""
@@ -72,8 +74,9 @@ class Fabric(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return endpoint.EndpointCollection(
-            self._conn, self._get_endpoint_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, endpoint.EndpointCollection,
+            self._get_endpoint_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_zone_collection_path(self):
@@ -88,12 +91,12 @@ class Fabric(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return zone.ZoneCollection(
-            self._conn, self._get_zone_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, zone.ZoneCollection, self._get_zone_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class FabricCollection(base.ResourceCollectionBase):
+class FabricCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -15,6 +15,7 @@
 
 import logging
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.fabric import zone as v2_1_zone
 
 LOG = logging.getLogger(__name__)
@@ -34,10 +35,12 @@ class Zone(v2_1_zone.Zone):
             {'@odata.id': endpoint} for endpoint in endpoints]
 
         self._conn.patch(self.path, data=data)
+        rsd_lib_cache.invalidate(self._conn, self.path)
 
     def delete(self):
         """Delete this zone"""
         self._conn.delete(self.path)
+        rsd_lib_cache.invalidate_member(self._conn, self.path)
 
 
 class ZoneCollection(v2_1_zone.ZoneCollection):
@@ -68,6 +71,7 @@ class ZoneCollection(v2_1_zone.ZoneCollection):
             {'@odata.id': endpoint} for endpoint in endpoints]
 
         resp = self._conn.post(self.path, data=data)
+        rsd_lib_cache.invalidate(self._conn, self.path)
         LOG.info("Zone created at %s", resp.headers['Location'])
         zone_uri = resp.headers['Location']
         return zone_uri[zone_uri.find(self._path):]
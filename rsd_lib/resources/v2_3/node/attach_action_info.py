@@ -18,6 +18,8 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+
 LOG = logging.getLogger(__name__)
 
 NAME_MAPPING = {
@@ -29,7 +31,7 @@ NAME_MAPPING = {
 }
 
 
-class AttachResourceActionInfo(base.ResourceBase):
+class AttachResourceActionInfo(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The storage pool  identity string"""
@@ -13,7 +13,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from jsonschema import validate
 import logging
 
 from sushy import exceptions
@@ -24,6 +23,7 @@ from rsd_lib.resources.v2_2.node import node as v2_2_node
 from rsd_lib.resources.v2_3.node import attach_action_info
 from rsd_lib.resources.v2_3.node import schemas as node_schemas
 from rsd_lib import utils as rsd_lib_utils
+from rsd_lib import validation as rsd_lib_validation
 
 
 LOG = logging.getLogger(__name__)
@@ -48,7 +48,7 @@ class NodeActionsField(v2_1_node.NodeActionsField):
     detach_endpoint = DetachEndpointActionField('#ComposedNode.DetachResource')
 
 
-class Node(v2_1_node.Node):
+class Node(v2_2_node.Node):
 
     _actions = NodeActionsField('Actions', required=True)
 
@@ -187,43 +187,46 @@ class NodeCollection(v2_2_node.NodeCollection):
             request['Description'] = description
 
         if processor_req is not None:
-            validate(processor_req,
-                     node_schemas.processor_req_schema)
+            rsd_lib_validation.validate(
+                processor_req, node_schemas.processor_req_schema)
             request['Processors'] = processor_req
 
         if memory_req is not None:
-            validate(memory_req,
-                     node_schemas.memory_req_schema)
+            rsd_lib_validation.validate(
+                memory_req, node_schemas.memory_req_schema)
             request['Memory'] = memory_req
 
         if remote_drive_req is not None:
-            validate(remote_drive_req,
-                     node_schemas.remote_drive_req_schema)
+            rsd_lib_validation.validate(
+                remote_drive_req, node_schemas.remote_drive_req_schema)
             request['RemoteDrives'] = remote_drive_req
 
         if local_drive_req is not None:
-            validate(local_drive_req,
-                     node_schemas.local_drive_req_schema)
+            rsd_lib_validation.validate(
+                local_drive_req, node_schemas.local_drive_req_schema)
             request['LocalDrives'] = local_drive_req
 
         if ethernet_interface_req is not None:
-            validate(ethernet_interface_req,
-                     node_schemas.ethernet_interface_req_schema)
+            rsd_lib_validation.validate(
+                ethernet_interface_req,
+                node_schemas.ethernet_interface_req_schema)
             request['EthernetInterfaces'] = ethernet_interface_req
 
         if security_req is not None:
-            validate(security_req,
-                     node_schemas.security_req_schema)
+            rsd_lib_validation.validate(
+                security_req, node_schemas.security_req_schema)
             request['Security'] = security_req
 
         if total_system_core_req is not None:
-            validate(total_system_core_req,
-                     node_schemas.total_system_core_req_schema)
+            rsd_lib_validation.validate(
+                total_system_core_req,
+                node_schemas.total_system_core_req_schema)
             request['TotalSystemCoreCount'] = total_system_core_req
 
         if total_system_memory_req is not None:
-            validate(total_system_memory_req,
-                     node_schemas.total_system_memory_req_schema)
+            rsd_lib_validation.validate(
+                total_system_memory_req,
+                node_schemas.total_system_memory_req_schema)
             request['TotalSystemMemoryMiB'] = total_system_memory_req
 
         return request
@@ -260,7 +263,6 @@ class NodeCollection(v2_2_node.NodeCollection):
 
         'memory_req' and 'total_system_memory_req' is the same.
         """
-        target_uri = self._get_compose_action_element().target_uri
         properties = self._create_compose_request(
             name=name, description=description,
             processor_req=processor_req,
@@ -271,7 +273,4 @@ class NodeCollection(v2_2_node.NodeCollection):
             security_req=security_req,
             total_system_core_req=total_system_core_req,
             total_system_memory_req=total_system_memory_req)
-        resp = self._conn.post(target_uri, data=properties)
-        LOG.info("Node created at %s", resp.headers['Location'])
-        node_url = resp.headers['Location']
-        return node_url[node_url.find(self._path):]
+        return self._compose(properties)
@@ -0,0 +1,216 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import array
+import collections
+import logging
+import threading
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+BEST_FIT = 'best_fit'
+"""Select the pool with the least free space large enough"""
+
+WORST_FIT = 'worst_fit'
+"""Select the pool with the most free space"""
+
+
+def _bytes_array(values):
+    return array.array('q', values)
+
+
+class CapacityTable(object):
+    """The capacity of the storage pools of every storage service
+
+    The allocated and consumed bytes of the pools are held in compact
+    arrays, one row per pool, so the free space queries don't touch the
+    pool objects. ``refresh()`` updates the table incrementally: the pools
+    are refreshed with conditional requests and only the added pools are
+    loaded.
+    """
+
+    def __init__(self, storage_service_collection,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """A class representing a capacity table
+
+        The table is empty until ``refresh()`` is called.
+
+        :param storage_service_collection: A StorageServiceCollection
+            instance
+        :param concurrency: The maximum number of resources loaded at once
+        """
+        self._service_col = storage_service_collection
+        self._concurrency = concurrency
+        self._lock = threading.Lock()
+        # Note: Storage service identity -> StoragePoolCollection
+        self._pool_cols = collections.OrderedDict()
+        # Note: Pool identity -> (storage service identity, StoragePool)
+        self._pools = collections.OrderedDict()
+
+        self.pools = ()
+        """The identities of the pools, in the order of the table rows"""
+
+        self.services = ()
+        """The identity of the storage service of each pool"""
+
+        self.allocated_bytes = _bytes_array(())
+        """The allocated bytes of each pool"""
+
+        self.consumed_bytes = _bytes_array(())
+        """The consumed bytes of each pool"""
+
+    def __len__(self):
+        return len(self.pools)
+
+    def _load_pool_col(self, service_id):
+        pool_col = self._pool_cols.get(service_id)
+        if pool_col is None:
+            service = self._service_col.get_member(service_id)
+            pool_col = service.storage_pools
+        else:
+            pool_col.refresh()
+        return pool_col
+
+    def _load_pool(self, item):
+        service_id, pool_col, pool_id = item
+        entry = self._pools.get(pool_id)
+        if entry is None:
+            return pool_col.get_member(pool_id)
+        entry[1].refresh()
+        return entry[1]
+
+    def _crawl(self, items, func):
+        return rsd_lib_utils.crawl(func, items, 'the capacity table',
+                                   self._concurrency)
+
+    def refresh(self):
+        """Load the pools of the storage services
+
+        The storage services, pool collections and known pools are
+        refreshed with conditional requests, so only the resources which
+        changed since the last refresh are downloaded again. Pools which
+        fail to load are logged and left out of the table.
+        """
+        with self._lock:
+            if self._pool_cols:
+                self._service_col.refresh()
+            pool_cols = self._crawl(self._service_col.members_identities,
+                                    self._load_pool_col)
+
+            items = [(service_id, pool_col, pool_id)
+                     for service_id, pool_col in pool_cols
+                     for pool_id in pool_col.members_identities]
+            pools = self._crawl(items, self._load_pool)
+
+            self._pool_cols = collections.OrderedDict(pool_cols)
+            self._pools = collections.OrderedDict(
+                (item[2], (item[0], pool)) for item, pool in pools)
+            self._rebuild()
+
+    def _rebuild(self):
+        capacities = [entry[1].capacity for entry in self._pools.values()]
+        self.pools = tuple(self._pools)
+        self.services = tuple(entry[0] for entry in self._pools.values())
+        self.allocated_bytes = _bytes_array(
+            c.allocated_bytes or 0 for c in capacities)
+        self.consumed_bytes = _bytes_array(
+            c.consumed_bytes or 0 for c in capacities)
+        LOG.debug('Capacity table holds %d pool(s)', len(self.pools))
+
+    def free_bytes(self):
+        """Return the free bytes of each pool
+
+        :returns: An array of the free bytes, in the order of ``pools``
+        """
+        return _bytes_array(
+            max(allocated - consumed, 0) for allocated, consumed in
+            zip(self.allocated_bytes, self.consumed_bytes))
+
+    def total_free_bytes(self, storage_service=None):
+        """Return the free bytes of all the pools
+
+        :param storage_service: The identity of a storage service to only
+            count its pools
+        :returns: The number of free bytes
+        """
+        if storage_service is None:
+            return sum(self.free_bytes())
+        return sum(free for free, service in
+                   zip(self.free_bytes(), self.services)
+                   if service == storage_service)
+
+    def find_pools(self, capacity):
+        """Return the pools with enough free space for a volume
+
+        :param capacity: The capacity of the volume in bytes
+        :returns: A list of pool identities, in the order of ``pools``
+        """
+        return [pool for pool, free in zip(self.pools, self.free_bytes())
+                if free >= capacity]
+
+    def select_pool(self, capacity, strategy=BEST_FIT,
+                    storage_service=None):
+        """Select the pool a volume should be allocated from
+
+        :param capacity: The capacity of the volume in bytes
+        :param strategy: BEST_FIT to select the pool with the least free
+            space large enough, WORST_FIT to select the pool with the most
+            free space
+        :param storage_service: The identity of a storage service to only
+            select one of its pools
+        :returns: The identity of the pool, or None when no pool has enough
+            free space
+        :raises: ValueError if the strategy is unknown
+        """
+        if strategy not in (BEST_FIT, WORST_FIT):
+            raise ValueError('Unknown pool selection strategy %s' % strategy)
+
+        candidates = []
+        for index, free in enumerate(self.free_bytes()):
+            if free < capacity:
+                continue
+            if storage_service is not None and (
+                    self.services[index] != storage_service):
+                continue
+            candidates.append((free, index))
+        if not candidates:
+            return None
+        if strategy == BEST_FIT:
+            _, index = min(candidates)
+        else:
+            _, index = max(candidates, key=lambda c: (c[0], -c[1]))
+        return self.pools[index]
+
+    def capacity_sources(self, capacity, strategy=BEST_FIT,
+                         storage_service=None):
+        """Select a pool and return it as volume capacity sources
+
+        The result can be passed as ``capacity_sources`` to
+        ``VolumeCollection.create_volume()``.
+
+        :param capacity: The capacity of the volume in bytes
+        :param strategy: The pool selection strategy, see ``select_pool()``
+        :param storage_service: The identity of a storage service to only
+            select one of its pools
+        :returns: The capacity sources, or None when no pool has enough
+            free space
+        """
+        pool = self.select_pool(capacity, strategy=strategy,
+                                storage_service=storage_service)
+        if pool is None:
+            return None
+        return [{'ProvidingPools': [{'@odata.id': pool}]}]
@@ -0,0 +1,134 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+
+from sushy import utils
+
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+DriveHealthRecord = collections.namedtuple(
+    'DriveHealthRecord',
+    ['drive_id', 'health', 'predicted_media_life_left_percent', 'erased',
+     'capacity_bytes'])
+"""The health of one drive, as yielded by scan_drive_health()
+
+``drive_id`` is the identity of the drive resource. The other fields are
+None when the service doesn't report them.
+"""
+
+
+def build_drive_health_record(json_doc, identity=None):
+    """Extract the health of a drive from its JSON representation
+
+    :param json_doc: The JSON representation of the drive
+    :param identity: The identity of the drive, used when the document
+        doesn't hold its @odata.id
+    :returns: A DriveHealthRecord
+    """
+    erased = (((json_doc.get('Oem') or {}).get('Intel_RackScale') or {})
+              .get('DriveErased'))
+    return DriveHealthRecord(
+        drive_id=json_doc.get('@odata.id', identity),
+        health=(json_doc.get('Status') or {}).get('Health'),
+        predicted_media_life_left_percent=json_doc.get(
+            'PredictedMediaLifeLeftPercent'),
+        erased=None if erased is None else bool(erased),
+        capacity_bytes=rsd_lib_utils.int_or_none(
+            json_doc.get('CapacityBytes')))
+
+
+def _get_drives_path(service_collection, service_id):
+    service = service_collection.get_member(service_id)
+    path = utils.get_sub_resource_path_by(service, 'Drives')
+    expand_query = rsd_lib_base.get_expand_query(service_collection._conn)
+    if expand_query is not None:
+        path = '%s?%s' % (path, expand_query)
+    return path
+
+
+def _iter_drives(conn, path):
+    """Stream the members of a drive collection
+
+    A page is only read once the members of the previous one were
+    consumed. Members returned inline, when the service supports $expand,
+    are turned into records right away so only their compact form is kept.
+
+    :returns: A generator of drive identities and DriveHealthRecords
+    """
+    while path:
+        json_doc = conn.get(path=path).json()
+        path = json_doc.get('Members@odata.nextLink')
+        for member in json_doc.get('Members', ()):
+            if len(member) > 1:
+                yield build_drive_health_record(member)
+            elif '@odata.id' in member:
+                yield member['@odata.id']
+
+
+def _iter_service_drives(service_collection, concurrency):
+    conn = service_collection._conn
+    for service_id, path, error in rsd_lib_utils.iter_concurrently(
+            lambda s: _get_drives_path(service_collection, s),
+            service_collection.members_identities, concurrency):
+        if error is None:
+            try:
+                for drive in _iter_drives(conn, path):
+                    yield drive
+                continue
+            except Exception as e:
+                error = e
+        LOG.warning('Skipping the drives of %(service)s: %(error)s',
+                    {'service': service_id, 'error': error})
+
+
+def scan_drive_health(storage_service_collection,
+                      concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+    """Stream the health of the drives of every storage service
+
+    The storage services are loaded in parallel, their drive collections
+    are read one page at a time and the drives are read in parallel as
+    their identities arrive, so the first records are yielded as soon as
+    the first page is read. Only the current page and the raw JSON of the
+    drives being fetched are held at any time, no Drive object is built,
+    so the scan runs in bounded memory regardless of the number of drives.
+    Drives and services which fail to load are logged and skipped, the
+    drives of a service listed before a page failed to load are kept.
+
+    :param storage_service_collection: A StorageServiceCollection instance
+    :param concurrency: The maximum number of requests in flight
+    :returns: A generator of DriveHealthRecord, in the order of the storage
+        services and of their drive collections
+    """
+    conn = storage_service_collection._conn
+
+    def _load(drive):
+        if isinstance(drive, DriveHealthRecord):
+            return drive
+        return build_drive_health_record(conn.get(path=drive).json(),
+                                         identity=drive)
+
+    for drive, record, error in rsd_lib_utils.iter_concurrently(
+            _load, _iter_service_drives(storage_service_collection,
+                                        concurrency), concurrency):
+        if error is not None:
+            LOG.warning('Skipping the drive %(drive)s: %(error)s',
+                        {'drive': drive, 'error': error})
+            continue
+        yield record
@@ -18,6 +18,8 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_3.storage_service import volume
 from rsd_lib import utils as rsd_lib_utils
 
@@ -53,7 +55,7 @@ class IdentifierField(base.CompositeField):
     durable_name_format = base.Field('DurableNameFormat')
 
 
-class StoragePool(base.ResourceBase):
+class StoragePool(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The storage pool  identity string"""
@@ -98,8 +100,9 @@ class StoragePool(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return volume.VolumeCollection(
-            self._conn, self._get_allocated_volumes_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, volume.VolumeCollection,
+            self._get_allocated_volumes_path(),
             redfish_version=self.redfish_version)
 
     def _get_allocated_pools_path(self):
@@ -114,12 +117,13 @@ class StoragePool(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return StoragePoolCollection(
-            self._conn, self._get_allocated_pools_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, StoragePoolCollection,
+            self._get_allocated_pools_path(),
             redfish_version=self.redfish_version)
 
 
-class StoragePoolCollection(base.ResourceCollectionBase):
+class StoragePoolCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -18,10 +18,15 @@ import logging
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_3.fabric import endpoint
+from rsd_lib.resources.v2_3.storage_service import capacity
 from rsd_lib.resources.v2_3.storage_service import drive
+from rsd_lib.resources.v2_3.storage_service import drive_health
 from rsd_lib.resources.v2_3.storage_service import storage_pool
 from rsd_lib.resources.v2_3.storage_service import volume
+from rsd_lib import utils as rsd_lib_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -32,7 +37,7 @@ class StatusField(base.CompositeField):
     health_rollup = base.Field('HealthRollup')
 
 
-class StorageService(base.ResourceBase):
+class StorageService(rsd_lib_base.ResourceBase):
 
     description = base.Field('Description')
     """The storage service description"""
@@ -69,8 +74,9 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return volume.VolumeCollection(
-            self._conn, self._get_volume_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, volume.VolumeCollection,
+            self._get_volume_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_storage_pool_collection_path(self):
@@ -85,8 +91,9 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return storage_pool.StoragePoolCollection(
-            self._conn, self._get_storage_pool_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, storage_pool.StoragePoolCollection,
+            self._get_storage_pool_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_drive_collection_path(self):
@@ -101,8 +108,9 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return drive.DriveCollection(
-            self._conn, self._get_drive_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, drive.DriveCollection,
+            self._get_drive_collection_path(),
             redfish_version=self.redfish_version)
 
     def _get_endpoint_collection_path(self):
@@ -117,12 +125,13 @@ class StorageService(base.ResourceBase):
         It is calculated once when it is queried for the first time. On
         refresh, this property is reset.
         """
-        return endpoint.EndpointCollection(
-            self._conn, self._get_endpoint_collection_path(),
+        return rsd_lib_cache.get_resource(
+            self._conn, endpoint.EndpointCollection,
+            self._get_endpoint_collection_path(),
             redfish_version=self.redfish_version)
 
 
-class StorageServiceCollection(base.ResourceCollectionBase):
+class StorageServiceCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -139,3 +148,34 @@ class StorageServiceCollection(base.ResourceCollectionBase):
         """
         super(StorageServiceCollection, self).__init__(connector, path,
                                                        redfish_version)
+
+    def get_capacity_table(self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                           refresh=False):
+        """Return the capacity of the storage pools of every service
+
+        The storage pools are crawled in parallel the first time. The same
+        table is returned by later calls, refreshed incrementally when
+        ``refresh`` is True.
+
+        :param concurrency: The maximum number of resources loaded at once
+        :param refresh: Whether to update a previously built table
+        :returns: A CapacityTable instance
+        """
+        table = getattr(self, '_capacity_table', None)
+        if table is None:
+            table = self._capacity_table = capacity.CapacityTable(
+                self, concurrency=concurrency)
+            table.refresh()
+        elif refresh:
+            table.refresh()
+        return table
+
+    def iter_drive_health(self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """Stream the health of the drives of every storage service
+
+        See ``drive_health.scan_drive_health()``.
+
+        :param concurrency: The maximum number of requests in flight
+        :returns: A generator of DriveHealthRecord
+        """
+        return drive_health.scan_drive_health(self, concurrency=concurrency)
@@ -13,18 +13,203 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import jsonschema
+import collections
 import logging
+import posixpath
+import threading
+import time
+import weakref
 
 from sushy import exceptions
 from sushy.resources import base
 from sushy import utils
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib import resource_index as rsd_lib_index
 from rsd_lib.resources.v2_3.storage_service import volume_schemas
+from rsd_lib import task_monitor as rsd_lib_task_monitor
 from rsd_lib import utils as rsd_lib_utils
+from rsd_lib import validation as rsd_lib_validation
 
 LOG = logging.getLogger(__name__)
 
+VOLUME_CREATE = 'create'
+VOLUME_DELETE = 'delete'
+VOLUME_INITIALIZE = 'initialize'
+
+VolumeOperationResult = collections.namedtuple(
+    'VolumeOperationResult',
+    ['operation', 'target', 'identity', 'error', 'attempts', 'latency'])
+"""The outcome of one operation of a bulk volume operation
+
+``target`` is the ``create_volume()`` arguments dict of a creation and the
+volume identity otherwise. ``identity`` is the identity of the volume, None
+when a creation failed. ``error`` is the exception raised by the last
+attempt or None, ``attempts`` the number of requests sent and ``latency``
+the number of seconds the operation took, retries included.
+"""
+
+
+class VolumeBatchReport(object):
+    """The results of a bulk volume operation, in the order of the input"""
+
+    def __init__(self, results, elapsed):
+        """A class representing a bulk volume operation report
+
+        :param results: A list of VolumeOperationResult
+        :param elapsed: The number of seconds the whole operation took
+        """
+        self.results = results
+        self.elapsed = elapsed
+        """The number of seconds the whole operation took"""
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    @property
+    def succeeded(self):
+        """The results of the operations which succeeded"""
+        return [r for r in self.results if r.error is None]
+
+    @property
+    def failed(self):
+        """The results of the operations which failed"""
+        return [r for r in self.results if r.error is not None]
+
+    @property
+    def mean_latency(self):
+        """The mean latency of the operations in seconds"""
+        if not self.results:
+            return 0.0
+        return sum(r.latency for r in self.results) / len(self.results)
+
+    @property
+    def max_latency(self):
+        """The latency of the slowest operation in seconds"""
+        return max([r.latency for r in self.results] or [0.0])
+
+
+def get_volume_keys(json_doc):
+    """Return the lookup keys of a volume
+
+    The keys are ``('durable_name', name)`` for each identifier,
+    ``('endpoint', identity)`` for each linked endpoint and
+    ``('pool', identity)`` for each providing storage pool.
+
+    :param json_doc: The JSON representation of the volume
+    :returns: A set of keys
+    """
+    keys = set()
+    for identifier in json_doc.get('Identifiers') or ():
+        if identifier.get('DurableName'):
+            keys.add(('durable_name', identifier['DurableName']))
+
+    oem = ((json_doc.get('Links') or {}).get('Oem') or {}).get(
+        'Intel_RackScale') or {}
+    for link in oem.get('Endpoints') or ():
+        if link.get('@odata.id'):
+            keys.add(('endpoint',
+                      rsd_lib_utils.normalize_identity(link['@odata.id'])))
+
+    for source in json_doc.get('CapacitySources') or ():
+        for link in source.get('ProvidingPools') or ():
+            if link.get('@odata.id'):
+                keys.add(('pool',
+                          rsd_lib_utils.normalize_identity(link['@odata.id'])))
+    return keys
+
+
+class VolumeIndex(rsd_lib_index.ResourceIndex):
+    """A map of durable names, endpoints and pools to volume identities"""
+
+    def get_keys(self, json_doc):
+        return get_volume_keys(json_doc)
+
+    def find_by_durable_name(self, durable_name):
+        """Return the volumes with an identifier
+
+        :param durable_name: A durable name such as an NQN or NGUID
+        :returns: A sorted list of volume identities
+        """
+        return self.find(('durable_name', durable_name))
+
+    def find_by_endpoint(self, endpoint):
+        """Return the volumes exposed through an endpoint
+
+        :param endpoint: The identity of the endpoint
+        :returns: A sorted list of volume identities
+        """
+        return self.find(('endpoint',
+                          rsd_lib_utils.normalize_identity(endpoint)))
+
+    def find_by_pool(self, pool):
+        """Return the volumes allocated from a storage pool
+
+        :param pool: The identity of the storage pool
+        :returns: A sorted list of volume identities
+        """
+        return self.find(('pool', rsd_lib_utils.normalize_identity(pool)))
+
+    def resource_created(self, identity, json_doc):
+        """Record the indexed volumes exposed by a new endpoint
+
+        :param identity: The identity of the created resource
+        :param json_doc: The JSON representation of the resource
+        :returns: True if the index changed
+        """
+        key = ('endpoint', rsd_lib_utils.normalize_identity(identity))
+        changed = False
+        for entity in json_doc.get('ConnectedEntities') or ():
+            link = (entity.get('EntityLink') or {}).get('@odata.id')
+            if link and self.add_keys(link, [key]):
+                changed = True
+        return changed
+
+    def resource_deleted(self, identity):
+        """Forget a deleted endpoint
+
+        :param identity: The identity of the deleted resource
+        :returns: True if the index changed
+        """
+        return self.remove_key(
+            ('endpoint', rsd_lib_utils.normalize_identity(identity)))
+
+
+# Note: The rate limiters of the bulk operations of a connector, keyed by the
+# path of the storage service and the rate limit.
+_LIMITERS = weakref.WeakKeyDictionary()
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _get_limiter(connector, service_path, rate_limit):
+    """Return the rate limiter shared by the bulk operations of a service
+
+    :param connector: A Connector instance
+    :param service_path: The path of the storage service
+    :param rate_limit: The maximum number of requests per second, None to
+        not limit them
+    :returns: A RateLimiter instance
+    """
+    if not rate_limit:
+        return rsd_lib_utils.RateLimiter(None)
+    key = (rsd_lib_utils.normalize_identity(service_path), rate_limit)
+    with _LIMITERS_LOCK:
+        limiters = _LIMITERS.setdefault(connector, {})
+        if key not in limiters:
+            limiters[key] = rsd_lib_utils.RateLimiter(rate_limit)
+        return limiters[key]
+
+
+def _is_transient(error):
+    # Note: Only used for the deletions, a deletion is idempotent as a
+    # volume which doesn't exist anymore is reported as deleted.
+    return isinstance(error, (exceptions.ServerSideError,
+                              exceptions.ConnectionError))
+
 
 class StatusField(base.CompositeField):
     state = base.Field('State')
@@ -71,7 +256,7 @@ class VolumeActionsField(base.CompositeField):
     initialize = InitializeActionField('#Volume.Initialize')
 
 
-class Volume(base.ResourceBase):
+class Volume(rsd_lib_base.ResourceBase):
 
     identity = base.Field('Id', required=True)
     """The volume identity string"""
@@ -164,6 +349,7 @@ class Volume(base.ResourceBase):
             data['Oem']['Intel_RackScale']['Erased'] = erased
 
         self._conn.patch(self.path, data=data)
+        rsd_lib_cache.invalidate(self._conn, self.path)
 
     def _get_initialize_action_element(self):
         initialize_action = self._actions.initialize
@@ -176,7 +362,11 @@ class Volume(base.ResourceBase):
     def initialize(self, init_type):
         """Change initialize type of this volume
 
+        A slow initialization may run in the background, the returned handle
+        follows the task monitor of the service when it provides one.
+
         :param type: volume initialize type
+        :returns: A TaskMonitor instance
         :raises: InvalidParameterValueError if invalid "type" parameter
         """
         allowed_init_type_values = ['Fast', 'Slow']
@@ -188,14 +378,17 @@ class Volume(base.ResourceBase):
         data = {"InitializeType": init_type}
 
         target_uri = self._get_initialize_action_element().target_uri
-        self._conn.post(target_uri, data=data)
+        resp = self._conn.post(target_uri, data=data)
+        return rsd_lib_task_monitor.TaskMonitor.from_response(self._conn, resp)
 
     def delete(self):
         """Delete this volume"""
         self._conn.delete(self.path)
+        rsd_lib_cache.invalidate_member(self._conn, self.path)
+        rsd_lib_index.discard_from_index(self._conn, self.path)
 
 
-class VolumeCollection(base.ResourceCollectionBase):
+class VolumeCollection(rsd_lib_base.ResourceCollectionBase):
 
     @property
     def _resource_type(self):
@@ -218,29 +411,29 @@ class VolumeCollection(base.ResourceCollectionBase):
 
         request = {}
 
-        jsonschema.validate(capacity,
-                            volume_schemas.capacity_req_schema)
+        rsd_lib_validation.validate(
+            capacity, volume_schemas.capacity_req_schema)
         request['CapacityBytes'] = capacity
 
         if access_capabilities is not None:
-            jsonschema.validate(
+            rsd_lib_validation.validate(
                 access_capabilities,
                 volume_schemas.access_capabilities_req_schema)
             request['AccessCapabilities'] = access_capabilities
 
         if capacity_sources is not None:
-            jsonschema.validate(capacity_sources,
-                                volume_schemas.capacity_sources_req_schema)
+            rsd_lib_validation.validate(
+                capacity_sources, volume_schemas.capacity_sources_req_schema)
             request['CapacitySources'] = capacity_sources
 
         if replica_infos is not None:
-            jsonschema.validate(replica_infos,
-                                volume_schemas.replica_infos_req_schema)
+            rsd_lib_validation.validate(
+                replica_infos, volume_schemas.replica_infos_req_schema)
             request['ReplicaInfos'] = replica_infos
 
         if bootable is not None:
-            jsonschema.validate(bootable,
-                                volume_schemas.bootable_req_schema)
+            rsd_lib_validation.validate(
+                bootable, volume_schemas.bootable_req_schema)
             request['Oem'] = {"Intel_RackScale": {"Bootable": bootable}}
 
         return request
@@ -261,7 +454,191 @@ class VolumeCollection(base.ResourceCollectionBase):
             capacity=capacity, access_capabilities=access_capabilities,
             capacity_sources=capacity_sources, replica_infos=replica_infos,
             bootable=bootable)
+        return self._post_volume(properties)
+
+    def _post_volume(self, properties):
         resp = self._conn.post(self._path, data=properties)
+        rsd_lib_cache.invalidate(self._conn, self._path)
         LOG.info("Volume created at %s", resp.headers['Location'])
         volume_url = resp.headers['Location']
-        return volume_url[volume_url.find(self._path):]
+        volume_path = volume_url[volume_url.find(self._path):]
+        self._index_volume(volume_path)
+        return volume_path
+
+    def _index_volume(self, identity):
+        # Note: The volume identifiers are assigned by the service, the new
+        # volume has to be loaded to index it.
+        index = rsd_lib_index.get_index(self._conn, self._path)
+        if index is None:
+            return
+        try:
+            index.add(identity, self.get_member(identity)._json)
+            index.persist()
+        except Exception as e:
+            LOG.warning('Failed to index the volume %(identity)s, it will be '
+                        'indexed on the next sync: %(error)s',
+                        {'identity': identity, 'error': e})
+
+    def get_volume_index(self, concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                         path=None, rebuild=False):
+        """Return the index of the volumes of this collection
+
+        The index maps the durable names, endpoints and storage pools to
+        the volumes. It is built on first use, shared by every instance of
+        this collection and kept up to date by ``create_volume()`` and the
+        volume deletions. When a path is given, the index is loaded from
+        that file, its entries are revalidated with conditional requests,
+        only the volumes missing from it are fetched and the index is
+        written back to the file after every change.
+
+        :param concurrency: The maximum number of volumes loaded at once
+        :param path: The path of a file to persist the index to
+        :param rebuild: Whether to rebuild the index from scratch
+        :returns: A VolumeIndex instance
+        """
+        index = rsd_lib_index.get_index(self._conn, self._path)
+        if index is None or rebuild:
+            index = VolumeIndex(path)
+            if path is not None and not rebuild:
+                index.load()
+            index.sync(self, concurrency=concurrency)
+            index.persist()
+            rsd_lib_index.set_index(self._conn, self._path, index)
+        return index
+
+    def _delete_volume(self, identity):
+        try:
+            self._conn.delete(identity)
+        except exceptions.ResourceNotFoundError:
+            # Note: Deleted by a previous attempt or by someone else
+            LOG.debug('Volume %s is already deleted', identity)
+        rsd_lib_cache.invalidate_member(self._conn, identity)
+        rsd_lib_index.discard_from_index(self._conn, identity)
+        return identity
+
+    def _initialize_volume(self, identity, init_type):
+        self.get_member(identity).initialize(init_type)
+        return identity
+
+    def _run_batch(self, operation, targets, func, retryable, concurrency,
+                   rate_limit, retries, retry_interval):
+        limiter = _get_limiter(
+            self._conn,
+            posixpath.dirname(rsd_lib_utils.normalize_identity(self._path)),
+            rate_limit)
+
+        def _run(index):
+            attempts = []
+
+            def _call():
+                attempts.append(None)
+                limiter.wait()
+                return func(index)
+
+            start = time.time()
+            identity = error = None
+            try:
+                identity = rsd_lib_utils.call_with_retry(
+                    _call, retryable, retries=retries,
+                    retry_interval=retry_interval)
+            except Exception as e:
+                LOG.warning('Failed to %(operation)s volume %(target)s: '
+                            '%(error)s', {'operation': operation,
+                                          'target': targets[index],
+                                          'error': e})
+                error = e
+                if operation != VOLUME_CREATE:
+                    identity = targets[index]
+            return VolumeOperationResult(
+                operation, targets[index], identity, error, len(attempts),
+                time.time() - start)
+
+        start = time.time()
+        results = [result for _, result, _ in rsd_lib_utils.iter_concurrently(
+            _run, range(len(targets)), concurrency)]
+        return VolumeBatchReport(results, time.time() - start)
+
+    def create_volumes(self, requests,
+                       concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                       rate_limit=None, retries=2, retry_interval=1):
+        """Create many volumes concurrently
+
+        Every request is validated before the first volume is created. A
+        creation is only retried when the service answers 503 Service
+        Unavailable, so a volume is never created twice.
+
+        :param requests: A list of dicts of ``create_volume()`` arguments
+        :param concurrency: The maximum number of concurrent requests
+        :param rate_limit: The maximum number of requests per second sent
+            to the storage service by all the bulk operations using the
+            same limit, None to not limit them
+        :param retries: The maximum number of retries of an operation
+        :param retry_interval: The number of seconds to wait before the
+            first retry, doubled before each following one
+        :returns: A VolumeBatchReport
+        :raises: ValidationError if a request is invalid
+        """
+        properties = [self._create_volume_request(**request)
+                      for request in requests]
+        return self._run_batch(
+            VOLUME_CREATE, list(requests),
+            lambda i: self._post_volume(properties[i]),
+            rsd_lib_utils.is_service_unavailable,
+            concurrency, rate_limit, retries, retry_interval)
+
+    def delete_volumes(self, identities,
+                       concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                       rate_limit=None, retries=2, retry_interval=1):
+        """Delete many volumes concurrently
+
+        A volume which doesn't exist anymore is reported as deleted, so a
+        deletion can safely be retried on 5xx and connection errors.
+
+        :param identities: The identities of the volumes to delete
+        :param concurrency: The maximum number of concurrent requests
+        :param rate_limit: The maximum number of requests per second sent
+            to the storage service by all the bulk operations using the
+            same limit, None to not limit them
+        :param retries: The maximum number of retries of an operation
+        :param retry_interval: The number of seconds to wait before the
+            first retry, doubled before each following one
+        :returns: A VolumeBatchReport
+        """
+        identities = list(identities)
+        return self._run_batch(
+            VOLUME_DELETE, identities,
+            lambda i: self._delete_volume(identities[i]), _is_transient,
+            concurrency, rate_limit, retries, retry_interval)
+
+    def initialize_volumes(self, identities, init_type,
+                           concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY,
+                           rate_limit=None, retries=2, retry_interval=1):
+        """Initialize many volumes concurrently
+
+        An initialization is only retried when the service answers 503
+        Service Unavailable, so a volume is never initialized twice.
+
+        :param identities: The identities of the volumes to initialize
+        :param init_type: The volume initialize type, 'Fast' or 'Slow'
+        :param concurrency: The maximum number of concurrent requests
+        :param rate_limit: The maximum number of requests per second sent
+            to the storage service by all the bulk operations using the
+            same limit, None to not limit them
+        :param retries: The maximum number of retries of an operation
+        :param retry_interval: The number of seconds to wait before the
+            first retry, doubled before each following one
+        :returns: A VolumeBatchReport
+        :raises: InvalidParameterValueError if invalid "init_type" parameter
+        """
+        allowed_init_type_values = ['Fast', 'Slow']
+        if init_type not in allowed_init_type_values:
+            raise exceptions.InvalidParameterValueError(
+                parameter='init_type', value=init_type,
+                valid_values=allowed_init_type_values)
+
+        identities = list(identities)
+        return self._run_batch(
+            VOLUME_INITIALIZE, identities,
+            lambda i: self._initialize_volume(identities[i], init_type),
+            rsd_lib_utils.is_service_unavailable, concurrency, rate_limit,
+            retries, retry_interval)
@@ -0,0 +1,309 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+from email import utils as email_utils
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from sushy import exceptions
+
+from rsd_lib import utils as rsd_lib_utils
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5
+"""Seconds between two polls of a task monitor without Retry-After"""
+
+MAX_POLL_INTERVAL = 300
+"""Upper bound of the Retry-After delays honored"""
+
+_FAILED_TASK_STATES = ('Exception', 'Killed', 'Cancelled')
+
+
+class TaskFailedError(exceptions.SushyError):
+    message = 'Task %(task)s ended in state %(state)s: %(messages)s'
+
+
+def parse_retry_after(value, now=None):
+    """Return the delay requested by a Retry-After header
+
+    :param value: The header value, a number of seconds or an HTTP date
+    :param now: The current time, defaults to ``time.time()``
+    :returns: The number of seconds to wait, or None when the value can't
+        be parsed
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return min(int(value), MAX_POLL_INTERVAL)
+
+    parsed = email_utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    now = time.time() if now is None else now
+    return min(max(email_utils.mktime_tz(parsed) - now, 0),
+               MAX_POLL_INTERVAL)
+
+
+def _get_json(response):
+    try:
+        json_doc = response.json()
+    except ValueError:
+        return None
+    return json_doc if isinstance(json_doc, dict) else None
+
+
+def _is_accepted(response):
+    return getattr(response, 'status_code', None) == 202
+
+
+class TaskMonitor(object):
+    """A handle on an action which may complete asynchronously
+
+    When the service accepts the action with 202 Accepted and a Location
+    header, the handle follows that Redfish task monitor until it stops
+    answering 202. Otherwise the action is already complete. The outcome
+    is exposed through ``wait()`` and ``add_done_callback()``; polling is
+    done by a TaskScheduler shared by all the handles.
+    """
+
+    def __init__(self, connector, path=None, response=None,
+                 retry_after=None):
+        """A class representing a task monitor handle
+
+        :param connector: A Connector instance
+        :param path: The uri of the task monitor, None when the action
+            completed synchronously
+        :param response: The response of the action
+        :param retry_after: The number of seconds to wait before polling
+        """
+        self._conn = connector
+        self.path = path
+        """The uri of the task monitor, or None"""
+
+        self.retry_after = retry_after
+        """The delay requested by the service before the next poll"""
+
+        self.task_state = None
+        """The TaskState last reported by the service, if any"""
+
+        self.percent_complete = None
+        """The PercentComplete last reported by the service, if any"""
+
+        self._future = futures.Future()
+        self._future.set_running_or_notify_cancel()
+        self._scheduled = False
+        self._lock = threading.Lock()
+        if path is None:
+            self._future.set_result(response)
+
+    @classmethod
+    def from_response(cls, connector, response):
+        """Create the handle of an action from its response
+
+        :param connector: A Connector instance
+        :param response: The response of the POST, PATCH or DELETE request
+        :returns: A TaskMonitor instance
+        """
+        headers = getattr(response, 'headers', None) or {}
+        location = headers.get('Location') if _is_accepted(response) else None
+        if not location:
+            return cls(connector, response=response)
+        return cls(connector, path=location,
+                   retry_after=parse_retry_after(headers.get('Retry-After')))
+
+    def __repr__(self):
+        return '<%s %s %s>' % (self.__class__.__name__, self.path,
+                               'done' if self.done() else 'pending')
+
+    def done(self):
+        """Whether the action is complete"""
+        return self._future.done()
+
+    def poll(self):
+        """Query the task monitor once
+
+        :returns: True when the action is complete
+        """
+        if self.done():
+            return True
+        try:
+            response = self._conn.get(path=self.path)
+        except Exception as e:
+            self._future.set_exception(e)
+            return True
+
+        headers = getattr(response, 'headers', None) or {}
+        json_doc = _get_json(response)
+        if json_doc is not None:
+            self.task_state = json_doc.get('TaskState', self.task_state)
+            self.percent_complete = json_doc.get('PercentComplete',
+                                                 self.percent_complete)
+        if _is_accepted(response):
+            self.retry_after = parse_retry_after(headers.get('Retry-After'))
+            LOG.debug('Task %(task)s is still running (%(state)s)',
+                      {'task': self.path, 'state': self.task_state})
+            return False
+
+        if json_doc is not None and (
+                json_doc.get('TaskState') in _FAILED_TASK_STATES):
+            messages = '; '.join(m.get('Message', '') for m in
+                                 json_doc.get('Messages') or ())
+            self._future.set_exception(TaskFailedError(
+                task=self.path, state=json_doc['TaskState'],
+                messages=messages or 'no details'))
+        else:
+            self._future.set_result(response)
+        return True
+
+    def _schedule(self, scheduler):
+        with self._lock:
+            if self._scheduled or self.done():
+                return
+            self._scheduled = True
+        if scheduler is None:
+            scheduler = get_scheduler()
+        scheduler.add(self)
+
+    def add_done_callback(self, fn, scheduler=None):
+        """Call a function once the action is complete
+
+        :param fn: A callable taking this handle as argument
+        :param scheduler: The TaskScheduler polling the task monitor,
+            defaults to the shared scheduler
+        """
+        self._future.add_done_callback(lambda future: fn(self))
+        self._schedule(scheduler)
+
+    def wait(self, timeout=None, scheduler=None):
+        """Wait for the action to complete
+
+        :param timeout: The maximum number of seconds to wait, None to wait
+            forever
+        :param scheduler: The TaskScheduler polling the task monitor,
+            defaults to the shared scheduler
+        :returns: The final response of the action
+        :raises: TaskFailedError if the task failed
+        :raises: concurrent.futures.TimeoutError if the action is still
+            running after ``timeout`` seconds, the task keeps being polled
+        """
+        self._schedule(scheduler)
+        return self._future.result(timeout)
+
+
+class TaskScheduler(object):
+    """Poll many task monitors from a single background thread
+
+    The task monitors which are due are polled together through a bounded
+    pool of threads, each one is polled again after the Retry-After delay
+    requested by the service or ``poll_interval``. The thread exits when
+    no task is left and is started again on demand.
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL,
+                 concurrency=rsd_lib_utils.DEFAULT_CONCURRENCY):
+        """A class representing a task scheduler
+
+        :param poll_interval: The number of seconds between two polls of a
+            task monitor which doesn't send Retry-After
+        :param concurrency: The maximum number of concurrent polls
+        """
+        self.poll_interval = poll_interval
+        self._concurrency = concurrency
+        self._condition = threading.Condition()
+        self._counter = itertools.count()
+        # Note: Heap of (time of next poll, sequence, TaskMonitor)
+        self._queue = []
+        self._thread = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._queue)
+
+    def _push(self, monitor, delay):
+        heapq.heappush(self._queue,
+                       (time.time() + delay, next(self._counter), monitor))
+
+    def add(self, monitor):
+        """Poll a task monitor until its action is complete
+
+        :param monitor: A TaskMonitor instance
+        """
+        with self._condition:
+            delay = monitor.retry_after
+            self._push(monitor, self.poll_interval if delay is None
+                       else delay)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='rsd-lib-task-scheduler')
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                if not self._queue:
+                    self._thread = None
+                    return None
+                delay = self._queue[0][0] - time.time()
+                if delay <= 0:
+                    break
+                self._condition.wait(delay)
+
+            now = time.time()
+            batch = []
+            while self._queue and self._queue[0][0] <= now:
+                batch.append(heapq.heappop(self._queue)[2])
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            for monitor, done, error in rsd_lib_utils.iter_concurrently(
+                    lambda m: m.poll(), batch, self._concurrency):
+                if error is not None:
+                    LOG.warning('Failed to poll task %(task)s: %(error)s',
+                                {'task': monitor.path, 'error': error})
+                    if not monitor.done():
+                        monitor._future.set_exception(error)
+                elif not done:
+                    with self._condition:
+                        delay = monitor.retry_after
+                        self._push(monitor, self.poll_interval
+                                   if delay is None else delay)
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler():
+    """Return the scheduler shared by the task monitors
+
+    :returns: A TaskScheduler instance
+    """
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = TaskScheduler()
+        return _SCHEDULER
@@ -0,0 +1,157 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import mock
+import testtools
+
+from rsd_lib.resources.v2_1.ethernet_switch import acl_matcher
+
+
+def _rule(rule_id, action='Permit', **condition):
+    return {'@odata.id': '/Rules/%s' % rule_id, 'RuleId': rule_id,
+            'Action': action, 'Condition': condition}
+
+
+class ParseTestCase(testtools.TestCase):
+
+    def test_parse_ipv4(self):
+        self.assertEqual(0xC0A80101, acl_matcher.parse_ipv4('192.168.1.1'))
+        self.assertEqual(42, acl_matcher.parse_ipv4(42))
+        self.assertRaises(ValueError, acl_matcher.parse_ipv4, '192.168.1')
+        self.assertRaises(ValueError, acl_matcher.parse_ipv4, '1.2.3.256')
+
+    def test_parse_mac(self):
+        self.assertEqual(0x001122334455,
+                         acl_matcher.parse_mac('00:11:22:33:44:55'))
+        self.assertEqual(0x001122334455,
+                         acl_matcher.parse_mac('00-11-22-33-44-55'))
+        self.assertRaises(ValueError, acl_matcher.parse_mac, '00:11:22')
+
+    def test_compile_rule(self):
+        with open('rsd_lib/tests/unit/json_samples/v2_1/acl_rule.json',
+                  'r') as f:
+            entry = acl_matcher.compile_rule(json.loads(f.read()))
+
+        self.assertEqual(
+            '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/Rule1',
+            entry.identity)
+        self.assertEqual(1, entry.rule_id)
+        self.assertEqual('Mirror', entry.action)
+        self.assertEqual(
+            {'ip_source': (0, 0xFF),
+             'mac_source': (0x001122334455, 0xFFFFFFFFFFFF),
+             'vlan_id': (1088, 0xFFF),
+             'l4_source_port': (22, 0xFF)},
+            entry.conditions)
+
+
+class ACLMatcherTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ACLMatcherTestCase, self).setUp()
+        self.matcher = acl_matcher.ACLMatcher([
+            _rule(30, 'Deny'),
+            _rule(10, 'Deny',
+                  IPSource={'IPv4Address': '10.0.0.0',
+                            'Mask': '255.0.0.0'},
+                  L4DestinationPort={'Port': 22, 'Mask': None}),
+            _rule(20, 'Permit',
+                  IPSource={'IPv4Address': '10.1.0.0',
+                            'Mask': '255.255.0.0'},
+                  VLANId={'Id': 100, 'Mask': None}),
+            _rule(15, 'Mirror',
+                  MACSource={'Address': '00:11:22:00:00:00',
+                             'Mask': 'ff:ff:ff:00:00:00'},
+                  L4Protocol=6),
+            _rule(25, 'Deny',
+                  IPSource={'IPv4Address': '10.1.2.0',
+                            'Mask': '255.255.255.0'},
+                  VLANId={'Id': 100, 'Mask': 4095}),
+        ])
+
+    def test_rules_order(self):
+        self.assertEqual([10, 15, 20, 25, 30],
+                         [r.rule_id for r in self.matcher.rules])
+        self.assertEqual(5, len(self.matcher))
+
+    def test_match(self):
+        flow = acl_matcher.Flow(ip_source='10.1.2.3', vlan_id=100,
+                                l4_destination_port=22)
+        self.assertEqual(10, self.matcher.match(flow).rule_id)
+
+        flow = acl_matcher.Flow(ip_source='10.1.2.3', vlan_id=100,
+                                l4_destination_port=80)
+        self.assertEqual(20, self.matcher.match(flow).rule_id)
+
+        flow = acl_matcher.Flow(ip_source='11.1.2.3', vlan_id=100,
+                                mac_source='00:11:22:aa:bb:cc',
+                                l4_protocol=6)
+        self.assertEqual(15, self.matcher.match(flow).rule_id)
+
+        # Only the rule without condition matches an unknown field
+        self.assertEqual(30, self.matcher.match(
+            acl_matcher.Flow()).rule_id)
+
+    def test_match_integers(self):
+        flow = acl_matcher.Flow(ip_source=0x0A010203, vlan_id=100)
+        self.assertEqual(20, self.matcher.match(flow).rule_id)
+        # Memoized lookups give the same answer
+        self.assertEqual(20, self.matcher.match(flow).rule_id)
+
+    def test_match_none(self):
+        matcher = acl_matcher.ACLMatcher([
+            _rule(1, VLANId={'Id': 5, 'Mask': None})])
+        self.assertIsNone(matcher.match(acl_matcher.Flow(vlan_id=6)))
+        self.assertIsNone(acl_matcher.ACLMatcher([]).match(
+            acl_matcher.Flow(vlan_id=6)))
+
+    def test_match_all(self):
+        flow = acl_matcher.Flow(ip_source='10.1.2.3', vlan_id=100,
+                                l4_destination_port=22)
+        self.assertEqual([10, 20, 25, 30],
+                         [r.rule_id for r in self.matcher.match_all(flow)])
+
+    def test_shadowed_rules(self):
+        shadowed = self.matcher.shadowed_rules()
+        self.assertEqual([(25, 20)],
+                         [(s.rule_id, r.rule_id) for s, r in shadowed])
+
+    def test_shadowed_rules_wildcard(self):
+        matcher = acl_matcher.ACLMatcher([
+            _rule(1),
+            _rule(2, L4Protocol=17)])
+        self.assertEqual([(2, 1)],
+                         [(s.rule_id, r.rule_id)
+                          for s, r in matcher.shadowed_rules()])
+
+    def test_from_collection(self):
+        rule_col = mock.Mock()
+        rule_col.get_members.return_value = [
+            mock.Mock(json=_rule(2, L4Protocol=17)),
+            mock.Mock(json=_rule(1, L4Protocol=6))]
+
+        matcher = acl_matcher.ACLMatcher.from_collection(rule_col,
+                                                         concurrency=4)
+
+        rule_col.get_members.assert_called_once_with(concurrency=4)
+        self.assertEqual([1, 2], [r.rule_id for r in matcher.rules])
+        self.assertEqual(2, matcher.match(
+            acl_matcher.Flow(l4_protocol=17)).rule_id)
+
+    def test_invalid_rule(self):
+        self.assertRaises(ValueError, acl_matcher.ACLMatcher, [
+            _rule(1, IPSource={'IPv4Address': 'foo', 'Mask': None})])
@@ -19,6 +19,7 @@ import jsonschema
 import mock
 import testtools
 
+from rsd_lib.resources.v2_1.ethernet_switch import acl_matcher
 from rsd_lib.resources.v2_1.ethernet_switch import acl_rule
 from rsd_lib.tests.unit.fakes import request_fakes
 
@@ -126,6 +127,24 @@ class ACLRuleCollectionTestCase(testtools.TestCase):
         self.assertIsInstance(members, list)
         self.assertEqual(1, len(members))
 
+    @mock.patch.object(acl_matcher.ACLMatcher, 'from_collection',
+                       autospec=True)
+    def test_get_matcher(self, mock_from_collection):
+        matcher = self.acl_rule_col.get_matcher(concurrency=4)
+
+        self.assertIs(mock_from_collection.return_value, matcher)
+        mock_from_collection.assert_called_once_with(self.acl_rule_col,
+                                                     concurrency=4)
+        # The matcher is cached
+        self.assertIs(matcher, self.acl_rule_col.get_matcher())
+        self.assertEqual(1, mock_from_collection.call_count)
+
+        # Refreshing the collection drops the matcher
+        self.acl_rule_col.invalidate()
+        self.acl_rule_col.refresh(force=False)
+        self.acl_rule_col.get_matcher()
+        self.assertEqual(2, mock_from_collection.call_count)
+
     def test_add_acl_rule_reqs(self):
         reqs = {
             'RuleId': 1,
@@ -169,6 +188,7 @@ class ACLRuleCollectionTestCase(testtools.TestCase):
                 'L4Protocol': 1
             }
         }
+        self.acl_rule_col._cache_matcher = mock.sentinel.matcher
         result = self.acl_rule_col.add_acl_rule(reqs)
         self.acl_rule_col._conn.post.assert_called_once_with(
             '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules',
@@ -176,6 +196,8 @@ class ACLRuleCollectionTestCase(testtools.TestCase):
         self.assertEqual(result,
                          '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/'
                          'Rules/Rule1')
+        # The added rule drops the compiled matcher
+        self.assertIsNone(self.acl_rule_col._cache_matcher)
 
     def test_add_acl_rule_invalid_reqs(self):
         reqs = {
@@ -255,3 +277,152 @@ class ACLRuleCollectionTestCase(testtools.TestCase):
         self.assertRaises(jsonschema.exceptions.ValidationError,
                           self.acl_rule_col.add_acl_rule,
                           acl_rule_req)
+
+
+class ApplyACLRulesTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ApplyACLRulesTestCase, self).setUp()
+        docs = {}
+        for path, name in (
+                ('/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules',
+                 'acl_rule_collection.json'),
+                ('/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/'
+                 'Rule1', 'acl_rule.json')):
+            with open('rsd_lib/tests/unit/json_samples/v2_1/' + name,
+                      'r') as f:
+                docs[path] = json.loads(f.read())
+        self.conn = mock.Mock()
+        self.conn.get.side_effect = lambda path, **kwargs: mock.Mock(
+            json=mock.Mock(return_value=docs[path]), headers={})
+        self.locations = iter(['/Rules/Rule2', '/Rules/Rule3'])
+
+        def _post(path, data):
+            # Note: The created rule is listed by the collection
+            identity = ('/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1%s'
+                        % next(self.locations))
+            docs[identity] = dict(data, **{'@odata.id': identity})
+            docs[path] = dict(docs[path], Members=docs[path]['Members'] + [
+                {'@odata.id': identity}])
+            return mock.Mock(
+                headers={'Location': 'https://localhost:8443' + identity})
+        self.conn.post.side_effect = _post
+
+        self.acl_rule_col = acl_rule.ACLRuleCollection(
+            self.conn,
+            '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules',
+            redfish_version='1.0.2')
+
+        # Equivalent to Rule1: same normalized condition and mirroring
+        self.present_req = {
+            'Action': 'Mirror',
+            'ForwardMirrorInterface': {
+                '@odata.id': '/redfish/v1/EthernetSwitches/Switch1/Ports/'
+                             'Port9'},
+            'MirrorPortRegion': [
+                {'@odata.id': '/redfish/v1/EthernetSwitches/Switch1/Ports/'
+                              'Port2'},
+                {'@odata.id': '/redfish/v1/EthernetSwitches/Switch1/Ports/'
+                              'Port1'}],
+            'MirrorType': 'Bidirectional',
+            'Condition': {
+                'IPSource': {'IPv4Address': '192.168.8.0',
+                             'Mask': '0.0.0.255'},
+                'MACSource': {'MACAddress': '00:11:22:33:44:55'},
+                'VLANId': {'Id': 1088, 'Mask': None},
+                'L4SourcePort': {'Port': 22, 'Mask': 255}
+            }
+        }
+        self.deny_req = {'RuleId': 2, 'Action': 'Deny',
+                         'Condition': {'L4Protocol': 17}}
+        self.permit_req = {'RuleId': 3, 'Action': 'Permit',
+                           'Condition': {'VLANId': {'Id': 10}}}
+
+    def test_get_acl_rule_key(self):
+        self.assertEqual(
+            acl_rule.get_acl_rule_key(self.present_req),
+            acl_rule.get_acl_rule_key(
+                self.acl_rule_col.get_members()[0].json))
+        deny_req = dict(self.deny_req, Action='Permit')
+        self.assertNotEqual(acl_rule.get_acl_rule_key(self.deny_req),
+                            acl_rule.get_acl_rule_key(deny_req))
+
+    def test_apply_acl_rules(self):
+        self.acl_rule_col._cache_matcher = mock.sentinel.matcher
+        reqs = [self.present_req, self.deny_req, self.permit_req,
+                dict(self.deny_req, RuleId=4)]
+
+        results = self.acl_rule_col.apply_acl_rules(reqs, concurrency=2)
+
+        self.assertEqual(
+            [acl_rule.ApplyACLRuleResult(
+                self.present_req,
+                '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/Rule1',
+                False, None),
+             acl_rule.ApplyACLRuleResult(
+                self.deny_req,
+                '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/Rule2',
+                True, None),
+             acl_rule.ApplyACLRuleResult(
+                self.permit_req,
+                '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/Rule3',
+                True, None),
+             acl_rule.ApplyACLRuleResult(
+                reqs[3],
+                '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/Rule2',
+                False, None)],
+            results)
+        self.assertEqual(2, self.conn.post.call_count)
+        self.assertIsNone(self.acl_rule_col._cache_matcher)
+
+    def test_apply_acl_rules_idempotent(self):
+        results = self.acl_rule_col.apply_acl_rules([self.deny_req])
+        self.assertEqual([True], [r.added for r in results])
+
+        results = self.acl_rule_col.apply_acl_rules([self.deny_req])
+
+        self.assertEqual(
+            [acl_rule.ApplyACLRuleResult(
+                self.deny_req,
+                '/redfish/v1/EthernetSwitches/Switch1/ACLs/ACL1/Rules/Rule2',
+                False, None)],
+            results)
+        self.assertEqual(1, self.conn.post.call_count)
+
+    def test_apply_acl_rules_in_order(self):
+        permit_req = dict(self.permit_req)
+        permit_req.pop('RuleId')
+        posted = []
+        post = self.conn.post.side_effect
+        self.conn.post.side_effect = lambda path, data: (
+            posted.append(data) or post(path, data))
+
+        with mock.patch.object(acl_rule.rsd_lib_utils, 'iter_concurrently',
+                               wraps=acl_rule.rsd_lib_utils.iter_concurrently
+                               ) as mock_iter:
+            self.acl_rule_col.apply_acl_rules(
+                [self.deny_req, permit_req], concurrency=8)
+
+        # Without RuleId the rules are added one at a time
+        self.assertEqual(1, mock_iter.call_args[0][2])
+        self.assertEqual([self.deny_req, permit_req], posted)
+
+    def test_apply_acl_rules_failure(self):
+        error = Exception('boom')
+        self.conn.post.side_effect = error
+
+        results = self.acl_rule_col.apply_acl_rules(
+            [self.deny_req, dict(self.deny_req)])
+
+        self.assertEqual([(None, False, error)] * 2,
+                         [r[1:] for r in results])
+        self.assertEqual(1, self.conn.post.call_count)
+
+    def test_apply_acl_rules_invalid(self):
+        invalid_req = {'Action': 'Forward'}
+        self.conn.get.reset_mock()
+        self.assertRaises(jsonschema.exceptions.ValidationError,
+                          self.acl_rule_col.apply_acl_rules,
+                          [self.deny_req, invalid_req])
+        self.conn.get.assert_not_called()
+        self.conn.post.assert_not_called()
@@ -21,7 +21,9 @@ import testtools
 
 from rsd_lib.resources.v2_1.ethernet_switch import acl
 from rsd_lib.resources.v2_1.ethernet_switch import ethernet_switch
+from rsd_lib.resources.v2_1.ethernet_switch import mac_table
 from rsd_lib.resources.v2_1.ethernet_switch import port
+from rsd_lib.resources.v2_1.ethernet_switch import vlan_reconciler
 
 
 class EthernetSwtichTestCase(testtools.TestCase):
@@ -215,3 +217,31 @@ class EthernetSwitchCollectionTestCase(testtools.TestCase):
         self.assertEqual(mock_ethernet_switch.call_count, 1)
         self.assertIsInstance(members, list)
         self.assertEqual(1, len(members))
+
+    @mock.patch.object(mac_table, 'MACTable', autospec=True)
+    def test_get_mac_table(self, mock_table):
+        table = self.ethernet_switch_col.get_mac_table(concurrency=4)
+        mock_table.assert_called_once_with(self.ethernet_switch_col,
+                                           concurrency=4)
+        table.refresh.assert_called_once_with()
+
+        self.assertIs(table, self.ethernet_switch_col.get_mac_table())
+        self.assertEqual(1, table.refresh.call_count)
+        self.assertIs(table,
+                      self.ethernet_switch_col.get_mac_table(refresh=True))
+        self.assertEqual(2, table.refresh.call_count)
+        self.assertEqual(1, mock_table.call_count)
+
+    @mock.patch.object(vlan_reconciler, 'VLANReconciler', autospec=True)
+    def test_reconcile_vlans(self, mock_reconciler):
+        desired = {'/redfish/v1/EthernetSwitches/Switch1/Ports/Port1':
+                   set([(101, False)])}
+        result = self.ethernet_switch_col.reconcile_vlans(
+            desired, dry_run=True, concurrency=4, switch_rate_limit=10)
+
+        mock_reconciler.assert_called_once_with(
+            self.ethernet_switch_col, concurrency=4, switch_rate_limit=10)
+        mock_reconciler.return_value.reconcile.assert_called_once_with(
+            desired, dry_run=True)
+        self.assertIs(mock_reconciler.return_value.reconcile.return_value,
+                      result)
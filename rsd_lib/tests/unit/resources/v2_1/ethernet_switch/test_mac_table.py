@@ -0,0 +1,155 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from sushy import exceptions
+import testtools
+
+from rsd_lib.resources.v2_1.ethernet_switch import mac_table
+
+
+def _not_found():
+    return exceptions.ResourceNotFoundError(
+        method='GET', url='/', response=mock.MagicMock(status_code=404))
+
+
+class NormalizeMACTestCase(testtools.TestCase):
+
+    def test_normalize_mac(self):
+        self.assertEqual('00:aa:22:33:44:55',
+                         mac_table.normalize_mac('00-AA-22-33-44-55'))
+        self.assertRaises(ValueError, mac_table.normalize_mac, 'foo')
+
+
+class MACTableTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(MACTableTestCase, self).setUp()
+        # Note: StaticMACCollection path -> {StaticMAC path: (mac, vlan)}
+        self.macs = {
+            '/S/1/P/1/M': {'/S/1/P/1/M/1': ('00:11:22:33:44:55', 112),
+                           '/S/1/P/1/M/2': ('00:11:22:33:44:66', 112)},
+            '/S/1/P/2/M': {'/S/1/P/2/M/1': ('00-11-22-33-44-55', 113)},
+            '/S/2/P/1/M': {'/S/2/P/1/M/1': ('aa:bb:cc:dd:ee:ff', None)},
+        }
+        self.ports = {'/S/1': ['/S/1/P/1', '/S/1/P/2'],
+                      '/S/2': ['/S/2/P/1']}
+        self.mac_cols = {}
+        self.loaded = []
+
+        def get_switch(switch_id):
+            port_col = mock.Mock()
+            port_col.members_identities = self.ports[switch_id]
+            port_col.get_member.side_effect = lambda port_id: mock.Mock(
+                static_macs=self._get_mac_col(port_id + '/M'))
+            return mock.Mock(ports=port_col)
+
+        self.switch_col = mock.Mock(members_identities=['/S/1', '/S/2'])
+        self.switch_col.get_member.side_effect = get_switch
+        self.table = mac_table.MACTable(self.switch_col, concurrency=4)
+        self.table.refresh()
+
+    def _get_mac_col(self, path):
+        col = self.mac_cols.get(path)
+        if col is None:
+            col = self.mac_cols[path] = mock.Mock(path=path)
+            type(col).members_identities = mock.PropertyMock(
+                side_effect=lambda: sorted(self.macs[path]))
+            col.get_member.side_effect = (
+                lambda identity: self._get_static_mac(path, identity))
+        return col
+
+    def _get_static_mac(self, path, identity):
+        def refresh():
+            if identity not in self.macs[path]:
+                raise _not_found()
+            static_mac.mac_address, static_mac.vlan_id = (
+                self.macs[path][identity])
+
+        if identity not in self.macs[path]:
+            raise _not_found()
+        self.loaded.append(identity)
+        static_mac = mock.Mock(path=identity)
+        static_mac.refresh.side_effect = refresh
+        refresh()
+        return static_mac
+
+    def test_lookup(self):
+        self.assertEqual(4, len(self.table))
+        self.assertEqual(
+            [mac_table.MACTableEntry('/S/1', '/S/1/P/1', '/S/1/P/1/M/1',
+                                     '00:11:22:33:44:55', 112)],
+            self.table.lookup('00:11:22:33:44:55', 112))
+        self.assertEqual(
+            ['/S/1/P/1/M/1', '/S/1/P/2/M/1'],
+            [e.static_mac for e in self.table.lookup('00:11:22:33:44:55')])
+        self.assertEqual(['/S/2/P/1'], [
+            e.port for e in self.table.lookup('AA-BB-CC-DD-EE-FF')])
+        self.assertEqual([], self.table.lookup('00:11:22:33:44:55', 1))
+        self.assertEqual([], self.table.lookup('00:00:00:00:00:00'))
+
+    def test_get_entries(self):
+        self.assertEqual(
+            ['/S/1/P/1/M/1', '/S/1/P/1/M/2', '/S/1/P/2/M/1',
+             '/S/2/P/1/M/1'],
+            [e.static_mac for e in self.table.get_entries()])
+
+    def test_refresh(self):
+        del self.macs['/S/1/P/1/M']['/S/1/P/1/M/2']
+        self.macs['/S/1/P/2/M']['/S/1/P/2/M/1'] = ('00:11:22:33:44:77', 113)
+        self.macs['/S/2/P/1/M']['/S/2/P/1/M/2'] = ('00:11:22:33:44:88', 7)
+        del self.loaded[:]
+
+        self.table.refresh()
+
+        # Only the added static MAC is loaded, the others are refreshed
+        self.assertEqual(['/S/2/P/1/M/2'], self.loaded)
+        self.switch_col.refresh.assert_called_once_with()
+        self.mac_cols['/S/1/P/1/M'].refresh.assert_called_once_with()
+        self.assertEqual([], self.table.lookup('00:11:22:33:44:66'))
+        self.assertEqual(['/S/1/P/1/M/1'], [
+            e.static_mac for e in self.table.lookup('00:11:22:33:44:55')])
+        self.assertEqual(['/S/1/P/2/M/1'], [
+            e.static_mac for e in self.table.lookup('00:11:22:33:44:77')])
+        self.assertEqual(['/S/2/P/1/M/2'], [
+            e.static_mac for e in self.table.lookup('00:11:22:33:44:88', 7)])
+
+    def test_refresh_failure(self):
+        self.mac_cols['/S/1/P/2/M'].refresh.side_effect = Exception('boom')
+        self.table.refresh()
+        self.assertEqual(['/S/1/P/1/M/1'], [
+            e.static_mac for e in self.table.lookup('00:11:22:33:44:55')])
+
+    def test_invalidate(self):
+        del self.macs['/S/1/P/1/M']['/S/1/P/1/M/1']
+        self.macs['/S/1/P/1/M']['/S/1/P/1/M/2'] = ('00:11:22:33:44:99', 112)
+        self.macs['/S/1/P/1/M']['/S/1/P/1/M/3'] = ('00:11:22:33:44:aa', 1)
+        del self.loaded[:]
+
+        self.table.invalidate('/S/1/P/1/M/1', '/S/1/P/1/M/2/',
+                              '/S/1/P/1/M/3', '/S/9/P/1/M/1')
+
+        self.assertEqual(['/S/1/P/1/M/3'], self.loaded)
+        self.assertEqual(['/S/1/P/1/M/2', '/S/1/P/1/M/3', '/S/1/P/2/M/1',
+                          '/S/2/P/1/M/1'],
+                         [e.static_mac for e in self.table.get_entries()])
+        self.assertEqual(['/S/1/P/1/M/2'], [
+            e.static_mac for e in self.table.lookup('00:11:22:33:44:99')])
+        self.assertEqual([], self.table.lookup('00:11:22:33:44:66'))
+
+    def test_invalid_mac_address(self):
+        self.macs['/S/2/P/1/M']['/S/2/P/1/M/1'] = ('foo', 1)
+        self.table.invalidate('/S/2/P/1/M/1')
+        self.assertEqual(3, len(self.table))
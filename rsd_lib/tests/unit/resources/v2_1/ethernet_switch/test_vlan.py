@@ -44,6 +44,12 @@ class VLANTestCase(testtools.TestCase):
         self.assertEqual('System NIC 1 VLAN', self.vlan_inst.description)
         self.assertEqual(True, self.vlan_inst.vlan_enable)
         self.assertEqual(101, self.vlan_inst.vlan_id)
+        self.assertEqual(False, self.vlan_inst.tagged)
+
+    def test_delete(self):
+        self.vlan_inst.delete()
+        self.conn.delete.assert_called_once_with(
+            '/redfish/v1/EthernetSwitches/Switch1/Ports/Port1/VLANs/VLAN1')
 
 
 class VLANCollectionTestCase(testtools.TestCase):
@@ -0,0 +1,164 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import testtools
+
+from rsd_lib.resources.v2_1.ethernet_switch import vlan_reconciler
+
+
+class VLANReconcilerTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(VLANReconcilerTestCase, self).setUp()
+        self.calls = []
+        self.vlan_cols = {}
+        topology = {
+            '/S/1': {
+                '/S/1/P/1': {'/S/1/P/1/V/1': (101, False),
+                             '/S/1/P/1/V/2': (200, True)},
+                '/S/1/P/2': {'/S/1/P/2/V/1': (5, None),
+                             '/S/1/P/2/V/2': (7, True)},
+                '/S/1/P/3': {'/S/1/P/3/V/1': (9, True)},
+            },
+            '/S/2': {
+                '/S/2/P/1': {'/S/2/P/1/V/1': (101, False)},
+            },
+        }
+        self.switch_col = mock.Mock(members_identities=tuple(topology))
+        switches = {}
+        for switch_id, ports in topology.items():
+            port_col = mock.Mock(members_identities=tuple(ports))
+            port_col.get_member.side_effect = (
+                lambda port_id: mock.Mock(vlans=self.vlan_cols[port_id]))
+            switches[switch_id] = mock.Mock(ports=port_col)
+            for port_id, vlans in ports.items():
+                self.vlan_cols[port_id] = self._vlan_col(port_id, vlans)
+        self.switch_col.get_member.side_effect = switches.get
+
+        self.reconciler = vlan_reconciler.VLANReconciler(
+            self.switch_col, concurrency=4)
+
+    def _vlan_col(self, port_id, vlans):
+        members = {}
+        for vlan_id, (number, tagged) in vlans.items():
+            vlan = mock.Mock(path=vlan_id, vlan_id=number, tagged=tagged)
+            vlan.delete.side_effect = (
+                lambda vlan_id=vlan_id: self.calls.append(('delete',
+                                                           vlan_id)))
+            members[vlan_id] = vlan
+
+        def add_vlan(req):
+            self.calls.append(('add', port_id, req['VLANId']))
+            return '%s/V/%d' % (port_id, req['VLANId'])
+
+        vlan_col = mock.Mock(members_identities=tuple(sorted(vlans)))
+        vlan_col.get_member.side_effect = lambda identity: members[identity]
+        vlan_col.add_vlan.side_effect = add_vlan
+        return vlan_col
+
+    def test_plan(self):
+        changes = self.reconciler.plan({
+            '/S/1/P/1/': set([(101, False), (300, True)]),
+            '/S/1/P/2': set([(5, True), (7, False)]),
+            '/S/2/P/1': set(),
+        })
+
+        self.assertEqual([
+            vlan_reconciler.VLANChange('delete', '/S/1/P/1', 200, True,
+                                       '/S/1/P/1/V/2'),
+            vlan_reconciler.VLANChange('add', '/S/1/P/1', 300, True, None),
+            vlan_reconciler.VLANChange('delete', '/S/1/P/2', 7, True,
+                                       '/S/1/P/2/V/2'),
+            vlan_reconciler.VLANChange('add', '/S/1/P/2', 7, False, None),
+            vlan_reconciler.VLANChange('delete', '/S/2/P/1', 101, False,
+                                       '/S/2/P/1/V/1'),
+        ], changes)
+        # Only the desired ports are loaded
+        self.vlan_cols['/S/1/P/3'].get_member.assert_not_called()
+        self.vlan_cols['/S/1/P/1'].refresh.assert_called_once_with()
+        self.switch_col.refresh.assert_called_once_with()
+        self.switch_col.get_member(
+            '/S/1').ports.refresh.assert_called_once_with()
+
+    def test_plan_nothing_to_change(self):
+        self.assertEqual([], self.reconciler.plan({
+            '/S/1/P/2': set([(5, False), (7, True)])}))
+
+    def test_plan_skips_unloaded_ports(self):
+        self.vlan_cols['/S/1/P/1'].get_member.side_effect = Exception('boom')
+
+        changes = self.reconciler.plan({
+            '/S/1/P/1': set(),
+            '/S/1/P/9': set([(1, True)]),
+            '/S/2/P/1': set()})
+
+        self.assertEqual(['/S/2/P/1'], [c.port for c in changes])
+
+    def test_apply(self):
+        changes = self.reconciler.plan({
+            '/S/1/P/1': set([(101, False), (300, True)]),
+            '/S/2/P/1': set([(102, True)])})
+
+        results = self.reconciler.apply(changes)
+
+        self.assertEqual(
+            [(c, i, None) for c, i in zip(changes, [
+                '/S/1/P/1/V/2', '/S/1/P/1/V/300', '/S/2/P/1/V/1',
+                '/S/2/P/1/V/102'])],
+            results)
+        # The deletions are applied before the additions
+        self.assertEqual(['delete', 'delete', 'add', 'add'],
+                         [call[0] for call in self.calls])
+        self.vlan_cols['/S/1/P/1'].add_vlan.assert_called_once_with(
+            {'VLANId': 300, 'VLANEnable': True,
+             'Oem': {'Intel_RackScale': {'Tagged': True}}})
+
+    def test_apply_failure(self):
+        error = Exception('boom')
+        self.vlan_cols['/S/1/P/1'].add_vlan.side_effect = error
+        changes = self.reconciler.plan({
+            '/S/1/P/1': set([(300, True)]),
+            '/S/2/P/1': set()})
+
+        results = self.reconciler.apply(changes)
+
+        self.assertEqual(
+            [('/S/1/P/1/V/1', None), ('/S/1/P/1/V/2', None),
+             (None, error), ('/S/2/P/1/V/1', None)],
+            [(r.identity, r.error) for r in results])
+
+    @mock.patch.object(vlan_reconciler.rsd_lib_utils, 'RateLimiter',
+                       autospec=True)
+    def test_apply_switch_rate_limit(self, mock_limiter):
+        reconciler = vlan_reconciler.VLANReconciler(
+            self.switch_col, switch_rate_limit=5)
+        reconciler.apply(reconciler.plan({
+            '/S/1/P/1': set(), '/S/1/P/2': set(), '/S/2/P/1': set()}))
+
+        self.assertEqual([mock.call(5), mock.call(5)],
+                         mock_limiter.call_args_list)
+        self.assertEqual(5, mock_limiter.return_value.wait.call_count)
+
+    def test_reconcile(self):
+        desired = {'/S/2/P/1': set()}
+        changes = self.reconciler.reconcile(desired, dry_run=True)
+        self.assertEqual([vlan_reconciler.VLAN_DELETE],
+                         [c.action for c in changes])
+        self.assertEqual([], self.calls)
+
+        results = self.reconciler.reconcile(desired)
+        self.assertEqual(changes, [r.change for r in results])
+        self.assertEqual([('delete', '/S/2/P/1/V/1')], self.calls)
@@ -18,6 +18,7 @@ import json
 import mock
 import testtools
 
+from rsd_lib import resource_index as rsd_lib_index
 from rsd_lib.resources.v2_1.fabric import endpoint
 
 
@@ -106,3 +107,55 @@ class EndpointCollectionTestCase(testtools.TestCase):
             redfish_version=self.endpoint_col.redfish_version)
         self.assertIsInstance(members, list)
         self.assertEqual(3, len(members))
+
+    def test_get_endpoint_index(self):
+        with open('rsd_lib/tests/unit/json_samples/v2_1/'
+                  'endpoint.json', 'r') as f:
+            endpoint_json = json.loads(f.read())
+
+        def _get_member(identity):
+            if identity.endswith('HostRootComplex1'):
+                raise ValueError('boom')
+            return mock.Mock(_json=endpoint_json)
+        self.endpoint_col.get_member = mock.Mock(side_effect=_get_member)
+
+        index = self.endpoint_col.get_endpoint_index()
+
+        self.assertEqual(2, len(index))
+        self.assertEqual(
+            ['/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF1',
+             '/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF2'],
+            self.endpoint_col.find_endpoints(
+                '00000000-0000-0000-0000-000000000000'))
+        self.assertEqual(
+            2, len(self.endpoint_col.find_endpoints(
+                '/redfish/v1/Chassis/PCIeSwitch1/Drives/Disk.Bay.0/')))
+        self.assertEqual([], self.endpoint_col.find_endpoints('unknown'))
+
+        # The index is shared and kept current
+        other_col = endpoint.EndpointCollection(
+            self.conn, '/redfish/v1/Fabrics/PCIe/Endpoints',
+            redfish_version='1.0.2')
+        self.assertIs(index, other_col.get_endpoint_index())
+        self.assertEqual(3, self.endpoint_col.get_member.call_count)
+        rsd_lib_index.discard_from_index(
+            self.conn, '/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF1')
+        self.assertEqual(
+            ['/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF2'],
+            other_col.find_endpoints('00000000-0000-0000-0000-000000000000'))
+
+        self.assertIsNot(index,
+                         self.endpoint_col.get_endpoint_index(rebuild=True))
+
+    def test_get_endpoint_keys(self):
+        self.assertEqual(
+            set(['nqn.1', '/redfish/v1/Volumes/1', '192.168.0.10',
+                 'fe80::1']),
+            endpoint.get_endpoint_keys({
+                'Identifiers': [{'DurableName': 'nqn.1'}],
+                'ConnectedEntities': [
+                    {'EntityLink': {'@odata.id': '/redfish/v1/Volumes/1/'}}],
+                'IPTransportDetails': [
+                    {'IPv4Address': {'Address': '192.168.0.10'},
+                     'IPv6Address': {}},
+                    {'IPv6Address': {'Address': 'fe80::1'}}]}))
@@ -16,8 +16,12 @@
 import json
 
 import mock
+from sushy import exceptions
 import testtools
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
+from rsd_lib.resources.v2_1.fabric import endpoint
 from rsd_lib.resources.v2_1.fabric import zone
 
 
@@ -83,8 +87,10 @@ class ZoneTestCase(testtools.TestCase):
                   'zone.json', 'r') as f:
             self.conn.get.return_value.json.return_value = json.loads(f.read())
 
+        endpoints = self.zone_inst.endpoints
         self.zone_inst.invalidate()
         self.zone_inst.refresh(force=False)
+        self.assertIsNot(endpoints, self.zone_inst.endpoints)
 
         # | GIVEN |
         with open('rsd_lib/tests/unit/json_samples/v2_1/'
@@ -94,6 +100,51 @@ class ZoneTestCase(testtools.TestCase):
         self.assertEqual('NVMeDrivePF1', self.zone_inst.endpoints[0].identity)
         self.assertEqual(2, len(self.zone_inst.endpoints))
 
+    def test_endpoints_lazy(self):
+        with open('rsd_lib/tests/unit/json_samples/v2_1/'
+                  'endpoint.json', 'r') as f:
+            self.conn.get.return_value.json.return_value = json.loads(f.read())
+        self.conn.get.reset_mock()
+
+        actual_endpoints = self.zone_inst.endpoints
+
+        self.assertIsInstance(actual_endpoints,
+                              rsd_lib_base.LazyResourceList)
+        self.conn.get.assert_not_called()
+        self.assertEqual(2, len(actual_endpoints))
+        actual_endpoints[1]
+        self.conn.get.assert_called_once_with(
+            path='/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF2')
+
+    def test_get_endpoints(self):
+        with open('rsd_lib/tests/unit/json_samples/v2_1/'
+                  'endpoint.json', 'r') as f:
+            self.conn.get.return_value.json.return_value = json.loads(f.read())
+        self.conn.get.reset_mock()
+
+        actual_endpoints = self.zone_inst.get_endpoints()
+
+        self.assertIsInstance(actual_endpoints, list)
+        self.assertEqual(
+            ['/redfish/v1/Fabrics/PCIe/Endpoints/HostRootComplex1',
+             '/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF2'],
+            sorted(c[1]['path'] for c in self.conn.get.call_args_list))
+
+    def test_endpoints_reuses_fabric_endpoints(self):
+        rsd_lib_cache.register(self.conn, rsd_lib_cache.ResourceCache())
+        self.addCleanup(rsd_lib_cache.register, self.conn, None)
+        loaded = mock.Mock(
+            path='/redfish/v1/Fabrics/PCIe/Endpoints/HostRootComplex1')
+        endpoint_col = rsd_lib_cache.get_resource(
+            self.conn, endpoint.EndpointCollection,
+            '/redfish/v1/Fabrics/PCIe/Endpoints')
+        endpoint_col._cache_get_members = [loaded]
+        self.conn.get.reset_mock()
+
+        self.assertIs(loaded, self.zone_inst.get_endpoints()[0])
+        self.conn.get.assert_called_once_with(
+            path='/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF2')
+
     def test_update(self):
         self.zone_inst.update(
             ['/redfish/v1/Fabrics/PCIe/Endpoints/NVMeDrivePF1'])
@@ -151,3 +202,114 @@ class ZoneCollectionTestCase(testtools.TestCase):
             redfish_version=self.zone_col.redfish_version)
         self.assertIsInstance(members, list)
         self.assertEqual(2, len(members))
+
+    def _fake_zones(self, *endpoints_per_zone):
+        zones = {}
+        for index, endpoints in enumerate(endpoints_per_zone):
+            path = '/redfish/v1/Fabrics/PCIe/Zones/%d' % (index + 1)
+            zones[path] = mock.Mock(path=path)
+            zones[path].links.endpoint_identities = endpoints
+        # Note: The collection lists the zones on its next refresh
+        self.conn.get.return_value.json.return_value = {
+            'Members': [{'@odata.id': path} for path in sorted(zones)]}
+
+        def _get_member(identity):
+            if identity not in zones:
+                raise exceptions.ResourceNotFoundError(
+                    method='GET', url=identity,
+                    response=mock.MagicMock(status_code=404))
+            return zones[identity]
+        self.zone_col.get_member = mock.Mock(side_effect=_get_member)
+        return zones
+
+    def test_plan_reconcile(self):
+        self._fake_zones(('/E/1', '/E/2'), ('/E/3',))
+
+        with mock.patch.object(self.zone_col, 'refresh',
+                               wraps=self.zone_col.refresh) as mock_refresh:
+            changes = self.zone_col.plan_reconcile({
+                '/redfish/v1/Fabrics/PCIe/Zones/1': ['/E/2', '/E/1/'],
+                '/redfish/v1/Fabrics/PCIe/Zones/2': ['/E/3', '/E/4']})
+
+        mock_refresh.assert_called_once_with(force=True)
+
+        self.assertEqual(
+            [zone.ZoneChange(zone.ZONE_UPDATE,
+                             '/redfish/v1/Fabrics/PCIe/Zones/2',
+                             ('/E/3', '/E/4'), frozenset(['/E/4']),
+                             frozenset())],
+            changes)
+
+    def test_plan_reconcile_changed_elsewhere(self):
+        self.zone_col.create_zone = mock.Mock()
+        self._fake_zones(('/E/1',))
+        self.zone_col.refresh()
+        self.assertEqual(1, len(self.zone_col.get_members()))
+        zones = self._fake_zones(('/E/1',), ('/E/2',), ('/E/3',))
+        # Note: Zones/3 is listed but was deleted meanwhile
+        del zones['/redfish/v1/Fabrics/PCIe/Zones/3']
+
+        # Zones/2 was created by another client
+        self.assertEqual(
+            [], self.zone_col.plan_reconcile({
+                '/redfish/v1/Fabrics/PCIe/Zones/1': ['/E/1'],
+                '/redfish/v1/Fabrics/PCIe/Zones/2': ['/E/2']}))
+        with mock.patch.object(zone.Zone, 'delete', create=True):
+            changes = self.zone_col.plan_reconcile(
+                {'/redfish/v1/Fabrics/PCIe/Zones/1': ['/E/1']}, prune=True)
+        self.assertEqual(
+            [(zone.ZONE_DELETE, '/redfish/v1/Fabrics/PCIe/Zones/2')],
+            [(c.action, c.zone) for c in changes])
+
+    def test_plan_reconcile_refreshes_cached_zones(self):
+        zones = self._fake_zones(('/E/1',))
+        with mock.patch.object(rsd_lib_cache, 'get_cache', autospec=True):
+            self.zone_col.plan_reconcile({})
+        zone1 = zones['/redfish/v1/Fabrics/PCIe/Zones/1']
+        zone1.refresh.assert_called_once_with()
+
+    def test_plan_reconcile_load_failure(self):
+        self._fake_zones(('/E/1',))
+        self.zone_col.get_member.side_effect = exceptions.ServerSideError(
+            method='GET', url='/', response=mock.MagicMock(status_code=500))
+        self.assertRaises(exceptions.ServerSideError,
+                          self.zone_col.plan_reconcile, {})
+
+    def test_plan_reconcile_create_not_supported(self):
+        self._fake_zones(('/E/1',))
+        self.assertRaises(ValueError, self.zone_col.plan_reconcile,
+                          {'new': ['/E/2']})
+        self.assertRaises(ValueError, self.zone_col.plan_reconcile,
+                          {}, prune=True)
+        self.assertEqual(
+            [], self.zone_col.plan_reconcile({'new': None}, prune=False))
+
+    def test_reconcile(self):
+        zones = self._fake_zones(('/E/1',), ('/E/2',), ('/E/3',))
+        error = ValueError('boom')
+        zones['/redfish/v1/Fabrics/PCIe/Zones/3'].update.side_effect = error
+
+        results = self.zone_col.reconcile({
+            '/redfish/v1/Fabrics/PCIe/Zones/1': ['/E/1'],
+            '/redfish/v1/Fabrics/PCIe/Zones/2': ['/E/1', '/E/2'],
+            '/redfish/v1/Fabrics/PCIe/Zones/3': []})
+
+        self.assertEqual(2, len(results))
+        self.assertEqual('/redfish/v1/Fabrics/PCIe/Zones/2',
+                         results[0].identity)
+        self.assertIsNone(results[0].error)
+        self.assertIs(error, results[1].error)
+        zones['/redfish/v1/Fabrics/PCIe/Zones/1'].update.assert_not_called()
+        zone2 = zones['/redfish/v1/Fabrics/PCIe/Zones/2']
+        zone2.update.assert_called_once_with(['/E/1', '/E/2'])
+        self.assertTrue(self.zone_col._is_stale)
+
+    def test_reconcile_dry_run(self):
+        zones = self._fake_zones(('/E/1',))
+
+        changes = self.zone_col.reconcile(
+            {'/redfish/v1/Fabrics/PCIe/Zones/1': ['/E/2']}, dry_run=True)
+
+        self.assertEqual([zone.ZONE_UPDATE], [c.action for c in changes])
+        zones['/redfish/v1/Fabrics/PCIe/Zones/1'].update.assert_not_called()
+        self.assertFalse(self.zone_col._is_stale)
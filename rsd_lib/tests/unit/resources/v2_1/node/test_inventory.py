@@ -0,0 +1,218 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import json
+
+import mock
+import testtools
+
+from rsd_lib.resources.v2_1.node import inventory
+
+
+def _load(name):
+    with open('rsd_lib/tests/unit/json_samples/v2_1/%s.json' % name,
+              'r') as f:
+        return json.loads(f.read())
+
+
+class InventoryTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(InventoryTestCase, self).setUp()
+        self.system_json = _load('system')
+        self.processor_json = _load('processor')
+        self.memory_json = _load('memory')
+
+        small_json = copy.deepcopy(self.system_json)
+        small_json['@odata.id'] = '/redfish/v1/Systems/small'
+        small_json['Links']['Chassis'] = [
+            {'@odata.id': '/redfish/v1/Chassis/2U'}]
+        small_processor = dict(self.processor_json, TotalCores=2,
+                               InstructionSet='x86')
+
+        self.big = inventory.build_system_record(
+            self.system_json, [self.processor_json, self.processor_json],
+            [self.memory_json])
+        self.small = inventory.build_system_record(
+            small_json, [small_processor], [])
+        self.inventory = inventory.Inventory([self.big, self.small])
+
+    def test_build_system_record(self):
+        self.assertEqual('/redfish/v1/Systems/437XR1138R2', self.big.identity)
+        self.assertEqual(frozenset(['/redfish/v1/Chassis/1U']),
+                         self.big.chassis)
+        self.assertEqual(16, self.big.total_cores)
+        self.assertEqual(16384, self.big.total_memory_mib)
+
+    def test_build_system_record_memory_summary(self):
+        # Without memory modules the memory summary is used
+        self.assertEqual(2, self.small.total_cores)
+        self.assertEqual(96 * 1024, self.small.total_memory_mib)
+
+    def test_len(self):
+        self.assertEqual(2, len(self.inventory))
+
+    def test_find_systems_no_requirement(self):
+        self.assertEqual(
+            ['/redfish/v1/Systems/small', '/redfish/v1/Systems/437XR1138R2'],
+            self.inventory.find_systems())
+
+    def test_find_systems_total_cores(self):
+        self.assertEqual(['/redfish/v1/Systems/437XR1138R2'],
+                         self.inventory.find_systems(total_system_core_req=3))
+        self.assertEqual([],
+                         self.inventory.find_systems(total_system_core_req=17))
+
+    def test_find_systems_total_memory(self):
+        self.assertEqual(
+            ['/redfish/v1/Systems/small'],
+            self.inventory.find_systems(total_system_memory_req=32768))
+        self.assertEqual(
+            [], self.inventory.find_systems(total_system_memory_req=98305))
+
+    def test_find_systems_processor_req(self):
+        self.assertEqual(
+            ['/redfish/v1/Systems/437XR1138R2'],
+            self.inventory.find_systems(processor_req=[
+                {'Model': 'Intel(R) Xeon(R)', 'InstructionSet': 'x86-64',
+                 'AchievableSpeedMHz': 3000}]))
+        self.assertEqual(
+            [], self.inventory.find_systems(processor_req=[
+                {'Model': 'ARM Cortex'}]))
+        self.assertEqual(
+            [], self.inventory.find_systems(processor_req=[
+                {'AchievableSpeedMHz': 4000}]))
+
+    def test_find_systems_processor_req_distinct_processors(self):
+        # Each requirement needs its own processor
+        self.assertEqual(
+            ['/redfish/v1/Systems/437XR1138R2'],
+            self.inventory.find_systems(processor_req=[
+                {'TotalCores': 8}, {'TotalCores': 8}]))
+        self.assertEqual(
+            [], self.inventory.find_systems(processor_req=[
+                {'TotalCores': 8}, {'TotalCores': 8}, {'TotalCores': 8}]))
+
+    def test_find_systems_processor_req_resource_and_chassis(self):
+        self.assertEqual(
+            ['/redfish/v1/Systems/small'],
+            self.inventory.find_systems(processor_req=[
+                {'Chassis': {'@odata.id': '/redfish/v1/Chassis/2U'}}]))
+        self.assertEqual(
+            ['/redfish/v1/Systems/small', '/redfish/v1/Systems/437XR1138R2'],
+            self.inventory.find_systems(processor_req=[
+                {'Resource': {'@odata.id': self.processor_json[
+                    '@odata.id']}}]))
+
+    def test_find_systems_memory_req(self):
+        self.assertEqual(
+            ['/redfish/v1/Systems/437XR1138R2'],
+            self.inventory.find_systems(memory_req=[
+                {'CapacityMiB': 16000, 'MemoryDeviceType': 'DDR4',
+                 'SpeedMHz': 2667, 'Manufacturer': 'Contoso'}]))
+        self.assertEqual(
+            [], self.inventory.find_systems(memory_req=[
+                {'MemoryDeviceType': 'DDR3'}]))
+        self.assertEqual(
+            [], self.inventory.find_systems(memory_req=[
+                {'SpeedMHz': 3200}]))
+
+    def test_find_systems_unknown_values_match(self):
+        processor = dict(self.processor_json)
+        del processor['Model']
+        record = inventory.build_system_record(
+            self.system_json, [processor], [])
+        self.assertEqual(
+            ['/redfish/v1/Systems/437XR1138R2'],
+            inventory.Inventory([record]).find_systems(processor_req=[
+                {'Model': 'Any', 'Oem': {'Brand': 'E5'}}]))
+
+    def test_build_system_record_unknown_totals(self):
+        system_json = copy.deepcopy(self.system_json)
+        del system_json['MemorySummary']['TotalSystemMemoryGiB']
+        processor = dict(self.processor_json)
+        del processor['TotalCores']
+        memory = dict(self.memory_json)
+        del memory['CapacityMiB']
+
+        record = inventory.build_system_record(
+            system_json, [self.processor_json, processor], [memory])
+
+        self.assertIsNone(record.total_cores)
+        self.assertIsNone(record.total_memory_mib)
+        self.assertIsNone(inventory.build_system_record(
+            system_json, [], []).total_cores)
+
+    def test_find_systems_unknown_totals_match(self):
+        system_json = copy.deepcopy(self.system_json)
+        system_json['@odata.id'] = '/redfish/v1/Systems/unknown'
+        del system_json['MemorySummary']['TotalSystemMemoryGiB']
+        record = inventory.build_system_record(system_json, [], [])
+        inv = inventory.Inventory([self.big, self.small, record])
+
+        self.assertEqual(3, len(inv))
+        # A system whose totals are unknown is never filtered out by them
+        self.assertEqual(
+            ['/redfish/v1/Systems/437XR1138R2', '/redfish/v1/Systems/unknown'],
+            inv.find_systems(total_system_core_req=3))
+        self.assertEqual(
+            ['/redfish/v1/Systems/unknown'],
+            inv.find_systems(total_system_core_req=64,
+                             total_system_memory_req=1024 * 1024))
+
+    def test_load(self):
+        system_col = mock.Mock()
+        system_col.members_identities = ('/redfish/v1/Systems/1',
+                                         '/redfish/v1/Systems/2',
+                                         '/redfish/v1/Systems/3')
+
+        def _get_member(identity):
+            if identity.endswith('3'):
+                raise ValueError('boom')
+            system = mock.Mock(_json=dict(self.system_json,
+                                          **{'@odata.id': identity}))
+            system.processors.get_members.return_value = [
+                mock.Mock(_json=self.processor_json)]
+            system.memory.get_members.return_value = [
+                mock.Mock(_json=self.memory_json)]
+            return system
+        system_col.get_member.side_effect = _get_member
+
+        composed = mock.Mock()
+        composed.links.system = '/redfish/v1/Systems/1/'
+        result = inventory.Inventory.load(system_col, [composed])
+
+        # The system which failed to load is kept as an unknown system
+        self.assertEqual(2, len(result))
+        self.assertEqual(['/redfish/v1/Systems/2', '/redfish/v1/Systems/3'],
+                         result.find_systems())
+        self.assertEqual(['/redfish/v1/Systems/3'], result.find_systems(
+            processor_req=[{'TotalCores': 1024}],
+            total_system_core_req=1024))
+        self.assertEqual(2, system_col.get_member.call_count)
+
+    def test_find_systems_unknown_system_matches(self):
+        inv = inventory.Inventory([
+            self.small,
+            inventory.build_unknown_system_record('/redfish/v1/Systems/x')])
+
+        processor_req = {'Model': 'Multi-Core Intel(R) Xeon(R)',
+                         'Chassis': {'@odata.id': '/redfish/v1/Chassis/9'}}
+        self.assertEqual(['/redfish/v1/Systems/x'], inv.find_systems(
+            processor_req=[processor_req] * 4,
+            memory_req=[{'CapacityMiB': 1}],
+            total_system_core_req=64,
+            total_system_memory_req=1024 * 1024))
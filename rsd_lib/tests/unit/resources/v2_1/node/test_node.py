@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 import json
 import jsonschema
 import mock
@@ -21,9 +22,11 @@ import testtools
 from sushy import exceptions
 from sushy.resources.system import system
 
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources.v2_1.node import constants as node_cons
 from rsd_lib.resources.v2_1.node import mappings as node_maps
 from rsd_lib.resources.v2_1.node import node
+from rsd_lib import task_monitor
 from rsd_lib.tests.unit.fakes import request_fakes
 
 
@@ -197,6 +200,16 @@ class NodeTestCase(testtools.TestCase):
         self.node_inst._conn.post.assert_called_once_with(
             '/redfish/v1/Nodes/Node1/Actions/ComposedNode.Assemble')
 
+    def test_assemble_node_task_monitor(self):
+        self.node_inst._conn.post.return_value = mock.Mock(
+            status_code=202, headers={'Location': '/redfish/v1/Tasks/1/Mon',
+                                      'Retry-After': '10'})
+        monitor = self.node_inst.assemble_node()
+        self.assertIsInstance(monitor, task_monitor.TaskMonitor)
+        self.assertFalse(monitor.done())
+        self.assertEqual('/redfish/v1/Tasks/1/Mon', monitor.path)
+        self.assertEqual(10, monitor.retry_after)
+
     def test_get_allowed_attach_endpoints(self):
         expected = self.node_inst.get_allowed_attach_endpoints()
         result = ("/redfish/v1/Chassis/PCIeSwitchChassis/Drives/Disk.Bay.1",
@@ -425,8 +438,23 @@ class NodeTestCase(testtools.TestCase):
                               system.System)
 
     def test_delete_node(self):
-        self.node_inst.delete_node()
+        monitor = self.node_inst.delete_node()
         self.node_inst._conn.delete.assert_called_once()
+        self.assertTrue(monitor.done())
+        self.assertIs(self.node_inst._conn.delete.return_value,
+                      monitor.wait())
+
+    def test_delete_node_invalidates_cache(self):
+        cache = rsd_lib_cache.ResourceCache()
+        rsd_lib_cache.register(self.conn, cache)
+        cache.add(self.node_inst)
+        node_col = mock.Mock(path='/redfish/v1/Nodes')
+        cache.add(node_col, node.NodeCollection)
+
+        self.node_inst.delete_node()
+        self.assertEqual(0, len(cache))
+        self.assertTrue(self.node_inst._is_stale)
+        node_col.invalidate.assert_called_once_with()
 
 
 class NodeCollectionTestCase(testtools.TestCase):
@@ -560,3 +588,283 @@ class NodeCollectionTestCase(testtools.TestCase):
                         'Capabilities': [0]
                     }
                 }])
+
+    def _fake_nodes(self, mock_node, *states_per_node):
+        """Make each created node go through its own list of states"""
+        nodes = []
+
+        def _create(*args, **kwargs):
+            node_inst = mock.Mock()
+            states = list(states_per_node[len(nodes)])
+            node_inst.composed_node_state = states.pop(0)
+
+            def _refresh():
+                if states:
+                    node_inst.composed_node_state = states.pop(0)
+            node_inst.refresh.side_effect = _refresh
+            nodes.append(node_inst)
+            return node_inst
+        mock_node.side_effect = _create
+        return nodes
+
+    @mock.patch('rsd_lib.resources.v2_1.node.inventory.Inventory.load')
+    def test_check_feasibility(self, mock_load):
+        system_col = mock.Mock()
+        self.node_col.get_members = mock.Mock(return_value=['node'])
+        mock_inventory = mock_load.return_value
+        mock_inventory.find_systems.return_value = []
+
+        result = self.node_col.check_feasibility(
+            system_col, processor_req=[{'Model': 'Multi-Core'}],
+            total_system_core_req=8)
+
+        self.assertEqual([], result)
+        mock_load.assert_called_once_with(system_col, ['node'],
+                                          concurrency=8)
+        mock_inventory.find_systems.assert_called_once_with(
+            processor_req=[{'Model': 'Multi-Core'}], memory_req=None,
+            total_system_core_req=8, total_system_memory_req=None)
+
+        # The snapshot is reused until a node is composed
+        self.node_col.check_feasibility(system_col, total_system_core_req=4)
+        self.assertEqual(1, mock_load.call_count)
+        self.node_col.compose_node()
+        self.node_col.check_feasibility(system_col, total_system_core_req=4)
+        self.assertEqual(2, mock_load.call_count)
+
+    @mock.patch('rsd_lib.resources.v2_1.node.inventory.Inventory.load')
+    def test_check_feasibility_invalid_request(self, mock_load):
+        self.assertRaises(jsonschema.exceptions.ValidationError,
+                          self.node_col.check_feasibility, mock.Mock(),
+                          processor_req=[{'Model': 1}])
+        self.assertFalse(mock_load.called)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes(self, mock_node):
+        nodes = self._fake_nodes(
+            mock_node,
+            [node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+             node_cons.COMPOSED_NODE_STATE_ASSEMBLING,
+             node_cons.COMPOSED_NODE_STATE_ASSEMBLED],
+            [node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+             node_cons.COMPOSED_NODE_STATE_ASSEMBLED])
+        self.conn.post.side_effect = [
+            request_fakes.fake_request_post(
+                None, headers={'Location': 'https://localhost:8443/'
+                                           'redfish/v1/Nodes/%d' % i})
+            for i in (1, 2)]
+        specs = [{'name': 'node1'}, {'name': 'node2', 'memory_req': [
+            {'CapacityMiB': 8000}]}]
+
+        results = self.node_col.compose_nodes(specs, concurrency=1,
+                                              poll_interval=0)
+
+        self.assertEqual(2, len(results))
+        self.assertEqual(specs, [result.spec for result in results])
+        self.assertEqual(['/redfish/v1/Nodes/1', '/redfish/v1/Nodes/2'],
+                         [result.path for result in results])
+        self.assertEqual([node_cons.COMPOSED_NODE_STATE_ASSEMBLED] * 2,
+                         [result.state for result in results])
+        self.assertEqual([None, None], [result.error for result in results])
+        self.assertEqual(['allocate', 'assemble', 'settle', 'total'],
+                         sorted(results[0].timings))
+        # The total is the duration of the whole batch, which includes the
+        # sequential allocations and the settling of the slowest node
+        totals = [result.timings['total'] for result in results]
+        self.assertEqual(1, len(set(totals)))
+        allocations = sum(result.timings['allocate'] for result in results)
+        assemblies = sum(result.timings['assemble'] for result in results)
+        slowest = max(result.timings['settle'] for result in results)
+        self.assertGreaterEqual(totals[0],
+                                allocations + assemblies + slowest)
+        self.node_col._conn.post.assert_any_call(
+            '/redfish/v1/Nodes/Actions/Allocate',
+            data={'Name': 'node2', 'Memory': [{'CapacityMiB': 8000}]})
+        for node_inst in nodes:
+            node_inst.assemble_node.assert_called_once_with()
+        self.assertEqual(2, nodes[0].refresh.call_count)
+        self.assertEqual(1, nodes[1].refresh.call_count)
+
+    def test_compose_nodes_invalid_spec(self):
+        self.assertRaises(
+            jsonschema.exceptions.ValidationError,
+            self.node_col.compose_nodes,
+            [{'name': 'node1'}, {'memory_req': [{'CapacityMiB': 'big'}]}])
+        self.assertFalse(self.node_col._conn.post.called)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes_failure(self, mock_node):
+        mock_node.return_value.composed_node_state = (
+            node_cons.COMPOSED_NODE_STATE_ALLOCATED)
+        mock_node.return_value.path = '/redfish/v1/Nodes/1'
+        error = exceptions.BadRequestError(
+            method='POST', url='/redfish/v1/Nodes/Actions/Allocate',
+            response=mock.MagicMock())
+        self.conn.post.side_effect = [self.conn.post.return_value, error]
+
+        results = self.node_col.compose_nodes(
+            [{'name': 'node1'}, {'name': 'node2'}], concurrency=1,
+            assemble=False)
+
+        self.assertEqual('/redfish/v1/Nodes/1', results[0].path)
+        self.assertEqual(node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+                         results[0].state)
+        self.assertIsNone(results[0].error)
+        self.assertFalse(mock_node.return_value.assemble_node.called)
+        self.assertIsNone(results[1].path)
+        self.assertIs(error, results[1].error)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes_assemble_failure(self, mock_node):
+        mock_node.return_value.composed_node_state = (
+            node_cons.COMPOSED_NODE_STATE_ALLOCATED)
+        error = exceptions.ServerSideError(
+            method='POST', url='/redfish/v1/Nodes/1/Actions/Assemble',
+            response=mock.MagicMock())
+        mock_node.return_value.assemble_node.side_effect = error
+
+        results = self.node_col.compose_nodes([{'name': 'node1'}])
+
+        self.assertEqual('/redfish/v1/Nodes/1', results[0].path)
+        self.assertIsNone(results[0].state)
+        self.assertIs(error, results[0].error)
+        self.assertIn('total', results[0].timings)
+        mock_node.return_value.delete_node.assert_called_once_with()
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes_assemble_failure_no_rollback(self, mock_node):
+        mock_node.return_value.composed_node_state = (
+            node_cons.COMPOSED_NODE_STATE_ALLOCATED)
+        mock_node.return_value.assemble_node.side_effect = Exception('boom')
+
+        results = self.node_col.compose_nodes([{'name': 'node1'}],
+                                              rollback=False)
+
+        self.assertEqual('/redfish/v1/Nodes/1', results[0].path)
+        self.assertEqual(node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+                         results[0].state)
+        self.assertEqual('boom', str(results[0].error))
+        self.assertFalse(mock_node.return_value.delete_node.called)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes_rollback_failure(self, mock_node):
+        mock_node.return_value.composed_node_state = (
+            node_cons.COMPOSED_NODE_STATE_ALLOCATED)
+        mock_node.return_value.assemble_node.side_effect = Exception('boom')
+        mock_node.return_value.delete_node.side_effect = Exception('fail')
+
+        results = self.node_col.compose_nodes([{'name': 'node1'}])
+
+        self.assertEqual('/redfish/v1/Nodes/1', results[0].path)
+        self.assertEqual(node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+                         results[0].state)
+        self.assertEqual('boom', str(results[0].error))
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes_load_failure(self, mock_node):
+        mock_node.side_effect = Exception('boom')
+
+        results = self.node_col.compose_nodes([{'name': 'node1'}])
+
+        self.assertEqual('/redfish/v1/Nodes/1', results[0].path)
+        self.assertIsNone(results[0].state)
+        self.node_col._conn.delete.assert_called_once_with(
+            '/redfish/v1/Nodes/1')
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_compose_nodes_timeout(self, mock_node):
+        mock_node.return_value.composed_node_state = (
+            node_cons.COMPOSED_NODE_STATE_ASSEMBLING)
+
+        results = self.node_col.compose_nodes([{}], timeout=0)
+
+        self.assertEqual(node_cons.COMPOSED_NODE_STATE_ASSEMBLING,
+                         results[0].state)
+        self.assertIsNone(results[0].error)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_wait_for_nodes(self, mock_node):
+        self._fake_nodes(
+            mock_node,
+            [node_cons.COMPOSED_NODE_STATE_ASSEMBLING,
+             node_cons.COMPOSED_NODE_STATE_ASSEMBLED],
+            [node_cons.COMPOSED_NODE_STATE_ALLOCATING,
+             node_cons.COMPOSED_NODE_STATE_FAILED])
+
+        waiters = self.node_col.wait_for_nodes(
+            ['/redfish/v1/Nodes/1', '/redfish/v1/Nodes/2'], poll_interval=0)
+
+        self.assertEqual(['/redfish/v1/Nodes/1', '/redfish/v1/Nodes/2'],
+                         sorted(waiters))
+        self.assertEqual(
+            node_cons.COMPOSED_NODE_STATE_ASSEMBLED,
+            waiters['/redfish/v1/Nodes/1'].result(5).composed_node_state)
+        self.assertEqual(
+            node_cons.COMPOSED_NODE_STATE_FAILED,
+            waiters['/redfish/v1/Nodes/2'].result(5).composed_node_state)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_wait_for_nodes_target_states(self, mock_node):
+        self._fake_nodes(mock_node,
+                         [node_cons.COMPOSED_NODE_STATE_ALLOCATED,
+                          node_cons.COMPOSED_NODE_STATE_ASSEMBLING,
+                          node_cons.COMPOSED_NODE_STATE_ASSEMBLED])
+
+        waiters = self.node_col.wait_for_nodes(
+            ['/redfish/v1/Nodes/1'],
+            target_states=[node_cons.COMPOSED_NODE_STATE_ASSEMBLED],
+            poll_interval=0)
+
+        node_inst = waiters['/redfish/v1/Nodes/1'].result(5)
+        self.assertEqual(2, node_inst.refresh.call_count)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_wait_for_nodes_error(self, mock_node):
+        error = exceptions.ResourceNotFoundError(
+            method='GET', url='/redfish/v1/Nodes/1',
+            response=mock.MagicMock())
+        mock_node.side_effect = error
+
+        waiters = self.node_col.wait_for_nodes(['/redfish/v1/Nodes/1'])
+
+        self.assertIs(error, waiters['/redfish/v1/Nodes/1'].exception(5))
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_wait_for_nodes_timeout(self, mock_node):
+        self._fake_nodes(mock_node,
+                         [node_cons.COMPOSED_NODE_STATE_ASSEMBLING])
+
+        waiters = self.node_col.wait_for_nodes(['/redfish/v1/Nodes/1'],
+                                               timeout=0)
+
+        self.assertIsInstance(waiters['/redfish/v1/Nodes/1'].exception(5),
+                              futures.TimeoutError)
+
+    @mock.patch.object(node.random, 'uniform', autospec=True)
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_wait_for_nodes_backoff(self, mock_node, mock_uniform):
+        mock_uniform.return_value = 1
+        states = [node_cons.COMPOSED_NODE_STATE_ASSEMBLING] * 4
+        states.append(node_cons.COMPOSED_NODE_STATE_ASSEMBLED)
+        self._fake_nodes(mock_node, states)
+        clock = [1000.0]
+        sleeps = []
+
+        def _sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        with mock.patch.object(node.time, 'time', side_effect=lambda: clock[0]
+                               ), mock.patch.object(node.time, 'sleep',
+                                                    side_effect=_sleep):
+            waiters = self.node_col.wait_for_nodes(
+                ['/redfish/v1/Nodes/1'], poll_interval=1,
+                max_poll_interval=3)
+            waiters['/redfish/v1/Nodes/1'].result(5)
+
+        self.assertEqual([1, 2, 3, 3], sleeps)
+        mock_uniform.assert_called_with(1 - node.POLL_JITTER,
+                                        1 + node.POLL_JITTER)
+
+    def test_wait_for_nodes_empty(self):
+        self.assertEqual({}, self.node_col.wait_for_nodes([]))
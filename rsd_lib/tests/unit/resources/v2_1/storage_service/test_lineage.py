@@ -0,0 +1,177 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import mock
+from sushy import exceptions
+import testtools
+
+from rsd_lib.resources.v2_1.storage_service import lineage
+
+
+def _links(**links):
+    return {'Links': dict((name, [{'@odata.id': i} for i in identities])
+                          for name, identities in links.items())}
+
+
+def _target(*logical_drives):
+    return {'Addresses': [{'iSCSI': {'TargetLUN': [
+        {'LUN': lun, 'LogicalDrive': identity}
+        for lun, identity in enumerate(logical_drives)]}}]}
+
+
+class StorageLineageTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(StorageLineageTestCase, self).setUp()
+        self.docs = {
+            '/T/1': _target('/LD/1'),
+            '/T/2': _target('/LD/5/'),
+            # A logical volume in a volume group of two physical volumes
+            '/LD/1': _links(LogicalDrives=['/LD/2'], Targets=['/T/1']),
+            '/LD/2': _links(LogicalDrives=['/LD/3'], UsedBy=['/LD/1']),
+            '/LD/3': _links(PhysicalDrives=['/D/1']),
+            '/LD/4': _links(PhysicalDrives=['/D/2'], UsedBy=['/LD/2']),
+            '/LD/5': _links(PhysicalDrives=['/D/2']),
+            '/D/1': {},
+            '/D/2': {},
+        }
+        self.resources = {}
+        self.service = mock.Mock()
+        self.service.remote_targets = self._collection('/T/1', '/T/2')
+        self.service.logical_drives = self._collection(
+            '/LD/1', '/LD/2', '/LD/3', '/LD/4', '/LD/5')
+        self.service.physical_drives = self._collection('/D/1', '/D/2')
+
+        self.lineage = lineage.StorageLineage(self.service)
+        self.lineage.refresh()
+
+    def _check_exists(self, identity):
+        if identity not in self.docs:
+            raise exceptions.ResourceNotFoundError(
+                method='GET', url=identity,
+                response=mock.MagicMock(status_code=404))
+
+    def _get_resource(self, identity):
+        self._check_exists(identity)
+        resource = self.resources.get(identity)
+        if resource is None:
+            resource = self.resources[identity] = mock.Mock(
+                _json=self.docs[identity])
+
+            def _refresh():
+                self._check_exists(identity)
+                resource._json = self.docs[identity]
+            resource.refresh.side_effect = _refresh
+        return resource
+
+    def _collection(self, *identities):
+        col = mock.Mock(members_identities=identities)
+        col.get_member.side_effect = self._get_resource
+        return col
+
+    def test_get_edges(self):
+        with open('rsd_lib/tests/unit/json_samples/v2_1/logical_drive.json',
+                  'r') as f:
+            json_doc = json.loads(f.read())
+        self.assertEqual(
+            frozenset([
+                ('/redfish/v1/Services/1/LogicalDrives/1',
+                 '/redfish/v1/Services/1/Drives/2'),
+                ('/redfish/v1/Services/1/LogicalDrives/1',
+                 '/redfish/v1/Services/1/LogicalDrives/12'),
+                ('/redfish/v1/Services/1/LogicalDrives/14',
+                 '/redfish/v1/Services/1/LogicalDrives/1'),
+                ('/redfish/v1/Services/1/Targets/2',
+                 '/redfish/v1/Services/1/LogicalDrives/1')]),
+            lineage.get_edges(lineage.LOGICAL_DRIVE,
+                              '/redfish/v1/Services/1/LogicalDrives/1',
+                              json_doc))
+        self.assertEqual(frozenset([('/T/1', '/LD/1')]),
+                         lineage.get_edges(lineage.REMOTE_TARGET, '/T/1/',
+                                           _target('/LD/1/')))
+        self.assertEqual(frozenset(),
+                         lineage.get_edges(lineage.PHYSICAL_DRIVE, '/D/1',
+                                           {'Links': {}}))
+
+    def test_forward_queries(self):
+        self.assertEqual(9, len(self.lineage))
+        self.assertEqual(['/D/1', '/D/2'],
+                         self.lineage.get_physical_drives('/T/1'))
+        self.assertEqual(['/LD/1', '/LD/2', '/LD/3', '/LD/4'],
+                         self.lineage.get_logical_drives('/T/1/'))
+        self.assertEqual(['/D/2'], self.lineage.get_physical_drives('/LD/5'))
+        self.assertEqual([], self.lineage.get_physical_drives('/D/1'))
+
+    def test_reverse_queries(self):
+        self.assertEqual(['/T/1', '/T/2'],
+                         self.lineage.get_remote_targets('/D/2'))
+        self.assertEqual(['/T/1'], self.lineage.get_remote_targets('/D/1'))
+        self.assertEqual(['/LD/1', '/LD/2', '/LD/3'],
+                         self.lineage.get_dependent_logical_drives('/D/1'))
+        self.assertEqual([], self.lineage.get_remote_targets('/D/3'))
+
+    def test_queries_are_memoized(self):
+        self.lineage.get_physical_drives('/T/1')
+        self.lineage.get_remote_targets('/D/2')
+        with mock.patch.object(self.lineage, '_closure',
+                               autospec=True) as mock_closure:
+            self.assertEqual(['/D/1', '/D/2'],
+                             self.lineage.get_physical_drives('/T/1'))
+            self.assertEqual(['/T/1', '/T/2'],
+                             self.lineage.get_remote_targets('/D/2'))
+            mock_closure.assert_not_called()
+
+    def test_invalidate(self):
+        self.lineage.get_physical_drives('/T/1')
+        self.lineage.get_physical_drives('/T/2')
+        self.lineage.get_remote_targets('/D/1')
+        self.lineage.get_remote_targets('/D/2')
+        self.docs['/LD/5'] = _links(PhysicalDrives=['/D/1'])
+
+        self.lineage.invalidate('/LD/5')
+
+        self.resources['/LD/5'].refresh.assert_called_once_with()
+        # Only the answers connected to the changed drive are dropped
+        self.assertIn('/T/1', self.lineage._forward)
+        self.assertNotIn('/T/2', self.lineage._forward)
+        self.assertEqual(['/D/1'], self.lineage.get_physical_drives('/T/2'))
+        self.assertEqual(['/T/1', '/T/2'],
+                         self.lineage.get_remote_targets('/D/1'))
+        self.assertEqual(['/T/1'], self.lineage.get_remote_targets('/D/2'))
+
+    def test_invalidate_removed(self):
+        del self.docs['/LD/4']
+        self.lineage.invalidate('/LD/4', '/LD/6')
+
+        self.assertNotIn('/LD/4', self.lineage)
+        self.assertEqual(['/D/1'], self.lineage.get_physical_drives('/T/1'))
+
+    def test_refresh(self):
+        self.service.remote_targets.members_identities = ('/T/1',)
+        self.service.physical_drives.members_identities = ('/D/1', '/D/2',
+                                                           '/D/3')
+        self.docs['/D/3'] = {}
+        self.docs['/LD/3'] = _links(PhysicalDrives=['/D/1', '/D/3'])
+
+        self.lineage.refresh()
+
+        self.service.remote_targets.refresh.assert_called_once_with()
+        self.resources['/LD/3'].refresh.assert_called_once_with()
+        self.assertEqual(['/T/1'], self.lineage.get_remote_targets('/D/2'))
+        self.assertEqual(['/D/1', '/D/2', '/D/3'],
+                         self.lineage.get_physical_drives('/T/1'))
+        self.assertEqual(5, self.service.logical_drives.get_member.call_count)
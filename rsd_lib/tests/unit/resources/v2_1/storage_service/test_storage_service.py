@@ -19,6 +19,7 @@ import mock
 from sushy import exceptions
 import testtools
 
+from rsd_lib.resources.v2_1.storage_service import lineage
 from rsd_lib.resources.v2_1.storage_service import logical_drive
 from rsd_lib.resources.v2_1.storage_service import physical_drive
 from rsd_lib.resources.v2_1.storage_service import remote_target
@@ -205,6 +206,19 @@ class StorageServiceTestCase(testtools.TestCase):
         self.assertIsInstance(self.storage_service_inst.remote_targets,
                               remote_target.RemoteTargetCollection)
 
+    @mock.patch.object(lineage, 'StorageLineage', autospec=True)
+    def test_get_lineage(self, mock_lineage):
+        graph = self.storage_service_inst.get_lineage(concurrency=4)
+        mock_lineage.assert_called_once_with(self.storage_service_inst,
+                                             concurrency=4)
+        graph.refresh.assert_called_once_with()
+
+        self.assertIs(graph, self.storage_service_inst.get_lineage())
+        self.assertEqual(1, graph.refresh.call_count)
+        self.assertIs(graph, self.storage_service_inst.get_lineage(
+            refresh=True))
+        self.assertEqual(2, graph.refresh.call_count)
+
 
 class StorageServiceCollectionTestCase(testtools.TestCase):
 
@@ -17,6 +17,8 @@ import json
 import mock
 import testtools
 
+from rsd_lib import base as rsd_lib_base
+from rsd_lib import resource_cache as rsd_lib_cache
 from rsd_lib.resources import v2_1
 from rsd_lib.resources.v2_1.chassis import chassis
 from rsd_lib.resources.v2_1.ethernet_switch import ethernet_switch
@@ -49,6 +51,10 @@ class RSDLibV2_1TestCase(testtools.TestCase):
         self.assertEqual("/redfish/v1/Managers", self.rsd._managers_path)
         self.assertEqual("/redfish/v1/EthernetSwitches",
                          self.rsd._ethernet_switches_path)
+        self.assertIsNone(self.rsd._expand_query)
+
+    def test_expand_query_not_advertised(self):
+        self.assertIsNone(rsd_lib_base.get_expand_query(self.conn))
 
     @mock.patch.object(system, 'SystemCollection', autospec=True)
     def test_get_system_collection(self, mock_system_collection):
@@ -78,6 +84,59 @@ class RSDLibV2_1TestCase(testtools.TestCase):
             self.rsd._conn, 'fake-node-id',
             redfish_version=self.rsd.redfish_version)
 
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_get_node_not_cached_by_default(self, mock_node):
+        self.assertIsNone(self.rsd.resource_cache)
+        self.assertIsNone(rsd_lib_cache.get_cache(self.conn))
+        self.rsd.get_node('fake-node-id')
+        self.rsd.get_node('fake-node-id')
+        self.assertEqual(2, mock_node.call_count)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_get_node_cached(self, mock_node):
+        rsd = v2_1.RSDLibV2_1(self.conn,
+                              resource_cache=rsd_lib_cache.ResourceCache())
+        self.assertIs(rsd.resource_cache, rsd_lib_cache.get_cache(self.conn))
+        first = rsd.get_node('fake-node-id')
+        second = rsd.get_node('fake-node-id/')
+        self.assertIs(first, second)
+        mock_node.assert_called_once_with(
+            self.rsd._conn, 'fake-node-id',
+            redfish_version=self.rsd.redfish_version)
+
+    @mock.patch.object(node, 'Node', autospec=True)
+    def test_get_node_cache_disabled(self, mock_node):
+        rsd = v2_1.RSDLibV2_1(
+            self.conn, resource_cache=rsd_lib_cache.ResourceCache(max_size=0))
+        rsd.get_node('fake-node-id')
+        rsd.get_node('fake-node-id')
+        self.assertEqual(2, mock_node.call_count)
+
+    def test_system_shared_with_node_and_collection(self):
+        docs = {}
+        for path, name in (('/redfish/v1/', 'root.json'),
+                           ('/redfish/v1/Systems', 'system_collection.json'),
+                           ('/redfish/v1/Systems/System1', 'system.json'),
+                           ('/redfish/v1/Nodes/Node1', 'node.json')):
+            with open('rsd_lib/tests/unit/json_samples/v2_1/' + name,
+                      'r') as f:
+                docs[path] = json.loads(f.read())
+        conn = mock.Mock()
+        conn.get.side_effect = lambda path, **kwargs: mock.Mock(
+            json=mock.Mock(return_value=docs[path]), headers={})
+        rsd = v2_1.RSDLibV2_1(conn,
+                              resource_cache=rsd_lib_cache.ResourceCache())
+
+        node_system = rsd.get_node('/redfish/v1/Nodes/Node1').system
+        self.assertIsInstance(node_system, system.System)
+        self.assertIs(node_system,
+                      rsd.get_system('/redfish/v1/Systems/System1'))
+        self.assertIs(node_system, rsd.get_system_collection().get_member(
+            '/redfish/v1/Systems/System1'))
+        self.assertEqual(1, [c[1].get('path') for c in
+                             conn.get.call_args_list].count(
+                                 '/redfish/v1/Systems/System1'))
+
     @mock.patch.object(fabric, 'FabricCollection', autospec=True)
     def test_get_fabric_collection(self, mock_fabric_collection):
         self.rsd.get_fabric_collection()
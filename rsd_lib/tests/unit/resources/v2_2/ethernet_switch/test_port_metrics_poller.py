@@ -0,0 +1,153 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import json
+import math
+
+import mock
+import testtools
+
+from rsd_lib.resources.v2_2.ethernet_switch import port_metrics_poller
+
+
+class CounterDeltaTestCase(testtools.TestCase):
+
+    def test_counter_delta(self):
+        self.assertEqual(10, port_metrics_poller.counter_delta(5, 15))
+        self.assertEqual(0, port_metrics_poller.counter_delta(5, 5))
+        # A 32-bit counter wrapped
+        self.assertEqual(15, port_metrics_poller.counter_delta(
+            2 ** 32 - 5, 10))
+        # A 64-bit counter wrapped
+        self.assertEqual(15, port_metrics_poller.counter_delta(
+            2 ** 64 - 5, 10))
+
+    def test_counter_delta_reset(self):
+        self.assertIsNone(port_metrics_poller.counter_delta(1000, 5))
+        self.assertIsNone(port_metrics_poller.counter_delta(2 ** 31, 0))
+        self.assertIsNone(port_metrics_poller.counter_delta(
+            2 ** 32 - 5, 2 ** 31))
+        self.assertIsNone(port_metrics_poller.counter_delta(2 ** 40, 10))
+
+
+class PortMetricsPollerTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(PortMetricsPollerTestCase, self).setUp()
+        with open('rsd_lib/tests/unit/json_samples/v2_2/'
+                  'ethernet_switch_port_metrics.json', 'r') as f:
+            self.metrics_json = json.loads(f.read())
+
+        self.docs = {}
+        self.conn = mock.Mock()
+        self.conn.get.side_effect = lambda path: mock.Mock(
+            json=mock.Mock(return_value=self.docs[path]))
+
+        ports = {}
+        for switch_id, port_ids in (('/S/1', ('/S/1/P/1', '/S/1/P/2')),
+                                    ('/S/2', ('/S/2/P/1',))):
+            port_col = mock.Mock(members_identities=port_ids)
+            port_col.get_member.side_effect = lambda identity: mock.Mock(
+                json={'Metrics': {'@odata.id': identity + '/Metrics'}})
+            ports[switch_id] = port_col
+            for port_id in port_ids:
+                self.docs[port_id + '/Metrics'] = copy.deepcopy(
+                    self.metrics_json)
+        # A port without metrics
+        ports['/S/2'].members_identities += ('/S/2/P/2',)
+        get_port = ports['/S/2'].get_member.side_effect
+        ports['/S/2'].get_member.side_effect = lambda identity: (
+            mock.Mock(json={}) if identity == '/S/2/P/2'
+            else get_port(identity))
+
+        switch_col = mock.Mock(_conn=self.conn,
+                               members_identities=('/S/1', '/S/2'))
+        switch_col.get_member.side_effect = lambda identity: mock.Mock(
+            ports=ports[identity])
+
+        self.poller = port_metrics_poller.PortMetricsPoller(switch_col,
+                                                            concurrency=2)
+        self.poller.discover()
+
+    def test_discover(self):
+        self.assertEqual(3, len(self.poller))
+        self.assertEqual(('/S/1/P/1', '/S/1/P/2', '/S/2/P/1'),
+                         self.poller.ports)
+        self.assertEqual('/S/2/P/1/Metrics', self.poller.metrics_paths[2])
+        self.assertEqual(3, len(self.poller.rates['rx_bytes']))
+        self.assertTrue(math.isnan(self.poller.rates['rx_bytes'][0]))
+
+    @mock.patch('time.time', autospec=True)
+    def test_sample(self, mock_time):
+        mock_time.return_value = 100.0
+        self.assertEqual(3, self.poller.sample())
+        self.assertEqual(64, self.poller.counters['rx_bytes'][0])
+        self.assertTrue(math.isnan(self.poller.get_rates(
+            '/S/1/P/1')['rx_bytes']))
+
+        mock_time.return_value = 102.0
+        doc = self.docs['/S/1/P/1/Metrics']
+        doc['Received']['Bytes'] = 2064
+        doc['Transmitted']['Packets'] = 2 ** 32 + 10
+        doc['Received']['DroppedPackets'] = 1
+        self.docs['/S/1/P/2/Metrics']['Transmitted']['Bytes'] = 2 ** 32 - 8
+        self.assertEqual(3, self.poller.sample())
+
+        rates = self.poller.get_rates('/S/1/P/1')
+        self.assertEqual(1000.0, rates['rx_bytes'])
+        self.assertEqual((2 ** 32 - 118) / 2.0, rates['tx_packets'])
+        # The counter went down far from the boundary, it was reset
+        self.assertTrue(math.isnan(rates['rx_dropped']))
+        self.assertEqual(0.0, rates['tx_bytes'])
+        self.assertEqual((2 ** 32 - 520) / 2.0,
+                         self.poller.rates['tx_bytes'][1])
+
+    @mock.patch('time.time', autospec=True)
+    def test_sample_failures(self, mock_time):
+        mock_time.return_value = 100.0
+        self.poller.sample()
+
+        mock_time.return_value = 101.0
+        del self.docs['/S/1/P/2/Metrics']
+        del self.docs['/S/2/P/1/Metrics']['Received']['Bytes']
+        self.assertEqual(2, self.poller.sample())
+        self.assertTrue(math.isnan(self.poller.rates['tx_bytes'][1]))
+        self.assertTrue(math.isnan(self.poller.rates['rx_bytes'][2]))
+        self.assertEqual(0.0, self.poller.rates['tx_bytes'][2])
+
+        # The rates of the failed port are computed from its last sample
+        mock_time.return_value = 104.0
+        self.docs['/S/1/P/2/Metrics'] = copy.deepcopy(self.metrics_json)
+        self.docs['/S/1/P/2/Metrics']['Transmitted']['Bytes'] += 400
+        self.poller.sample()
+        self.assertEqual(100.0, self.poller.rates['tx_bytes'][1])
+
+        # A missing counter has no rate until it was read twice
+        self.docs['/S/2/P/1/Metrics']['Received']['Bytes'] = 64
+        self.poller.sample()
+        self.assertTrue(math.isnan(self.poller.rates['rx_bytes'][2]))
+
+    def test_get_rates_unknown_port(self):
+        self.assertRaises(KeyError, self.poller.get_rates, '/S/3/P/1')
+
+    @mock.patch.object(port_metrics_poller.PortMetricsPoller, 'sample',
+                       autospec=True)
+    def test_start_and_stop(self, mock_sample):
+        self.poller.start(interval=0.01)
+        self.poller.start(interval=0.01)
+        self.poller.stop(timeout=5)
+        self.assertIsNone(self.poller._thread)
+        mock_sample.assert_called_with(self.poller)
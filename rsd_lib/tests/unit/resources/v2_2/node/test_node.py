@@ -19,9 +19,26 @@ import mock
 import testtools
 
 from rsd_lib.resources.v2_2.node import node
+from rsd_lib.resources.v2_2.system import system
 from rsd_lib.tests.unit.fakes import request_fakes
 
 
+class NodeTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(NodeTestCase, self).setUp()
+        self.conn = mock.Mock()
+        with open('rsd_lib/tests/unit/json_samples/v2_1/node.json',
+                  'r') as f:
+            self.conn.get.return_value.json.return_value = json.loads(f.read())
+        self.node_inst = node.Node(self.conn, '/redfish/v1/Nodes/Node1',
+                                   redfish_version='1.0.2')
+
+    def test_system(self):
+        # The system is a v2_2 System, like the one of get_system()
+        self.assertIsInstance(self.node_inst.system, system.System)
+
+
 class NodeCollectionTestCase(testtools.TestCase):
 
     def setUp(self):
@@ -37,6 +54,9 @@ class NodeCollectionTestCase(testtools.TestCase):
         self.node_col = node.NodeCollection(
             self.conn, '/redfish/v1/Nodes', redfish_version='1.0.2')
 
+    def test__resource_type(self):
+        self.assertIs(node.Node, self.node_col._resource_type)
+
     def test_compose_node(self):
         reqs = {
             'Name': 'test',
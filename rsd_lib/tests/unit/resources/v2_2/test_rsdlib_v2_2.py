@@ -20,7 +20,6 @@ import testtools
 from rsd_lib.resources.v2_1.chassis import chassis as v2_1_chassis
 from rsd_lib.resources.v2_1.fabric import fabric as v2_1_fabric
 from rsd_lib.resources.v2_1.manager import manager as v2_1_manager
-from rsd_lib.resources.v2_1.node import node as v2_1_node
 from rsd_lib.resources.v2_1.storage_service import storage_service \
     as v2_1_storage_service
 from rsd_lib.resources import v2_2
@@ -74,7 +73,7 @@ class RSDLibV2_2TestCase(testtools.TestCase):
             self.rsd._conn, '/redfish/v1/Nodes',
             redfish_version=self.rsd.redfish_version)
 
-    @mock.patch.object(v2_1_node, 'Node', autospec=True)
+    @mock.patch.object(v2_2_node, 'Node', autospec=True)
     def test_get_node(self, mock_node):
         self.rsd.get_node('fake-node-id')
         mock_node.assert_called_once_with(
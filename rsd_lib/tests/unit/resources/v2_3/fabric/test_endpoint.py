@@ -17,9 +17,13 @@ import copy
 import json
 import jsonschema
 import mock
+from sushy import exceptions
 import testtools
 
+from rsd_lib import resource_index as rsd_lib_index
+from rsd_lib.resources.v2_1.fabric import endpoint as v2_1_endpoint
 from rsd_lib.resources.v2_3.fabric import endpoint
+from rsd_lib.resources.v2_3.storage_service import volume
 from rsd_lib.tests.unit.fakes import request_fakes
 
 
@@ -169,6 +173,33 @@ class EndpointTestCase(testtools.TestCase):
             'At least "username" or "password" parameter has to be specified'):
             self.endpoint_inst.update_authentication()
 
+    def test_delete(self):
+        index = v2_1_endpoint.EndpointIndex()
+        index.add('/redfish/v1/Fabrics/NVMeoE/Endpoints/1',
+                  {'Identifiers': [{'DurableName': 'nqn.1'}]})
+        rsd_lib_index.set_index(self.conn, '/redfish/v1/Fabrics/NVMeoE/'
+                                'Endpoints', index)
+
+        self.endpoint_inst.delete()
+
+        self.endpoint_inst._conn.delete.assert_called_once_with(
+            '/redfish/v1/Fabrics/NVMeoE/Endpoints/1')
+        self.assertEqual([], index.find('nqn.1'))
+
+    def test_delete_updates_volume_index(self):
+        index = volume.VolumeIndex()
+        index.add('/redfish/v1/StorageServices/1/Volumes/1',
+                  {'Links': {'Oem': {'Intel_RackScale': {'Endpoints': [
+                      {'@odata.id': '/redfish/v1/Fabrics/NVMeoE/'
+                                    'Endpoints/1'}]}}}})
+        rsd_lib_index.set_index(self.conn, '/redfish/v1/StorageServices/1/'
+                                'Volumes', index)
+
+        self.endpoint_inst.delete()
+
+        self.assertEqual([], index.find_by_endpoint(
+            '/redfish/v1/Fabrics/NVMeoE/Endpoints/1'))
+
 
 class EndpointCollectionTestCase(testtools.TestCase):
 
@@ -339,6 +370,122 @@ class EndpointCollectionTestCase(testtools.TestCase):
         self.assertEqual(result,
                          '/redfish/v1/Fabrics/NVMeoE/Endpoints/3')
 
+    def test_create_endpoint_updates_index(self):
+        index = v2_1_endpoint.EndpointIndex()
+        rsd_lib_index.set_index(self.conn, '/redfish/v1/Fabrics/NVMeoE/'
+                                'Endpoints', index)
+
+        result = self.endpoint_col.create_endpoint(
+            identifiers=[{"DurableNameFormat": "NQN",
+                          "DurableName": "nqn.2014-08.org.nvmexpress:1"}],
+            connected_entities=[{
+                "EntityLink": {
+                    "@odata.id": "/redfish/v1/StorageServices/1/Volumes/1"},
+                "EntityRole": "Target"}])
+
+        self.assertEqual('/redfish/v1/Fabrics/NVMeoE/Endpoints/3', result)
+        self.assertIs(index, self.endpoint_col.get_endpoint_index())
+        self.assertEqual([result], self.endpoint_col.find_endpoints(
+            'nqn.2014-08.org.nvmexpress:1'))
+        self.assertEqual([result], self.endpoint_col.find_endpoints(
+            '/redfish/v1/StorageServices/1/Volumes/1'))
+
+    def test_create_endpoint_updates_volume_index(self):
+        index = volume.VolumeIndex()
+        index.add('/redfish/v1/StorageServices/1/Volumes/1', {})
+        rsd_lib_index.set_index(self.conn, '/redfish/v1/StorageServices/1/'
+                                'Volumes', index)
+
+        result = self.endpoint_col.create_endpoint(
+            identifiers=[{"DurableNameFormat": "NQN",
+                          "DurableName": "nqn.2014-08.org.nvmexpress:1"}],
+            connected_entities=[{
+                "EntityLink": {
+                    "@odata.id": "/redfish/v1/StorageServices/1/Volumes/1"},
+                "EntityRole": "Target"}])
+
+        self.assertEqual(['/redfish/v1/StorageServices/1/Volumes/1'],
+                         index.find_by_endpoint(result))
+
+    def _endpoint_request(self, name):
+        return {
+            'identifiers': [{"DurableNameFormat": "iQN",
+                             "DurableName": "iqn.1986-03.com.intel:" + name}],
+            'connected_entities': [{
+                "EntityLink": {"@odata.id": "/redfish/v1/Systems/" + name},
+                "EntityRole": "Initiator"}]}
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_create_endpoints(self, mock_sleep):
+        server_error = exceptions.ServerSideError(
+            method='POST', url='/redfish/v1/Fabrics/NVMeoE/Endpoints',
+            response=mock.MagicMock(status_code=503))
+        bad_request = exceptions.BadRequestError(
+            method='POST', url='/redfish/v1/Fabrics/NVMeoE/Endpoints',
+            response=mock.MagicMock(status_code=400))
+        attempts = {'a': [server_error, 'a'], 'b': [bad_request],
+                    'c': ['c']}
+
+        def _post(path, data):
+            name = data['Identifiers'][0]['DurableName'].split(':')[1]
+            outcome = attempts[name].pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return request_fakes.fake_request_post(
+                None, headers={"Location": "https://localhost:8443/redfish/"
+                                           "v1/Fabrics/NVMeoE/Endpoints/%s"
+                                           % outcome})
+        self.conn.post.side_effect = _post
+        requests = [self._endpoint_request(name) for name in 'abc']
+
+        results = self.endpoint_col.create_endpoints(requests, concurrency=2)
+
+        self.assertEqual(requests, [result.request for result in results])
+        self.assertEqual(['/redfish/v1/Fabrics/NVMeoE/Endpoints/a', None,
+                          '/redfish/v1/Fabrics/NVMeoE/Endpoints/c'],
+                         [result.identity for result in results])
+        self.assertEqual([None, bad_request, None],
+                         [result.error for result in results])
+        self.assertEqual(4, self.conn.post.call_count)
+        mock_sleep.assert_called_once_with(1)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_create_endpoints_retries_exhausted(self, mock_sleep):
+        error = exceptions.ServerSideError(
+            method='POST', url='/redfish/v1/Fabrics/NVMeoE/Endpoints',
+            response=mock.MagicMock(status_code=503))
+        self.conn.post.side_effect = error
+
+        results = self.endpoint_col.create_endpoints(
+            [self._endpoint_request('a')], retries=2, retry_interval=0.5)
+
+        self.assertIs(error, results[0].error)
+        self.assertEqual(3, self.conn.post.call_count)
+        self.assertEqual([mock.call(0.5), mock.call(1.0)],
+                         mock_sleep.call_args_list)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_create_endpoints_server_error_not_retried(self, mock_sleep):
+        # Note: The endpoint may have been created despite a 500
+        error = exceptions.ServerSideError(
+            method='POST', url='/redfish/v1/Fabrics/NVMeoE/Endpoints',
+            response=mock.MagicMock(status_code=500))
+        self.conn.post.side_effect = error
+
+        results = self.endpoint_col.create_endpoints(
+            [self._endpoint_request('a')])
+
+        self.assertIs(error, results[0].error)
+        self.assertEqual(1, self.conn.post.call_count)
+        mock_sleep.assert_not_called()
+
+    def test_create_endpoints_invalid_request(self):
+        requests = [self._endpoint_request('a'),
+                    dict(self._endpoint_request('b'), protocol='invalid')]
+        self.assertRaises(jsonschema.exceptions.ValidationError,
+                          self.endpoint_col.create_endpoints, requests)
+        self.conn.post.assert_not_called()
+
     def test_create_endpoint_with_invalid_reqs(self):
         identifiers = [
             {
@@ -168,3 +168,26 @@ class ZoneCollectionTestCase(testtools.TestCase):
                    {"@odata.id": "/redfish/v1/Fabrics/NVMeoE/Endpoints/3"}]}})
         self.assertEqual(result,
                          '/redfish/v1/Fabrics/NVMeoE/Zones/2')
+
+    def test_reconcile(self):
+        existing = mock.Mock(path='/redfish/v1/Fabrics/NVMeoE/Zones/1')
+        existing.links.endpoint_identities = (
+            '/redfish/v1/Fabrics/NVMeoE/Endpoints/1',)
+        self.zone_col.get_members = mock.Mock(return_value=[existing])
+        self.zone_col.get_member = mock.Mock(return_value=existing)
+
+        results = self.zone_col.reconcile(
+            {'storage': ['/redfish/v1/Fabrics/NVMeoE/Endpoints/2']},
+            prune=True)
+
+        self.assertEqual([zone.v2_1_zone.ZONE_CREATE,
+                          zone.v2_1_zone.ZONE_DELETE],
+                         [result.change.action for result in results])
+        self.assertEqual(['/redfish/v1/Fabrics/NVMeoE/Zones/2',
+                          '/redfish/v1/Fabrics/NVMeoE/Zones/1'],
+                         [result.identity for result in results])
+        self.zone_col._conn.post.assert_called_once_with(
+            '/redfish/v1/Fabrics/NVMeoE/Zones',
+            data={"Links": {"Endpoints": [
+                {"@odata.id": "/redfish/v1/Fabrics/NVMeoE/Endpoints/2"}]}})
+        existing.delete.assert_called_once_with()
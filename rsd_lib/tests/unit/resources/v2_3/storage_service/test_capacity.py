@@ -0,0 +1,115 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import testtools
+
+from rsd_lib.resources.v2_3.storage_service import capacity
+
+
+def _fake_pool(allocated, consumed):
+    pool = mock.Mock()
+    pool.capacity.allocated_bytes = allocated
+    pool.capacity.consumed_bytes = consumed
+    return pool
+
+
+class CapacityTableTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(CapacityTableTestCase, self).setUp()
+        self.pools = {
+            '/S/1/Pools/1': _fake_pool(1000, 900),
+            '/S/1/Pools/2': _fake_pool(1000, 200),
+            '/S/2/Pools/1': _fake_pool(500, 100),
+            '/S/2/Pools/2': _fake_pool(None, None),
+        }
+        self.pool_cols = {}
+        for service_id in ('/S/1', '/S/2'):
+            pool_col = mock.Mock()
+            pool_col.members_identities = tuple(
+                p for p in sorted(self.pools) if p.startswith(service_id))
+            pool_col.get_member.side_effect = self.pools.get
+            self.pool_cols[service_id] = pool_col
+
+        self.service_col = mock.Mock()
+        self.service_col.members_identities = ('/S/1', '/S/2')
+        self.service_col.get_member.side_effect = (
+            lambda identity: mock.Mock(
+                storage_pools=self.pool_cols[identity]))
+
+        self.table = capacity.CapacityTable(self.service_col)
+        self.table.refresh()
+
+    def test_refresh(self):
+        self.assertEqual(4, len(self.table))
+        self.assertEqual(('/S/1/Pools/1', '/S/1/Pools/2', '/S/2/Pools/1',
+                          '/S/2/Pools/2'), self.table.pools)
+        self.assertEqual(('/S/1', '/S/1', '/S/2', '/S/2'),
+                         self.table.services)
+        self.assertEqual([1000, 1000, 500, 0],
+                         list(self.table.allocated_bytes))
+        self.service_col.refresh.assert_not_called()
+
+    def test_refresh_incremental(self):
+        self.pools['/S/2/Pools/3'] = _fake_pool(100, 0)
+        self.pool_cols['/S/2'].members_identities = (
+            '/S/2/Pools/1', '/S/2/Pools/3')
+        self.pools['/S/1/Pools/1'].capacity.consumed_bytes = 0
+        self.service_col.get_member.reset_mock()
+
+        self.table.refresh()
+
+        self.service_col.refresh.assert_called_once_with()
+        self.service_col.get_member.assert_not_called()
+        self.pools['/S/1/Pools/1'].refresh.assert_called_once_with()
+        self.assertFalse(self.pools['/S/2/Pools/3'].refresh.called)
+        self.assertEqual(('/S/1/Pools/1', '/S/1/Pools/2', '/S/2/Pools/1',
+                          '/S/2/Pools/3'), self.table.pools)
+        self.assertEqual([1000, 800, 400, 100],
+                         list(self.table.free_bytes()))
+
+    def test_refresh_skips_failed_pools(self):
+        self.pools['/S/1/Pools/2'].refresh.side_effect = ValueError('boom')
+        self.table.refresh()
+        self.assertEqual(('/S/1/Pools/1', '/S/2/Pools/1', '/S/2/Pools/2'),
+                         self.table.pools)
+
+    def test_free_bytes(self):
+        self.assertEqual([100, 800, 400, 0], list(self.table.free_bytes()))
+        self.assertEqual(1300, self.table.total_free_bytes())
+        self.assertEqual(400, self.table.total_free_bytes('/S/2'))
+
+    def test_find_pools(self):
+        self.assertEqual(['/S/1/Pools/2', '/S/2/Pools/1'],
+                         self.table.find_pools(300))
+        self.assertEqual([], self.table.find_pools(801))
+
+    def test_select_pool(self):
+        self.assertEqual('/S/2/Pools/1', self.table.select_pool(300))
+        self.assertEqual('/S/1/Pools/2',
+                         self.table.select_pool(300,
+                                                strategy=capacity.WORST_FIT))
+        self.assertEqual('/S/1/Pools/1',
+                         self.table.select_pool(50, storage_service='/S/1'))
+        self.assertIsNone(self.table.select_pool(801))
+        self.assertRaises(ValueError, self.table.select_pool, 1,
+                          strategy='first_fit')
+
+    def test_capacity_sources(self):
+        self.assertEqual(
+            [{'ProvidingPools': [{'@odata.id': '/S/2/Pools/1'}]}],
+            self.table.capacity_sources(300))
+        self.assertIsNone(self.table.capacity_sources(801))
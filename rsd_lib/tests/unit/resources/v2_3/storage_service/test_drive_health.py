@@ -0,0 +1,120 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import mock
+import testtools
+
+from rsd_lib import base as rsd_lib_base
+from rsd_lib.resources.v2_3.storage_service import drive_health
+
+
+class DriveHealthTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(DriveHealthTestCase, self).setUp()
+        with open('rsd_lib/tests/unit/json_samples/v2_3/drive.json',
+                  'r') as f:
+            self.drive_json = json.loads(f.read())
+
+        self.docs = {
+            '/S/1/Drives': {
+                'Members': [{'@odata.id': '/C/1/Drives/1'},
+                            {'@odata.id': '/C/1/Drives/2'}],
+                'Members@odata.nextLink': '/S/1/Drives?skip=2'},
+            '/S/1/Drives?skip=2': {
+                'Members': [{'@odata.id': '/C/1/Drives/3'}]},
+            '/S/2/Drives': {
+                'Members': [{'@odata.id': '/C/2/Drives/1'}]},
+            '/C/1/Drives/1': dict(self.drive_json,
+                                  **{'@odata.id': '/C/1/Drives/1'}),
+            '/C/1/Drives/3': {'@odata.id': '/C/1/Drives/3',
+                              'Status': {'Health': 'Critical'}},
+            '/C/2/Drives/1': dict(self.drive_json,
+                                  **{'@odata.id': '/C/2/Drives/1'}),
+        }
+        self.conn = mock.Mock()
+
+        def _get(path):
+            if path not in self.docs:
+                raise ValueError('not found')
+            return mock.Mock(json=mock.Mock(return_value=self.docs[path]))
+        self.conn.get.side_effect = _get
+
+        self.service_col = mock.Mock(_conn=self.conn)
+        self.service_col.members_identities = ('/S/1', '/S/2', '/S/3')
+        self.service_col.get_member.side_effect = (
+            lambda identity: mock.Mock(json={
+                'Drives': {'@odata.id': identity + '/Drives'}}))
+
+    def test_build_drive_health_record(self):
+        record = drive_health.build_drive_health_record(self.drive_json)
+        self.assertEqual(
+            drive_health.DriveHealthRecord(
+                drive_id='/redfish/v1/Chassis/1/Drives/2', health='OK',
+                predicted_media_life_left_percent=95, erased=False,
+                capacity_bytes=2442408680913),
+            record)
+
+        record = drive_health.build_drive_health_record({}, identity='/D/1')
+        self.assertEqual(
+            drive_health.DriveHealthRecord('/D/1', None, None, None, None),
+            record)
+
+    def test_scan_drive_health(self):
+        records = list(drive_health.scan_drive_health(self.service_col,
+                                                      concurrency=2))
+
+        # The drive 2 of the first service and the third service fail
+        self.assertEqual(['/C/1/Drives/1', '/C/1/Drives/3', '/C/2/Drives/1'],
+                         [r.drive_id for r in records])
+        self.assertEqual(['OK', 'Critical', 'OK'],
+                         [r.health for r in records])
+
+    def test_scan_drive_health_is_lazy(self):
+        records = drive_health.scan_drive_health(self.service_col,
+                                                 concurrency=1)
+        self.assertEqual('/C/1/Drives/1', next(records).drive_id)
+        # The next page of the first service isn't read yet
+        self.assertNotIn(mock.call(path='/S/1/Drives?skip=2'),
+                         self.conn.get.call_args_list)
+        self.assertNotIn(mock.call(path='/S/2/Drives'),
+                         self.conn.get.call_args_list)
+
+    def test_scan_drive_health_page_failure(self):
+        del self.docs['/S/1/Drives?skip=2']
+
+        records = list(drive_health.scan_drive_health(self.service_col,
+                                                      concurrency=2))
+
+        # The drives listed before the failing page are kept
+        self.assertEqual(['/C/1/Drives/1', '/C/2/Drives/1'],
+                         [r.drive_id for r in records])
+
+    def test_scan_drive_health_expanded(self):
+        rsd_lib_base.set_expand_query(self.conn, '$expand=.')
+        self.docs['/S/1/Drives?$expand=.'] = {
+            'Members': [self.docs['/C/1/Drives/1'],
+                        {'@odata.id': '/C/1/Drives/3'}]}
+        self.docs['/S/2/Drives?$expand=.'] = {
+            'Members': [self.docs['/C/2/Drives/1']]}
+
+        records = list(drive_health.scan_drive_health(self.service_col))
+
+        self.assertEqual(['/C/1/Drives/1', '/C/1/Drives/3', '/C/2/Drives/1'],
+                         [r.drive_id for r in records])
+        self.assertNotIn(mock.call(path='/C/1/Drives/1'),
+                         self.conn.get.call_args_list)
@@ -20,7 +20,9 @@ import testtools
 from sushy import exceptions
 
 from rsd_lib.resources.v2_3.fabric import endpoint
+from rsd_lib.resources.v2_3.storage_service import capacity
 from rsd_lib.resources.v2_3.storage_service import drive
+from rsd_lib.resources.v2_3.storage_service import drive_health
 from rsd_lib.resources.v2_3.storage_service import storage_pool
 from rsd_lib.resources.v2_3.storage_service import storage_service
 from rsd_lib.resources.v2_3.storage_service import volume
@@ -316,3 +318,23 @@ class StorageServiceCollectionTestCase(testtools.TestCase):
             redfish_version=self.storage_service_col.redfish_version)
         self.assertIsInstance(members, list)
         self.assertEqual(1, len(members))
+
+    @mock.patch.object(capacity, 'CapacityTable', autospec=True)
+    def test_get_capacity_table(self, mock_table):
+        table = self.storage_service_col.get_capacity_table(concurrency=4)
+        mock_table.assert_called_once_with(self.storage_service_col,
+                                           concurrency=4)
+        table.refresh.assert_called_once_with()
+
+        self.assertIs(table, self.storage_service_col.get_capacity_table())
+        self.assertEqual(1, table.refresh.call_count)
+        self.assertIs(table, self.storage_service_col.get_capacity_table(
+            refresh=True))
+        self.assertEqual(2, table.refresh.call_count)
+
+    @mock.patch.object(drive_health, 'scan_drive_health', autospec=True)
+    def test_iter_drive_health(self, mock_scan):
+        result = self.storage_service_col.iter_drive_health(concurrency=4)
+        mock_scan.assert_called_once_with(self.storage_service_col,
+                                          concurrency=4)
+        self.assertIs(mock_scan.return_value, result)
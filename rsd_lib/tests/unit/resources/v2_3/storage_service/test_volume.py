@@ -14,12 +14,16 @@
 #    under the License.
 
 import json
+import os
+
+import fixtures
 import jsonschema
 import mock
 import testtools
 
 from sushy import exceptions
 
+from rsd_lib import resource_index as rsd_lib_index
 from rsd_lib.resources.v2_3.storage_service import volume
 from rsd_lib.tests.unit.fakes import request_fakes
 
@@ -147,6 +151,19 @@ class StorageServiceTestCase(testtools.TestCase):
             'Volume.Initialize',
             data={"InitializeType": "Slow"})
 
+    def test_initialize_task_monitor(self):
+        self.volume_inst._conn.post.return_value = mock.Mock(
+            status_code=202, headers={'Location': '/redfish/v1/Tasks/1/Mon'})
+        self.volume_inst._conn.get.return_value = mock.Mock(
+            status_code=200, json=mock.Mock(return_value={
+                'TaskState': 'Completed'}))
+        monitor = self.volume_inst.initialize(init_type="Slow")
+        self.assertFalse(monitor.done())
+        self.assertTrue(monitor.poll())
+        self.assertEqual('Completed', monitor.task_state)
+        self.volume_inst._conn.get.assert_called_with(
+            path='/redfish/v1/Tasks/1/Mon')
+
     def test_initialize_with_invalid_parameter(self):
         with self.assertRaisesRegex(
             exceptions.InvalidParameterValueError,
@@ -158,6 +175,57 @@ class StorageServiceTestCase(testtools.TestCase):
         self.volume_inst.delete()
         self.volume_inst._conn.delete.assert_called_once()
 
+    def test_delete_updates_index(self):
+        index = volume.VolumeIndex()
+        index.add('/redfish/v1/StorageServices/NVMeoE1/Volumes/1',
+                  self.volume_inst._json)
+        rsd_lib_index.set_index(self.volume_inst._conn,
+                                '/redfish/v1/StorageServices/NVMeoE1/Volumes',
+                                index)
+
+        self.volume_inst.delete()
+
+        self.assertEqual(0, len(index))
+
+    def test_get_volume_keys(self):
+        self.assertEqual(
+            set([('durable_name', '/dev/nvme1n1p1'),
+                 ('durable_name',
+                  'iqn.2001-04.com.example:diskarrays-sn-a8675309'),
+                 ('endpoint', '/redfish/v1/Fabrics/NVMeoE/Endpoints/1'),
+                 ('pool', '/redfish/v1/StorageServices/1/StoragePools/2')]),
+            volume.get_volume_keys(self.volume_inst._json))
+        self.assertEqual(set(), volume.get_volume_keys({}))
+
+    def test_index_endpoint_created_and_deleted(self):
+        conn = self.volume_inst._conn
+        index = volume.VolumeIndex()
+        index.add('/redfish/v1/StorageServices/NVMeoE1/Volumes/1',
+                  self.volume_inst._json)
+        rsd_lib_index.set_index(
+            conn, '/redfish/v1/StorageServices/NVMeoE1/Volumes', index)
+
+        rsd_lib_index.add_to_index(
+            conn, '/redfish/v1/Fabrics/NVMeoE/Endpoints/7/',
+            {'ConnectedEntities': [
+                {'EntityLink': {'@odata.id': '/redfish/v1/StorageServices/'
+                                             'NVMeoE1/Volumes/1'}},
+                {'EntityLink': {'@odata.id': '/redfish/v1/StorageServices/'
+                                             'NVMeoE1/Volumes/9'}},
+                {'EntityLink': None}]})
+        self.assertEqual(['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'],
+                         index.find_by_endpoint(
+                             '/redfish/v1/Fabrics/NVMeoE/Endpoints/7'))
+        self.assertEqual(1, len(index))
+
+        rsd_lib_index.discard_from_index(
+            conn, '/redfish/v1/Fabrics/NVMeoE/Endpoints/7')
+        self.assertEqual([], index.find_by_endpoint(
+            '/redfish/v1/Fabrics/NVMeoE/Endpoints/7'))
+        self.assertEqual(['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'],
+                         index.find_by_endpoint(
+                             '/redfish/v1/Fabrics/NVMeoE/Endpoints/1'))
+
 
 class VolumeCollectionTestCase(testtools.TestCase):
 
@@ -296,3 +364,199 @@ class VolumeCollectionTestCase(testtools.TestCase):
                           self.volume_col.create_volume,
                           capacity=1024,
                           bootable="True")
+
+    def _error(self, cls, status_code):
+        return cls(method='POST', url='/redfish/v1/StorageServices/NVMeoE1/'
+                   'Volumes', response=mock.MagicMock(status_code=status_code))
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_create_volumes(self, mock_sleep):
+        unavailable = self._error(exceptions.ServerSideError, 503)
+        internal = self._error(exceptions.ServerSideError, 500)
+        created = request_fakes.fake_request_post(
+            None, headers={"Location": "https://localhost:8443/redfish/v1/"
+                                       "StorageServices/NVMeoE1/Volumes/3"})
+        outcomes = {1024: [unavailable, created], 2048: [internal]}
+
+        def _post(path, data):
+            outcome = outcomes[data['CapacityBytes']].pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        self.conn.post.side_effect = _post
+
+        report = self.volume_col.create_volumes(
+            [{'capacity': 1024}, {'capacity': 2048}], concurrency=2)
+
+        self.assertEqual(2, len(report))
+        first, second = report.results
+        self.assertEqual(volume.VOLUME_CREATE, first.operation)
+        self.assertEqual({'capacity': 1024}, first.target)
+        self.assertEqual('/redfish/v1/StorageServices/NVMeoE1/Volumes/3',
+                         first.identity)
+        self.assertEqual(2, first.attempts)
+        # A 500 is not retried, the volume may have been created
+        self.assertIsNone(second.identity)
+        self.assertIs(internal, second.error)
+        self.assertEqual(1, second.attempts)
+        self.assertEqual([first], report.succeeded)
+        self.assertEqual([second], report.failed)
+        self.assertGreaterEqual(report.max_latency, report.mean_latency)
+
+    def test_create_volumes_invalid_request(self):
+        self.assertRaises(jsonschema.exceptions.ValidationError,
+                          self.volume_col.create_volumes,
+                          [{'capacity': 1024}, {'capacity': 'big'}])
+        self.conn.post.assert_not_called()
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_delete_volumes(self, mock_sleep):
+        not_found = self._error(exceptions.ResourceNotFoundError, 404)
+        internal = self._error(exceptions.ServerSideError, 500)
+        self.conn.delete.side_effect = [internal, not_found, None]
+
+        report = self.volume_col.delete_volumes(
+            ['/redfish/v1/StorageServices/NVMeoE1/Volumes/1',
+             '/redfish/v1/StorageServices/NVMeoE1/Volumes/2'],
+            concurrency=1)
+
+        self.assertEqual([], report.failed)
+        self.assertEqual([2, 1], [r.attempts for r in report])
+        self.assertEqual(['/redfish/v1/StorageServices/NVMeoE1/Volumes/1',
+                          '/redfish/v1/StorageServices/NVMeoE1/Volumes/2'],
+                         [r.identity for r in report])
+        mock_sleep.assert_called_once_with(1)
+
+    @mock.patch.object(volume.VolumeCollection, 'get_member', autospec=True)
+    def test_initialize_volumes(self, mock_get_member):
+        report = self.volume_col.initialize_volumes(
+            ['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'], 'Fast',
+            rate_limit=10)
+
+        self.assertEqual([], report.failed)
+        mock_get_member.return_value.initialize.assert_called_once_with(
+            'Fast')
+        self.assertRaises(exceptions.InvalidParameterValueError,
+                          self.volume_col.initialize_volumes, [], 'Medium')
+
+    @mock.patch('time.sleep', autospec=True)
+    @mock.patch.object(volume.VolumeCollection, 'get_member', autospec=True)
+    def test_initialize_volumes_retry(self, mock_get_member, mock_sleep):
+        unavailable = self._error(exceptions.ServerSideError, 503)
+        internal = self._error(exceptions.ServerSideError, 500)
+        mock_get_member.return_value.initialize.side_effect = [
+            unavailable, None, internal]
+
+        report = self.volume_col.initialize_volumes(
+            ['/redfish/v1/StorageServices/NVMeoE1/Volumes/1',
+             '/redfish/v1/StorageServices/NVMeoE1/Volumes/2'], 'Slow',
+            concurrency=1)
+
+        # A 500 is not retried, the volume may have been initialized
+        self.assertEqual([2, 1], [r.attempts for r in report])
+        self.assertEqual([report.results[1]], report.failed)
+        self.assertIs(internal, report.results[1].error)
+
+    def test_rate_limiter_per_service(self):
+        other_col = volume.VolumeCollection(
+            self.conn, '/redfish/v1/StorageServices/NVMeoE1/Volumes/',
+            redfish_version='1.0.2')
+        limiter = volume._get_limiter(
+            self.conn, '/redfish/v1/StorageServices/NVMeoE1', 10)
+
+        with mock.patch.object(limiter, 'wait', autospec=True) as mock_wait:
+            self.volume_col.delete_volumes(
+                ['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'])
+            other_col.delete_volumes(
+                ['/redfish/v1/StorageServices/NVMeoE1/Volumes/2'],
+                rate_limit=10)
+        # The deletion without a rate limit doesn't wait
+        self.assertEqual(1, mock_wait.call_count)
+        self.assertIsNot(limiter, volume._get_limiter(
+            self.conn, '/redfish/v1/StorageServices/NVMeoE2', 10))
+
+    def _fake_volume(self, identity, durable_name):
+        return mock.Mock(_json={
+            '@odata.id': identity,
+            '@odata.etag': 'W/"1"',
+            'Identifiers': [{'DurableName': durable_name,
+                             'DurableNameFormat': 'NQN'}],
+            'CapacitySources': [{'ProvidingPools': [
+                {'@odata.id': '/redfish/v1/StorageServices/NVMeoE1/'
+                              'StoragePools/1'}]}]})
+
+    @mock.patch.object(volume.VolumeCollection, 'get_member', autospec=True)
+    def test_get_volume_index(self, mock_get_member):
+        mock_get_member.side_effect = (
+            lambda col, identity: self._fake_volume(identity, 'nqn.1'))
+
+        index = self.volume_col.get_volume_index()
+
+        self.assertIsInstance(index, volume.VolumeIndex)
+        self.assertEqual(['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'],
+                         index.find_by_durable_name('nqn.1'))
+        self.assertEqual(['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'],
+                         index.find_by_pool('/redfish/v1/StorageServices/'
+                                            'NVMeoE1/StoragePools/1'))
+        # The index is shared by the instances of the collection
+        other_col = volume.VolumeCollection(
+            self.conn, '/redfish/v1/StorageServices/NVMeoE1/Volumes/')
+        self.assertIs(index, other_col.get_volume_index())
+        self.assertEqual(1, mock_get_member.call_count)
+
+        self.assertIsNot(index, self.volume_col.get_volume_index(
+            rebuild=True))
+        self.assertEqual(2, mock_get_member.call_count)
+
+    @mock.patch.object(volume.VolumeCollection, 'get_member', autospec=True)
+    def test_get_volume_index_persisted(self, mock_get_member):
+        mock_get_member.side_effect = (
+            lambda col, identity: self._fake_volume(identity, 'nqn.1'))
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'volumes.json')
+        self.volume_col.get_volume_index(path=path)
+        self.assertTrue(os.path.exists(path))
+
+        # A new connection revalidates the saved index without loading
+        # the volumes again
+        conn = mock.Mock()
+        conn.get.return_value.json.return_value = (
+            self.conn.get.return_value.json.return_value)
+        volume_col = volume.VolumeCollection(
+            conn, '/redfish/v1/StorageServices/NVMeoE1/Volumes')
+        conn.get.reset_mock()
+        conn.get.return_value.status_code = 304
+        index = volume_col.get_volume_index(path=path)
+
+        self.assertEqual(1, mock_get_member.call_count)
+        conn.get.assert_called_once_with(
+            path='/redfish/v1/StorageServices/NVMeoE1/Volumes/1',
+            headers={'If-None-Match': 'W/"1"'})
+        self.assertEqual(['/redfish/v1/StorageServices/NVMeoE1/Volumes/1'],
+                         index.find_by_durable_name('nqn.1'))
+
+    @mock.patch.object(volume.VolumeCollection, 'get_member', autospec=True)
+    def test_create_volume_updates_index(self, mock_get_member):
+        mock_get_member.side_effect = (
+            lambda col, identity: self._fake_volume(
+                identity, 'nqn.' + identity[-1]))
+        index = self.volume_col.get_volume_index()
+
+        result = self.volume_col.create_volume(capacity=1024)
+
+        self.assertEqual('/redfish/v1/StorageServices/NVMeoE1/Volumes/2',
+                         result)
+        self.assertEqual([result], index.find_by_durable_name('nqn.2'))
+
+    @mock.patch.object(volume.VolumeCollection, 'get_member', autospec=True)
+    def test_create_volume_index_failure(self, mock_get_member):
+        rsd_lib_index.set_index(
+            self.conn, '/redfish/v1/StorageServices/NVMeoE1/Volumes',
+            volume.VolumeIndex())
+        mock_get_member.side_effect = exceptions.ConnectionError(
+            url='/redfish/v1/StorageServices/NVMeoE1/Volumes/2', error='x')
+
+        result = self.volume_col.create_volume(capacity=1024)
+
+        self.assertEqual('/redfish/v1/StorageServices/NVMeoE1/Volumes/2',
+                         result)
@@ -17,6 +17,7 @@ import json
 import mock
 import testtools
 
+from rsd_lib import base as rsd_lib_base
 from rsd_lib.resources.v2_1.chassis import chassis as v2_1_chassis
 from rsd_lib.resources.v2_1.manager import manager as v2_1_manager
 from rsd_lib.resources.v2_2.ethernet_switch import ethernet_switch \
@@ -49,6 +50,12 @@ class RSDLibV2_3TestCase(testtools.TestCase):
         self.assertEqual("/redfish/v1/StorageServices",
                          self.rsd._storage_service_path)
         self.assertEqual(None, self.rsd._telemetry_service_path)
+        self.assertTrue(self.rsd._expand_query.levels)
+        self.assertTrue(self.rsd._expand_query.no_links)
+
+    def test_expand_query_registered(self):
+        self.assertEqual('$expand=.($levels=1)',
+                         rsd_lib_base.get_expand_query(self.conn))
 
     @mock.patch.object(v2_2_system, 'SystemCollection', autospec=True)
     def test_get_system_collection(self, mock_system_collection):
@@ -0,0 +1,309 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from sushy import exceptions
+from sushy.resources import base
+from sushy import utils
+import testtools
+
+from rsd_lib import base as rsd_lib_base
+
+
+class FakeMember(base.ResourceBase):
+
+    identity = base.Field('Id')
+
+
+class FakeCollection(rsd_lib_base.ResourceCollectionBase):
+
+    @property
+    def _resource_type(self):
+        return FakeMember
+
+
+class FakeResource(rsd_lib_base.ResourceBase):
+
+    identity = base.Field('Id')
+
+    @property
+    @utils.cache_it
+    def sub_resource(self):
+        return object()
+
+
+def _fake_response(json_data, status_code=200, etag=None):
+    response = mock.Mock(status_code=status_code,
+                         headers={'ETag': etag} if etag else {})
+    response.json.return_value = json_data
+    return response
+
+
+def _fake_get(path, **kwargs):
+    if path == '/redfish/v1/Fakes':
+        json_data = {
+            'Name': 'Fake Collection',
+            'Members': [{'@odata.id': '/redfish/v1/Fakes/%d' % i}
+                        for i in range(1, 6)]}
+    elif path == '/redfish/v1/Fakes/4':
+        raise exceptions.ResourceNotFoundError(
+            method='GET', url=path, response=mock.MagicMock())
+    else:
+        json_data = {'Id': path.rsplit('/', 1)[-1]}
+    response = mock.Mock()
+    response.json.return_value = json_data
+    return response
+
+
+class ResourceBaseTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ResourceBaseTestCase, self).setUp()
+        self.conn = mock.Mock()
+        self.conn.get.return_value = _fake_response({'Id': '1'},
+                                                    etag='W/"1"')
+        self.resource = FakeResource(self.conn, '/redfish/v1/Fakes/1')
+
+    def test_refresh_not_modified(self):
+        sub_resource = self.resource.sub_resource
+        self.conn.get.return_value = _fake_response(None, status_code=304)
+
+        self.resource.refresh()
+
+        self.conn.get.assert_called_with(
+            path='/redfish/v1/Fakes/1', headers={'If-None-Match': 'W/"1"'})
+        self.assertFalse(self.conn.get.return_value.json.called)
+        self.assertEqual('1', self.resource.identity)
+        self.assertIs(sub_resource, self.resource.sub_resource)
+        stats = rsd_lib_base.get_refresh_stats(self.conn)
+        self.assertEqual(1, stats.hits)
+        self.assertEqual(0, stats.misses)
+        self.assertEqual(1.0, stats.hit_rate)
+
+    def test_refresh_modified(self):
+        sub_resource = self.resource.sub_resource
+        self.conn.get.return_value = _fake_response({'Id': '2'},
+                                                    etag='W/"2"')
+
+        self.resource.refresh()
+
+        self.assertEqual('2', self.resource.identity)
+        self.assertIsNot(sub_resource, self.resource.sub_resource)
+        self.assertEqual('W/"2"', self.resource._etag)
+        stats = rsd_lib_base.get_refresh_stats(self.conn)
+        self.assertEqual(0, stats.hits)
+        self.assertEqual(1, stats.misses)
+        self.assertEqual(0.0, stats.hit_rate)
+
+    def test_refresh_etag_from_payload(self):
+        self.conn.get.return_value = _fake_response(
+            {'Id': '1', '@odata.etag': 'W/"3"'})
+        self.resource.refresh()
+        self.assertEqual('W/"3"', self.resource._etag)
+
+    def test_refresh_without_etag(self):
+        self.conn.get.return_value = _fake_response({'Id': '1'})
+        self.resource.refresh()
+        self.resource.refresh()
+        self.conn.get.assert_called_with(path='/redfish/v1/Fakes/1')
+        self.assertEqual(0, rsd_lib_base.get_refresh_stats(self.conn).hits)
+
+    def test_refresh_not_stale(self):
+        self.conn.get.reset_mock()
+        self.resource.refresh(force=False)
+        self.assertFalse(self.conn.get.called)
+
+        self.resource.invalidate()
+        self.conn.get.return_value = _fake_response(None, status_code=304)
+        self.resource.refresh(force=False)
+        self.conn.get.assert_called_once_with(
+            path='/redfish/v1/Fakes/1', headers={'If-None-Match': 'W/"1"'})
+        self.assertFalse(self.resource._is_stale)
+
+
+class ResourceCollectionBaseTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ResourceCollectionBaseTestCase, self).setUp()
+        self.conn = mock.Mock()
+        self.conn.get.side_effect = _fake_get
+        self.collection = FakeCollection(self.conn, '/redfish/v1/Fakes',
+                                         redfish_version='1.0.2')
+
+    def test_iter_members_parallel(self):
+        results = list(self.collection.iter_members_parallel(concurrency=3))
+
+        self.assertEqual(
+            ['/redfish/v1/Fakes/%d' % i for i in range(1, 6)],
+            [identity for identity, _, _ in results])
+        self.assertEqual(['1', '2', '3', None, '5'],
+                         [member.identity if member else None
+                          for _, member, _ in results])
+        self.assertIsInstance(results[3][2],
+                              exceptions.ResourceNotFoundError)
+
+    def test_get_members_concurrency_partial(self):
+        members = self.collection.get_members(concurrency=4)
+
+        self.assertEqual(['1', '2', '3', '5'],
+                         [member.identity for member in members])
+        # A partial listing is not cached
+        self.assertIsNot(members, self.collection.get_members(concurrency=4))
+
+    def test_get_members_concurrency_cached(self):
+        self.conn = mock.Mock()
+        self.conn.get.return_value.json.side_effect = [
+            {'Members': [{'@odata.id': '/redfish/v1/Fakes/1'},
+                         {'@odata.id': '/redfish/v1/Fakes/2'}]},
+            {'Id': '1'}, {'Id': '2'}]
+        collection = FakeCollection(self.conn, '/redfish/v1/Fakes')
+
+        members = collection.get_members(concurrency=2)
+
+        self.assertEqual(['1', '2'],
+                         sorted(member.identity for member in members))
+        self.assertIs(members, collection.get_members())
+        self.assertIs(members, collection.get_members(concurrency=2))
+        self.assertEqual(3, self.conn.get.call_count)
+
+    def test_get_members_without_concurrency(self):
+        self.conn = mock.Mock()
+        self.conn.get.return_value.json.side_effect = [
+            {'Members': [{'@odata.id': '/redfish/v1/Fakes/1'}]},
+            {'Id': '1'}]
+        collection = FakeCollection(self.conn, '/redfish/v1/Fakes')
+
+        members = collection.get_members()
+
+        self.assertEqual(['1'], [member.identity for member in members])
+        self.assertIs(members, collection.get_members())
+
+    def test_get_members_membership_changed(self):
+        identities = ['/redfish/v1/Fakes/1']
+
+        def _get(path, **kwargs):
+            if path == '/redfish/v1/Fakes':
+                return _fake_response({'Members': [{'@odata.id': i}
+                                                   for i in identities]})
+            return _fake_response({'Id': path.rsplit('/', 1)[-1]})
+        self.conn.get.side_effect = _get
+        collection = FakeCollection(self.conn, '/redfish/v1/Fakes')
+        members = collection.get_members()
+
+        # The membership didn't change, the cached list is kept
+        collection.refresh()
+        self.assertIs(members, collection.get_members())
+
+        identities.append('/redfish/v1/Fakes/2')
+        collection.refresh()
+        self.assertEqual(['1', '2'], [member.identity for member in
+                                      collection.get_members()])
+
+    def test_get_members_expand(self):
+        rsd_lib_base.set_expand_query(self.conn, '$expand=.($levels=1)')
+        self.conn.get.side_effect = None
+        self.conn.get.return_value.json.return_value = {
+            'Members': [
+                {'@odata.id': '/redfish/v1/Fakes/1', 'Id': '1'},
+                {'@odata.id': '/redfish/v1/Fakes/2', 'Id': '2'}]}
+        self.conn.get.reset_mock()
+
+        members = self.collection.get_members(expand=True)
+
+        self.conn.get.assert_called_once_with(
+            path='/redfish/v1/Fakes?$expand=.($levels=1)')
+        self.assertEqual(['1', '2'], [member.identity for member in members])
+        self.assertEqual(['/redfish/v1/Fakes/1', '/redfish/v1/Fakes/2'],
+                         [member.path for member in members])
+        self.assertIs(self.conn, members[0]._conn)
+        self.assertIs(members, self.collection.get_members())
+
+        # A later refresh of a member goes to the service
+        self.conn.get.return_value.json.return_value = {'Id': 'new'}
+        members[0].refresh()
+        self.assertEqual('new', members[0].identity)
+        self.conn.get.assert_called_with(path='/redfish/v1/Fakes/1')
+
+    def test_get_members_expand_not_advertised(self):
+        rsd_lib_base.set_expand_query(self.conn, None)
+        self.conn.get.reset_mock()
+
+        members = self.collection.get_members(expand=True, concurrency=2)
+
+        self.assertEqual(['1', '2', '3', '5'],
+                         [member.identity for member in members])
+        self.assertNotIn(mock.call(path='/redfish/v1/Fakes?$expand=.'),
+                         self.conn.get.call_args_list)
+
+    def test_get_members_expand_ignored_by_service(self):
+        rsd_lib_base.set_expand_query(self.conn, '$expand=.')
+        self.conn.get.reset_mock()
+
+        members = self.collection.get_members(expand=True, concurrency=2)
+
+        self.assertEqual(['1', '2', '3', '5'],
+                         [member.identity for member in members])
+        self.conn.get.assert_any_call(path='/redfish/v1/Fakes?$expand=.')
+
+    def test_get_members_expand_error(self):
+        rsd_lib_base.set_expand_query(self.conn, '$expand=.')
+        error = exceptions.BadRequestError(
+            method='GET', url='/redfish/v1/Fakes', response=mock.MagicMock())
+
+        def _get(path, **kwargs):
+            if path == '/redfish/v1/Fakes?$expand=.':
+                raise error
+            return _fake_get(path.replace('/4', '/6'))
+        self.conn.get.side_effect = _get
+
+        members = self.collection.get_members(expand=True)
+
+        self.assertEqual(['1', '2', '3', '6', '5'],
+                         [member.identity for member in members])
+
+
+class LazyResourceListTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(LazyResourceListTestCase, self).setUp()
+        self.loader = mock.Mock(side_effect=lambda identity: 'res' + identity)
+        self.resources = rsd_lib_base.LazyResourceList(
+            ['/1', '/2', '/3'], self.loader, concurrency=2)
+
+    def test_len(self):
+        self.assertEqual(3, len(self.resources))
+        self.assertFalse(self.loader.called)
+
+    def test_getitem_loads_only_the_item(self):
+        self.assertEqual('res/2', self.resources[1])
+        self.assertEqual('res/3', self.resources[-1])
+        self.assertEqual('res/2', self.resources[1])
+        self.assertEqual([mock.call('/2'), mock.call('/3')],
+                         self.loader.call_args_list)
+        self.assertRaises(IndexError, self.resources.__getitem__, 3)
+
+    def test_getitem_slice(self):
+        self.assertEqual(['res/1', 'res/2'], self.resources[:2])
+        self.assertEqual(2, self.loader.call_count)
+
+    def test_iter(self):
+        self.assertEqual('res/1', self.resources[0])
+        self.assertEqual(['res/1', 'res/2', 'res/3'], list(self.resources))
+        self.assertEqual(['res/1', 'res/2', 'res/3'], list(self.resources))
+        self.assertEqual(3, self.loader.call_count)
+
+    def test_iter_error(self):
+        self.loader.side_effect = ValueError('boom')
+        self.assertRaises(ValueError, list, self.resources)
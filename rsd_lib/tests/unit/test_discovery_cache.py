@@ -0,0 +1,79 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+
+import fixtures
+import testtools
+
+from rsd_lib import discovery_cache
+
+
+class DiscoveryCacheTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(DiscoveryCacheTestCase, self).setUp()
+        with open('rsd_lib/tests/unit/json_samples/v2_2/root.json', 'r') as f:
+            self.root_json = json.loads(f.read())
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'discovery.json')
+        self.cache = discovery_cache.DiscoveryCache(self.path)
+
+    def test_summarize_root(self):
+        summary = discovery_cache.summarize_root(self.root_json)
+        self.assertEqual(
+            {'@odata.id': '/redfish/v1/',
+             'RedfishVersion': '1.1.0',
+             'Systems': {'@odata.id': '/redfish/v1/Systems'},
+             'Chassis': {'@odata.id': '/redfish/v1/Chassis'},
+             'Managers': {'@odata.id': '/redfish/v1/Managers'},
+             'EventService': {'@odata.id': '/redfish/v1/EventService'},
+             'Fabrics': {'@odata.id': '/redfish/v1/Fabrics'},
+             'EthernetSwitches': {
+                 '@odata.id': '/redfish/v1/EthernetSwitches'},
+             'TelemetryService': {
+                 '@odata.id': '/redfish/v1/TelemetryService'},
+             'Oem': {'Intel_RackScale': {
+                 'ApiVersion': '2.2.0',
+                 'Services': {'@odata.id': '/redfish/v1/Services'},
+                 'Nodes': {'@odata.id': '/redfish/v1/Nodes'},
+                 'EthernetSwitches': {
+                     '@odata.id': '/redfish/v1/EthernetSwitches'}}}},
+            summary)
+
+    def test_get_missing_file(self):
+        self.assertIsNone(self.cache.get('http://foo.bar:8442'))
+
+    def test_set_and_get(self):
+        self.cache.set('http://foo.bar:8442', self.root_json)
+        self.cache.set('http://other:8442', {'RedfishVersion': '1.0.2'})
+
+        self.assertEqual(discovery_cache.summarize_root(self.root_json),
+                         self.cache.get('http://foo.bar:8442'))
+        self.assertEqual(
+            {'RedfishVersion': '1.0.2'},
+            discovery_cache.DiscoveryCache(self.path).get(
+                'http://other:8442'))
+        self.assertEqual(['discovery.json'],
+                         os.listdir(os.path.dirname(self.path)))
+
+    def test_get_corrupted_file(self):
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        self.assertIsNone(self.cache.get('http://foo.bar:8442'))
+
+        self.cache.set('http://foo.bar:8442', self.root_json)
+        self.assertIsNotNone(self.cache.get('http://foo.bar:8442'))
@@ -14,17 +14,34 @@
 #    under the License.
 
 import json
+import os
+import subprocess
+import sys
+import threading
 
+import fixtures
 import mock
 from sushy import connector
 import testtools
 
+from rsd_lib import discovery_cache
 from rsd_lib import main
+from rsd_lib import resource_cache
 from rsd_lib.resources import v2_1
 from rsd_lib.resources import v2_2
 from rsd_lib.resources import v2_3
 
 
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _run_python(*args):
+    return subprocess.check_output(
+        (sys.executable,) + args, stderr=subprocess.STDOUT,
+        cwd=PACKAGE_DIR, universal_newlines=True)
+
+
 class RSDLibTestCase(testtools.TestCase):
 
     @mock.patch.object(connector, 'Connector', autospec=True)
@@ -50,21 +67,27 @@ class RSDLibTestCase(testtools.TestCase):
         mock_rsdlibv2_1.assert_called_once_with(
             self.rsd._conn,
             self.rsd._root_prefix,
-            redfish_version=self.rsd._redfish_version)
+            redfish_version=self.rsd._redfish_version,
+            resource_cache=None,
+            json_doc=self.rsd._json)
 
         self.rsd._rsd_api_version = "2.2.0"
         self.rsd.factory()
         mock_rsdlibv2_2.assert_called_once_with(
             self.rsd._conn,
             self.rsd._root_prefix,
-            redfish_version=self.rsd._redfish_version)
+            redfish_version=self.rsd._redfish_version,
+            resource_cache=None,
+            json_doc=self.rsd._json)
 
         self.rsd._rsd_api_version = "2.3.0"
         self.rsd.factory()
         mock_rsdlibv2_3.assert_called_once_with(
             self.rsd._conn,
             self.rsd._root_prefix,
-            redfish_version=self.rsd._redfish_version)
+            redfish_version=self.rsd._redfish_version,
+            resource_cache=None,
+            json_doc=self.rsd._json)
 
     def test_factory_unsupported_version(self):
         self.rsd._rsd_api_version = "10.0.0"
@@ -74,3 +97,233 @@ class RSDLibTestCase(testtools.TestCase):
         with self.assertRaisesRegex(NotImplementedError,
                                     expected_error_message):
             self.rsd.factory()
+
+    def test_factory_reuses_root(self):
+        self.conn.get.reset_mock()
+        rsd = self.rsd.factory()
+        self.assertIsInstance(rsd, v2_1.RSDLibV2_1)
+        self.assertEqual('/redfish/v1/Nodes', rsd._nodes_path)
+        self.assertFalse(self.conn.get.called)
+
+    @mock.patch.object(connector, 'Connector', autospec=True)
+    def test_factory_resource_cache(self, mock_connector):
+        mock_connector.return_value = self.conn
+        cache = resource_cache.ResourceCache()
+        rsd = main.RSDLib('http://foo.bar:8442', resource_cache=cache)
+
+        self.assertIs(cache, rsd.factory().resource_cache)
+        self.assertIs(cache, resource_cache.get_cache(self.conn))
+
+    def test__parse_version(self):
+        self.assertEqual((2, 1, 0), main._parse_version('2.1.0'))
+        self.assertEqual((2, 3, 0), main._parse_version('2.3'))
+        self.assertRaises(ValueError, main._parse_version, '2.x')
+        self.assertRaises(ValueError, main._parse_version, '2.1.0.1')
+
+    @testtools.skipIf(sys.version_info < (3, 7),
+                      '-X importtime requires Python 3.7 or newer')
+    def test_import_time(self):
+        output = _run_python('-X', 'importtime', '-c', 'import rsd_lib')
+        self_times = {}
+        cumulative_times = {}
+        for line in output.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            self_time, cumulative_time, name = (
+                line[len('import time:'):].split('|'))
+            if self_time.strip().isdigit():
+                self_times[name.strip()] = int(self_time)
+                cumulative_times[name.strip()] = int(cumulative_time)
+
+        self.assertIn('rsd_lib.main', self_times)
+        # Note: The budget is relative to importing sushy in the same
+        # process, rather than absolute, so that it does not depend on the
+        # load of the machine running the tests.
+        self.assertLess(
+            sum(self_time for name, self_time in self_times.items()
+                if name.split('.')[0] == 'rsd_lib'),
+            cumulative_times['sushy'])
+
+    def test_import_lazy_modules(self):
+        output = _run_python(
+            '-c', 'import sys; import rsd_lib; '
+            'print(sorted(m for m in sys.modules '
+            'if m.startswith(("rsd_lib.resources", "jsonschema"))))')
+        # The API version packages and the request schemas are only
+        # imported by RSDLib.factory()
+        self.assertEqual('[]', output.strip())
+
+    def test_version_package_lazy_resources(self):
+        output = _run_python(
+            '-c', 'import sys; import rsd_lib.resources.v2_3; '
+            'print(sorted(m for m in sys.modules '
+            'if m.startswith("rsd_lib.resources.")))')
+        self.assertEqual(
+            "['rsd_lib.resources.v2_1', 'rsd_lib.resources.v2_2', "
+            "'rsd_lib.resources.v2_3']", output.strip())
+
+
+class RSDLibDiscoveryCacheTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(RSDLibDiscoveryCacheTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'discovery.json')
+        self.conn = mock.Mock()
+        with open('rsd_lib/tests/unit/json_samples/v2_1/root.json', 'r') as f:
+            self.root_json = json.loads(f.read())
+        self.conn.get.return_value.json.return_value = self.root_json
+
+    @mock.patch.object(connector, 'Connector', autospec=True)
+    def _create_rsd(self, mock_connector):
+        mock_connector.return_value = self.conn
+        return main.RSDLib('http://foo.bar:8442', username='foo',
+                           password='bar', discovery_cache=self.path)
+
+    def test_cache_miss(self):
+        rsd = self._create_rsd()
+
+        self.conn.get.assert_called_once_with(path='/redfish/v1/')
+        self.assertIsNone(rsd._revalidation_thread)
+        self.assertEqual(
+            discovery_cache.summarize_root(self.root_json),
+            discovery_cache.DiscoveryCache(self.path).get(
+                'http://foo.bar:8442'))
+
+    def test_cache_hit(self):
+        cached_json = dict(self.root_json, RedfishVersion='1.0.0')
+        discovery_cache.DiscoveryCache(self.path).set('http://foo.bar:8442',
+                                                      cached_json)
+        get_event = threading.Event()
+
+        def _get(path):
+            get_event.wait(5)
+            return mock.Mock(**{'json.return_value': self.root_json})
+        self.conn.get.side_effect = _get
+
+        rsd = self._create_rsd()
+
+        # The service root comes from the cache, the service is only
+        # contacted by the background revalidation
+        self.assertEqual('1.0.0', rsd._redfish_version)
+        self.assertEqual('2.1.0', rsd._rsd_api_version)
+        self.assertFalse(rsd._is_stale)
+        get_event.set()
+        rsd._revalidation_thread.join(5)
+
+        self.conn.get.assert_called_once_with(path='/redfish/v1/')
+        self.assertEqual('1.0.2', rsd._redfish_version)
+        self.assertEqual(
+            '1.0.2',
+            discovery_cache.DiscoveryCache(self.path).get(
+                'http://foo.bar:8442')['RedfishVersion'])
+
+    def test_cache_hit_updates_factory_objects(self):
+        cached_json = dict(self.root_json, Nodes={'@odata.id': '/Old'})
+        discovery_cache.DiscoveryCache(self.path).set('http://foo.bar:8442',
+                                                      cached_json)
+        get_event = threading.Event()
+
+        def _get(path):
+            get_event.wait(5)
+            return mock.Mock(**{'json.return_value': self.root_json})
+        self.conn.get.side_effect = _get
+        cache = resource_cache.ResourceCache()
+        cache.add(mock.Mock(path='/Old/1'))
+
+        with mock.patch.object(connector, 'Connector', autospec=True,
+                               return_value=self.conn):
+            rsd = main.RSDLib('http://foo.bar:8442',
+                              discovery_cache=self.path,
+                              resource_cache=cache)
+        versioned = rsd.factory()
+        self.assertEqual('/Old', versioned._nodes_path)
+        get_event.set()
+        rsd._revalidation_thread.join(5)
+
+        # The object returned by factory() parses the new service root
+        # without fetching it again
+        self.conn.get.assert_called_once_with(path='/redfish/v1/')
+        self.assertEqual('/redfish/v1/Nodes', versioned._nodes_path)
+        self.assertFalse(versioned._is_stale)
+        self.assertEqual(0, len(cache))
+
+    def test_cache_hit_concurrent_access(self):
+        cached_json = dict(self.root_json, Nodes={'@odata.id': '/Old'},
+                           RedfishVersion='1.0.0')
+        discovery_cache.DiscoveryCache(self.path).set('http://foo.bar:8442',
+                                                      cached_json)
+        parsed = threading.Event()
+        resume = threading.Event()
+        parse_attributes = v2_1.RSDLibV2_1._parse_attributes
+
+        def _parse_attributes(resource):
+            parse_attributes(resource)
+            if threading.current_thread().name == 'rsd-lib-discovery':
+                parsed.set()
+                resume.wait(5)
+
+        rsd = self._create_rsd()
+        rsd._revalidation_thread.join(5)
+        versioned = rsd.factory()
+        self.useFixture(fixtures.MockPatchObject(
+            v2_1.RSDLibV2_1, '_parse_attributes', _parse_attributes))
+        thread = threading.Thread(target=rsd._update_root,
+                                  args=(cached_json,),
+                                  name='rsd-lib-discovery')
+        thread.start()
+        self.assertTrue(parsed.wait(5))
+
+        # The object is still whole while the new root is being parsed
+        self.assertEqual('/redfish/v1/Nodes', versioned._nodes_path)
+        self.assertEqual('1.0.2', versioned._redfish_version)
+        resume.set()
+        thread.join(5)
+
+        self.assertEqual('/Old', versioned._nodes_path)
+        self.assertEqual('1.0.0', versioned._redfish_version)
+        self.assertFalse(versioned._is_stale)
+
+    def test_cache_hit_version_changed(self):
+        cached_json = dict(self.root_json, RedfishVersion='1.0.0')
+        discovery_cache.DiscoveryCache(self.path).set('http://foo.bar:8442',
+                                                      cached_json)
+        get_event = threading.Event()
+        new_json = json.loads(json.dumps(self.root_json))
+        new_json['Oem']['Intel_RackScale']['ApiVersion'] = '2.3.0'
+
+        def _get(path):
+            get_event.wait(5)
+            return mock.Mock(**{'json.return_value': new_json})
+        self.conn.get.side_effect = _get
+
+        rsd = self._create_rsd()
+        versioned = rsd.factory()
+        get_event.set()
+        rsd._revalidation_thread.join(5)
+
+        # The object returned by factory() is of the wrong version now
+        self.assertTrue(versioned._is_stale)
+        self.assertEqual('1.0.0', versioned._redfish_version)
+        self.assertEqual(('rsd_lib.resources.v2_3', 'RSDLibV2_3'),
+                         rsd._get_version_class())
+
+    def test_cache_hit_unchanged(self):
+        discovery_cache.DiscoveryCache(self.path).set('http://foo.bar:8442',
+                                                      self.root_json)
+
+        rsd = self._create_rsd()
+        rsd._revalidation_thread.join(5)
+
+        self.assertFalse(rsd._is_stale)
+
+    def test_cache_hit_revalidation_error(self):
+        discovery_cache.DiscoveryCache(self.path).set('http://foo.bar:8442',
+                                                      self.root_json)
+        self.conn.get.side_effect = IOError('boom')
+
+        rsd = self._create_rsd()
+        rsd._revalidation_thread.join(5)
+
+        self.assertFalse(rsd._is_stale)
+        self.assertEqual('2.1.0', rsd._rsd_api_version)
@@ -0,0 +1,179 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import mock
+import testtools
+
+from rsd_lib import resource_cache as rsd_lib_cache
+
+
+class FakeResource(object):
+
+    def __init__(self, connector, identity, redfish_version=None):
+        self._conn = connector
+        self.path = identity
+        self.redfish_version = redfish_version
+        self.invalidate = mock.Mock()
+
+
+class ResourceCacheTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ResourceCacheTestCase, self).setUp()
+        self.conn = mock.Mock()
+        self.cache = rsd_lib_cache.ResourceCache(max_size=2)
+
+    def test_get_or_create(self):
+        first = self.cache.get_or_create(FakeResource, self.conn,
+                                         '/redfish/v1/Nodes/1',
+                                         redfish_version='1.0.2')
+        second = self.cache.get_or_create(FakeResource, self.conn,
+                                          '/redfish/v1/Nodes/1/')
+        self.assertIs(first, second)
+        self.assertEqual('1.0.2', first.redfish_version)
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(1, len(self.cache))
+
+    def test_get_or_create_concurrent(self):
+        release = threading.Event()
+        created = []
+
+        class SlowResource(FakeResource):
+            def __init__(self, *args, **kwargs):
+                created.append(self)
+                release.wait(5)
+                super(SlowResource, self).__init__(*args, **kwargs)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.cache.get_or_create(SlowResource, self.conn, '/1')))
+            for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(created))
+        self.assertEqual([created[0]] * 4, results)
+
+    def test_get_or_create_failure(self):
+        resource_type = mock.Mock(side_effect=[ValueError('boom'),
+                                               mock.sentinel.resource])
+        self.assertRaises(ValueError, self.cache.get_or_create,
+                          resource_type, self.conn, '/1')
+        self.assertIs(mock.sentinel.resource, self.cache.get_or_create(
+            resource_type, self.conn, '/1'))
+        self.assertEqual(2, resource_type.call_count)
+
+    def test_get_keyed_by_type(self):
+        self.cache.add(FakeResource(self.conn, '/redfish/v1/Nodes/1'))
+        self.assertIsNone(self.cache.get(mock.Mock, '/redfish/v1/Nodes/1'))
+        self.assertIsNotNone(
+            self.cache.get(FakeResource, '/redfish/v1/Nodes/1'))
+
+    def test_lru_eviction(self):
+        for identity in ('/1', '/2'):
+            self.cache.get_or_create(FakeResource, self.conn, identity)
+        # Touch '/1' so that '/2' becomes the least recently used entry
+        self.cache.get(FakeResource, '/1')
+        self.cache.get_or_create(FakeResource, self.conn, '/3')
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNotNone(self.cache.get(FakeResource, '/1'))
+        self.assertIsNone(self.cache.get(FakeResource, '/2'))
+
+    @mock.patch.object(rsd_lib_cache.time, 'time', autospec=True)
+    def test_ttl_expiry(self, mock_time):
+        self.cache.ttl = 10
+        mock_time.return_value = 100
+        first = self.cache.get_or_create(FakeResource, self.conn, '/1')
+        mock_time.return_value = 105
+        self.assertIs(first, self.cache.get(FakeResource, '/1'))
+        mock_time.return_value = 111
+        self.assertIsNot(
+            first, self.cache.get_or_create(FakeResource, self.conn, '/1'))
+
+    def test_disabled(self):
+        cache = rsd_lib_cache.ResourceCache(max_size=0)
+        first = cache.get_or_create(FakeResource, self.conn, '/1')
+        self.assertIsNot(first,
+                         cache.get_or_create(FakeResource, self.conn, '/1'))
+        self.assertEqual(0, len(cache))
+
+    def test_invalidate(self):
+        first = self.cache.get_or_create(FakeResource, self.conn, '/1')
+        second = self.cache.get_or_create(FakeResource, self.conn, '/2')
+        self.cache.invalidate('/1/')
+        first.invalidate.assert_called_once_with()
+        self.assertFalse(second.invalidate.called)
+        self.assertEqual(1, len(self.cache))
+
+        self.cache.invalidate()
+        second.invalidate.assert_called_once_with()
+        self.assertEqual(0, len(self.cache))
+
+
+class ConnectorCacheTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ConnectorCacheTestCase, self).setUp()
+        self.conn = mock.Mock()
+        self.cache = rsd_lib_cache.ResourceCache()
+        rsd_lib_cache.register(self.conn, self.cache)
+
+    def test_get_resource(self):
+        first = rsd_lib_cache.get_resource(self.conn, FakeResource, '/1')
+        self.assertIs(first,
+                      rsd_lib_cache.get_resource(self.conn, FakeResource,
+                                                 '/1'))
+
+    def test_get_resource_not_registered(self):
+        rsd_lib_cache.register(self.conn, None)
+        self.assertIsNone(rsd_lib_cache.get_cache(self.conn))
+        first = rsd_lib_cache.get_resource(self.conn, FakeResource, '/1')
+        self.assertIsNot(first,
+                         rsd_lib_cache.get_resource(self.conn, FakeResource,
+                                                    '/1'))
+
+    def test_invalidate_member(self):
+        collection = rsd_lib_cache.get_resource(
+            self.conn, FakeResource, '/redfish/v1/Nodes')
+        member = rsd_lib_cache.get_resource(
+            self.conn, FakeResource, '/redfish/v1/Nodes/1')
+        rsd_lib_cache.invalidate_member(self.conn, '/redfish/v1/Nodes/1')
+        collection.invalidate.assert_called_once_with()
+        member.invalidate.assert_called_once_with()
+        self.assertEqual(0, len(self.cache))
+
+    def test_get_loaded_member(self):
+        self.assertIsNone(rsd_lib_cache.get_loaded_member(
+            self.conn, FakeResource, '/redfish/v1/Nodes/1'))
+
+        collection = rsd_lib_cache.get_resource(
+            self.conn, FakeResource, '/redfish/v1/Nodes')
+        member = FakeResource(self.conn, '/redfish/v1/Nodes/1')
+        collection._cache_get_members = [
+            FakeResource(self.conn, '/redfish/v1/Nodes/2'), member]
+        self.assertIs(member, rsd_lib_cache.get_loaded_member(
+            self.conn, FakeResource, '/redfish/v1/Nodes/1/'))
+        self.assertIsNone(rsd_lib_cache.get_loaded_member(
+            self.conn, FakeResource, '/redfish/v1/Nodes/3'))
+
+        rsd_lib_cache.register(self.conn, None)
+        self.assertIsNone(rsd_lib_cache.get_loaded_member(
+            self.conn, FakeResource, '/redfish/v1/Nodes/1'))
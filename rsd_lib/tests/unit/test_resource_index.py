@@ -0,0 +1,240 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import mock
+import testtools
+
+from rsd_lib import resource_index
+
+
+class _NameIndex(resource_index.ResourceIndex):
+
+    def get_keys(self, json_doc):
+        return [('name', json_doc['Name'])] + json_doc.get('Tags', [])
+
+
+class ResourceIndexTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ResourceIndexTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'index.json')
+        self.index = _NameIndex()
+        self.index.add('/redfish/v1/Things/1/', {'Name': 'a', 'Tags': ['x']})
+        self.index.add('/redfish/v1/Things/2', {'Name': 'b', 'Tags': ['x']})
+
+    def test_abstract(self):
+        self.assertRaises(TypeError, resource_index.ResourceIndex)
+
+    def test_find(self):
+        self.assertEqual(2, len(self.index))
+        self.assertIn('/redfish/v1/Things/1', self.index)
+        self.assertEqual(['/redfish/v1/Things/1'],
+                         self.index.find(('name', 'a')))
+        self.assertEqual(['/redfish/v1/Things/1', '/redfish/v1/Things/2'],
+                         self.index.find('x'))
+        self.assertEqual([], self.index.find('y'))
+
+    def test_add_replaces_keys(self):
+        self.index.add('/redfish/v1/Things/1', {'Name': 'c'})
+        self.assertEqual([], self.index.find(('name', 'a')))
+        self.assertEqual(['/redfish/v1/Things/2'], self.index.find('x'))
+
+    def test_add_keys(self):
+        self.index.add_keys('/redfish/v1/Things/1', ['y'])
+        self.index.add_keys('/redfish/v1/Things/3', ['y'])
+        self.assertEqual(['/redfish/v1/Things/1'], self.index.find('y'))
+        self.assertEqual(['/redfish/v1/Things/1'],
+                         self.index.find(('name', 'a')))
+
+    def test_remove_key(self):
+        self.index.remove_key('x')
+        self.assertEqual([], self.index.find('x'))
+        self.assertEqual(['/redfish/v1/Things/2'],
+                         self.index.find(('name', 'b')))
+
+    def test_discard(self):
+        self.index.discard('/redfish/v1/Things/1/')
+        self.assertEqual(['/redfish/v1/Things/2'], self.index.find('x'))
+        self.assertEqual([], self.index.find(('name', 'a')))
+
+    def test_save_and_load(self):
+        self.index.save(self.path)
+
+        loaded = _NameIndex()
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual(sorted(self.index.identities),
+                         sorted(loaded.identities))
+        self.assertEqual(['/redfish/v1/Things/1'],
+                         loaded.find(('name', 'a')))
+        self.assertEqual(['/redfish/v1/Things/1', '/redfish/v1/Things/2'],
+                         loaded.find('x'))
+
+    def test_persist(self):
+        self.index.persist()
+        self.assertFalse(os.path.exists(self.path))
+
+        index = _NameIndex(self.path)
+        index.add('/redfish/v1/Things/1', {'Name': 'a'})
+        index.persist()
+        loaded = _NameIndex(self.path)
+        self.assertTrue(loaded.load())
+        self.assertEqual(['/redfish/v1/Things/1'], loaded.identities)
+
+    @mock.patch.object(resource_index.LOG, 'warning', autospec=True)
+    def test_persist_failure(self, mock_warning):
+        index = _NameIndex(os.path.join(self.path, 'missing', 'index.json'))
+        index.persist()
+        self.assertEqual(1, mock_warning.call_count)
+
+    def test_load_missing_or_corrupted(self):
+        self.assertFalse(self.index.load(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{"version": 1')
+        self.assertFalse(self.index.load(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{"version": 0, "entries": {}}')
+        self.assertFalse(self.index.load(self.path))
+        # The content of the index is left untouched
+        self.assertEqual(2, len(self.index))
+
+    def test_sync(self):
+        collection = mock.Mock()
+        collection.members_identities = ('/redfish/v1/Things/2',
+                                         '/redfish/v1/Things/3',
+                                         '/redfish/v1/Things/4')
+
+        def _get_member(identity):
+            if identity.endswith('4'):
+                raise ValueError('boom')
+            return mock.Mock(_json={'Name': 'c'})
+        collection.get_member.side_effect = _get_member
+
+        self.index.sync(collection, concurrency=1)
+
+        self.assertEqual(['/redfish/v1/Things/2', '/redfish/v1/Things/3'],
+                         sorted(self.index.identities))
+        self.assertEqual([mock.call('/redfish/v1/Things/3'),
+                          mock.call('/redfish/v1/Things/4')],
+                         collection.get_member.call_args_list)
+
+    def test_sync_revalidates_loaded_entries(self):
+        self.index.add('/redfish/v1/Things/1', {'Name': 'a'}, etag='W/"1"')
+        self.index.add('/redfish/v1/Things/2',
+                       {'Name': 'b', '@odata.etag': 'W/"2"'})
+        self.index.add('/redfish/v1/Things/3',
+                       {'Name': 'c', '@odata.etag': 'W/"3"'})
+        self.index.save(self.path)
+        loaded = _NameIndex()
+        loaded.load(self.path)
+
+        collection = mock.Mock()
+        collection.members_identities = ('/redfish/v1/Things/1',
+                                         '/redfish/v1/Things/2',
+                                         '/redfish/v1/Things/3',
+                                         '/redfish/v1/Things/4')
+        not_modified = mock.Mock(status_code=304)
+        modified = mock.Mock(status_code=200)
+        modified.json.return_value = {'Name': 'd', '@odata.etag': 'W/"4"'}
+        collection._conn.get.side_effect = [not_modified, modified,
+                                            ValueError('boom')]
+        collection.get_member.return_value = mock.Mock(
+            _json={'Name': 'e'}, _etag=None)
+
+        loaded.sync(collection, concurrency=1)
+
+        self.assertEqual(
+            [mock.call(path='/redfish/v1/Things/1',
+                       headers={'If-None-Match': 'W/"1"'}),
+             mock.call(path='/redfish/v1/Things/2',
+                       headers={'If-None-Match': 'W/"2"'}),
+             mock.call(path='/redfish/v1/Things/3',
+                       headers={'If-None-Match': 'W/"3"'})],
+            collection._conn.get.call_args_list)
+        collection.get_member.assert_called_once_with('/redfish/v1/Things/4')
+        self.assertEqual(['/redfish/v1/Things/1'], loaded.find(('name', 'a')))
+        self.assertEqual(['/redfish/v1/Things/2'], loaded.find(('name', 'd')))
+        self.assertEqual(['/redfish/v1/Things/4'], loaded.find(('name', 'e')))
+        self.assertNotIn('/redfish/v1/Things/3', loaded)
+
+        # Once revalidated, the entries are trusted, only the one which
+        # failed is loaded again
+        collection._conn.get.reset_mock()
+        collection.get_member.reset_mock()
+        loaded.sync(collection)
+        self.assertFalse(collection._conn.get.called)
+        collection.get_member.assert_called_once_with('/redfish/v1/Things/3')
+
+
+class ResourceIndexRegistryTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(ResourceIndexRegistryTestCase, self).setUp()
+        self.conn = mock.Mock()
+        self.index = _NameIndex()
+        resource_index.set_index(self.conn, '/redfish/v1/Things/', self.index)
+
+    def test_get_index(self):
+        self.assertIs(self.index,
+                      resource_index.get_index(self.conn,
+                                               '/redfish/v1/Things'))
+        self.assertIsNone(resource_index.get_index(mock.Mock(),
+                                                   '/redfish/v1/Things'))
+        self.assertEqual([self.index],
+                         resource_index.get_indexes(self.conn))
+
+    def test_add_and_discard(self):
+        resource_index.add_to_index(self.conn, '/redfish/v1/Things/1',
+                                    {'Name': 'a'})
+        resource_index.add_to_index(self.conn, '/redfish/v1/Others/1',
+                                    {'Name': 'a'})
+        self.assertEqual(['/redfish/v1/Things/1'],
+                         self.index.find(('name', 'a')))
+
+        resource_index.discard_from_index(self.conn, '/redfish/v1/Things/1')
+        self.assertEqual(0, len(self.index))
+
+    def test_add_and_discard_persisted(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'index.json')
+        self.index.path = path
+
+        resource_index.add_to_index(self.conn, '/redfish/v1/Things/1',
+                                    {'Name': 'a'})
+        loaded = _NameIndex()
+        loaded.load(path)
+        self.assertEqual(['/redfish/v1/Things/1'], loaded.identities)
+
+        resource_index.discard_from_index(self.conn, '/redfish/v1/Things/1')
+        loaded.load(path)
+        self.assertEqual([], loaded.identities)
+
+    def test_other_indexes_notified(self):
+        other = mock.Mock(spec=resource_index.ResourceIndex)
+        resource_index.set_index(self.conn, '/redfish/v1/Others', other)
+
+        resource_index.add_to_index(self.conn, '/redfish/v1/Things/1',
+                                    {'Name': 'a'})
+        resource_index.discard_from_index(self.conn, '/redfish/v1/Things/1')
+
+        other.resource_created.assert_called_once_with(
+            '/redfish/v1/Things/1', {'Name': 'a'})
+        other.resource_deleted.assert_called_once_with(
+            '/redfish/v1/Things/1')
+        self.assertFalse(other.add.called)
+        self.assertEqual(2, other.persist.call_count)
@@ -0,0 +1,178 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import threading
+
+import mock
+from sushy import exceptions
+import testtools
+
+from rsd_lib import task_monitor
+
+
+def _response(status_code, json_doc=None, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    if json_doc is None:
+        response.json.side_effect = ValueError('No JSON object')
+    else:
+        response.json.return_value = json_doc
+    return response
+
+
+class ParseRetryAfterTestCase(testtools.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertIsNone(task_monitor.parse_retry_after(None))
+        self.assertIsNone(task_monitor.parse_retry_after('soon'))
+        self.assertEqual(5, task_monitor.parse_retry_after('5'))
+        self.assertEqual(task_monitor.MAX_POLL_INTERVAL,
+                         task_monitor.parse_retry_after('86400'))
+
+    def test_parse_retry_after_http_date(self):
+        # Wed, 21 Oct 2015 07:28:00 GMT
+        now = 1445412480
+        self.assertEqual(
+            20, task_monitor.parse_retry_after(
+                'Wed, 21 Oct 2015 07:28:20 GMT', now=now))
+        self.assertEqual(
+            0, task_monitor.parse_retry_after(
+                'Wed, 21 Oct 2015 07:27:00 GMT', now=now))
+
+
+class TaskMonitorTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(TaskMonitorTestCase, self).setUp()
+        self.conn = mock.Mock()
+
+    def test_from_response_synchronous(self):
+        response = _response(200)
+        monitor = task_monitor.TaskMonitor.from_response(self.conn, response)
+        self.assertTrue(monitor.done())
+        self.assertIsNone(monitor.path)
+        self.assertIs(response, monitor.wait())
+
+        # A 202 without task monitor can't be followed
+        monitor = task_monitor.TaskMonitor.from_response(
+            self.conn, _response(202))
+        self.assertTrue(monitor.done())
+
+    def test_from_response_task_monitor(self):
+        monitor = task_monitor.TaskMonitor.from_response(
+            self.conn, _response(202, headers={
+                'Location': '/redfish/v1/TaskService/Tasks/1/Monitor',
+                'Retry-After': '3'}))
+        self.assertFalse(monitor.done())
+        self.assertEqual('/redfish/v1/TaskService/Tasks/1/Monitor',
+                         monitor.path)
+        self.assertEqual(3, monitor.retry_after)
+
+    def test_poll(self):
+        final = _response(204)
+        self.conn.get.side_effect = [
+            _response(202, {'TaskState': 'Running', 'PercentComplete': 40},
+                      headers={'Retry-After': '7'}),
+            final]
+        monitor = task_monitor.TaskMonitor(self.conn, path='/Tasks/1')
+
+        self.assertFalse(monitor.poll())
+        self.assertEqual('Running', monitor.task_state)
+        self.assertEqual(40, monitor.percent_complete)
+        self.assertEqual(7, monitor.retry_after)
+
+        self.assertTrue(monitor.poll())
+        self.assertIs(final, monitor.wait(timeout=0))
+        self.assertTrue(monitor.poll())
+        self.conn.get.assert_called_with(path='/Tasks/1')
+        self.assertEqual(2, self.conn.get.call_count)
+
+    def test_poll_failed_task(self):
+        self.conn.get.return_value = _response(200, {
+            'TaskState': 'Exception',
+            'Messages': [{'Message': 'Disk failure'}]})
+        monitor = task_monitor.TaskMonitor(self.conn, path='/Tasks/1')
+
+        self.assertTrue(monitor.poll())
+        self.assertRaisesRegex(task_monitor.TaskFailedError, 'Disk failure',
+                               monitor.wait, timeout=0)
+
+    def test_poll_error(self):
+        self.conn.get.side_effect = exceptions.ConnectionError(
+            url='/Tasks/1', error='refused')
+        monitor = task_monitor.TaskMonitor(self.conn, path='/Tasks/1')
+
+        self.assertTrue(monitor.poll())
+        self.assertRaises(exceptions.ConnectionError, monitor.wait,
+                          timeout=0)
+
+    def test_wait_timeout(self):
+        scheduler = mock.Mock()
+        monitor = task_monitor.TaskMonitor(self.conn, path='/Tasks/1')
+        self.assertRaises(futures.TimeoutError, monitor.wait, timeout=0,
+                          scheduler=scheduler)
+        # The task is only scheduled once
+        self.assertRaises(futures.TimeoutError, monitor.wait, timeout=0,
+                          scheduler=scheduler)
+        scheduler.add.assert_called_once_with(monitor)
+
+
+class TaskSchedulerTestCase(testtools.TestCase):
+
+    def setUp(self):
+        super(TaskSchedulerTestCase, self).setUp()
+        self.scheduler = task_monitor.TaskScheduler(poll_interval=0.01,
+                                                    concurrency=4)
+
+    def _monitor(self, *responses, **kwargs):
+        conn = mock.Mock()
+        conn.get.side_effect = list(responses)
+        return task_monitor.TaskMonitor(conn, path='/Tasks/1', **kwargs)
+
+    def test_wait_many(self):
+        monitors = [self._monitor(_response(202), _response(202),
+                                  _response(200, {'TaskState': 'Completed'}))
+                    for _ in range(20)]
+        done = []
+        lock = threading.Lock()
+
+        def _done(monitor):
+            with lock:
+                done.append(monitor)
+
+        for monitor in monitors:
+            monitor.add_done_callback(_done, scheduler=self.scheduler)
+        for monitor in monitors:
+            self.assertEqual(200, monitor.wait(timeout=10).status_code)
+
+        self.assertEqual(20, len(done))
+        self.assertEqual(0, len(self.scheduler))
+        for monitor in monitors:
+            self.assertEqual(3, monitor._conn.get.call_count)
+
+    @mock.patch('time.time', autospec=True)
+    def test_add_honors_retry_after(self, mock_time):
+        mock_time.return_value = 100
+        with mock.patch.object(threading, 'Thread', autospec=True):
+            self.scheduler.add(self._monitor(retry_after=30))
+            self.scheduler.add(self._monitor())
+        self.assertEqual([100.01, 130],
+                         sorted(entry[0] for entry in self.scheduler._queue))
+
+    def test_get_scheduler(self):
+        self.assertIsInstance(task_monitor.get_scheduler(),
+                              task_monitor.TaskScheduler)
+        self.assertIs(task_monitor.get_scheduler(),
+                      task_monitor.get_scheduler())
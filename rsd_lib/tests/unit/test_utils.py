@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+from sushy import exceptions
 import testtools
 
 from rsd_lib import utils as rsd_lib_utils
@@ -28,7 +30,105 @@ class UtilsTestCase(testtools.TestCase):
             rsd_lib_utils.get_resource_identity({
                 "@odata.id": "/redfish/v1/Systems/437XR1138R2/BIOS"}))
 
+    def test_normalize_identity(self):
+        self.assertEqual('/redfish/v1/Nodes/1',
+                         rsd_lib_utils.normalize_identity(
+                             '/redfish/v1/Nodes/1/'))
+        self.assertEqual('/redfish/v1/Nodes/1',
+                         rsd_lib_utils.normalize_identity(
+                             '/redfish/v1/Nodes/1'))
+        self.assertIsNone(rsd_lib_utils.normalize_identity(None))
+
     def test_int_or_none(self):
         self.assertIsNone(rsd_lib_utils.int_or_none(None))
         self.assertEqual(0, rsd_lib_utils.int_or_none('0'))
         self.assertEqual(1, rsd_lib_utils.int_or_none('1'))
+
+    def test_iter_concurrently(self):
+        def square(x):
+            if x == 3:
+                raise ValueError('bad item')
+            return x * x
+
+        results = list(rsd_lib_utils.iter_concurrently(
+            square, range(6), concurrency=2))
+        self.assertEqual([0, 1, 2, 3, 4, 5], [i[0] for i in results])
+        self.assertEqual([0, 1, 4, None, 16, 25], [i[1] for i in results])
+        self.assertIsInstance(results[3][2], ValueError)
+        self.assertEqual([None] * 5,
+                         [i[2] for i in results if i[0] != 3])
+
+    def test_iter_concurrently_sequential(self):
+        calls = []
+        results = list(rsd_lib_utils.iter_concurrently(
+            calls.append, ['a', 'b'], concurrency=1))
+        self.assertEqual(['a', 'b'], calls)
+        self.assertEqual([('a', None, None), ('b', None, None)], results)
+
+    def test_map_concurrently(self):
+        self.assertEqual(
+            [(1, 2, None), (2, 3, None)],
+            rsd_lib_utils.map_concurrently(lambda x: x + 1, [1, 2]))
+
+    @mock.patch.object(rsd_lib_utils.LOG, 'warning', autospec=True)
+    def test_crawl(self, mock_warning):
+        def func(x):
+            if x == 2:
+                raise ValueError('boom')
+            return x * 10
+
+        self.assertEqual(
+            [(1, 10), (3, 30)],
+            rsd_lib_utils.crawl(func, [1, 2, 3], 'the test', concurrency=2))
+        self.assertEqual(1, mock_warning.call_count)
+        self.assertEqual('the test',
+                         mock_warning.call_args[0][1]['description'])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_call_with_retry(self, mock_sleep):
+        func = mock.Mock(side_effect=[IOError(), IOError(), 'done'])
+        self.assertEqual('done', rsd_lib_utils.call_with_retry(
+            func, lambda e: isinstance(e, IOError), retries=2,
+            retry_interval=0.5))
+        self.assertEqual([mock.call(0.5), mock.call(1.0)],
+                         mock_sleep.call_args_list)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_call_with_retry_gives_up(self, mock_sleep):
+        func = mock.Mock(side_effect=[IOError(), ValueError()])
+        self.assertRaises(ValueError, rsd_lib_utils.call_with_retry,
+                          func, lambda e: isinstance(e, IOError))
+        self.assertEqual(1, mock_sleep.call_count)
+
+        func = mock.Mock(side_effect=IOError())
+        self.assertRaises(IOError, rsd_lib_utils.call_with_retry,
+                          func, lambda e: True, retries=1)
+        self.assertEqual(2, func.call_count)
+
+    def test_is_service_unavailable(self):
+        def _error(status_code):
+            return exceptions.ServerSideError(
+                method='POST', url='/redfish/v1/Nodes',
+                response=mock.MagicMock(status_code=status_code))
+
+        self.assertTrue(rsd_lib_utils.is_service_unavailable(_error(503)))
+        self.assertFalse(rsd_lib_utils.is_service_unavailable(_error(500)))
+        self.assertFalse(rsd_lib_utils.is_service_unavailable(IOError()))
+
+    @mock.patch('time.sleep', autospec=True)
+    @mock.patch('time.time', autospec=True)
+    def test_rate_limiter(self, mock_time, mock_sleep):
+        mock_time.return_value = 100.0
+        limiter = rsd_lib_utils.RateLimiter(4)
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+        self.assertEqual([mock.call(0.25), mock.call(0.5)],
+                         mock_sleep.call_args_list)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_rate_limiter_unlimited(self, mock_sleep):
+        limiter = rsd_lib_utils.RateLimiter(None)
+        limiter.wait()
+        limiter.wait()
+        mock_sleep.assert_not_called()
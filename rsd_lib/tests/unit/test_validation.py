@@ -0,0 +1,62 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import jsonschema
+import mock
+import testtools
+
+from rsd_lib.resources.v2_2.node import schemas as v2_2_node_schemas
+from rsd_lib.resources.v2_3.node import schemas as v2_3_node_schemas
+from rsd_lib import validation as rsd_lib_validation
+
+
+class ValidationTestCase(testtools.TestCase):
+
+    def test_get_validator_compiled_once(self):
+        schema = {'type': 'array', 'items': {'type': 'number'}}
+        with mock.patch.object(rsd_lib_validation.validators, 'validator_for',
+                               wraps=jsonschema.validators.validator_for
+                               ) as mock_validator_for:
+            validator = rsd_lib_validation.get_validator(schema)
+            self.assertIs(validator,
+                          rsd_lib_validation.get_validator(schema))
+            self.assertIs(validator, rsd_lib_validation.get_validator(
+                {'items': {'type': 'number'}, 'type': 'array'}))
+        mock_validator_for.assert_called_once_with(schema)
+
+    def test_get_validator_shared_across_versions(self):
+        self.assertIs(
+            rsd_lib_validation.get_validator(
+                v2_2_node_schemas.memory_req_schema),
+            rsd_lib_validation.get_validator(
+                v2_3_node_schemas.memory_req_schema))
+
+    def test_get_validator_invalid_schema(self):
+        self.assertRaises(jsonschema.exceptions.SchemaError,
+                          rsd_lib_validation.get_validator,
+                          {'type': 'no-such-type'})
+
+    def test_validate(self):
+        schema = {'type': 'object', 'required': ['Name']}
+        rsd_lib_validation.validate({'Name': 'fake'}, schema)
+        self.assertRaises(jsonschema.exceptions.ValidationError,
+                          rsd_lib_validation.validate, {}, schema)
+
+    def test_validate_trusted(self):
+        schema = {'type': 'object', 'required': ['Name']}
+        with rsd_lib_validation.trusted():
+            rsd_lib_validation.validate({}, schema)
+        self.assertRaises(jsonschema.exceptions.ValidationError,
+                          rsd_lib_validation.validate, {}, schema)
@@ -13,6 +13,23 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+from concurrent import futures
+import importlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from sushy import exceptions
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+"""Default number of concurrent requests issued by the bulk helpers"""
+
 
 def get_resource_identity(resource):
     if resource is None:
@@ -21,6 +38,15 @@ def get_resource_identity(resource):
         return resource.get('@odata.id', None)
 
 
+def normalize_identity(identity):
+    """Return an identity without its trailing slash
+
+    :param identity: The @odata.id of a resource, or None
+    :returns: The identity comparable with the other normalized ones
+    """
+    return identity.rstrip('/') if identity else identity
+
+
 def int_or_none(x):
     """Given a value x it cast as int or None
 
@@ -31,3 +57,197 @@ def int_or_none(x):
     if x is None:
         return None
     return int(x)
+
+
+def _call_safely(func, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        LOG.debug('Concurrent call failed for %(item)s: %(error)s',
+                  {'item': item, 'error': e})
+        return None, e
+
+
+def iter_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """Apply func to every item using a bounded pool of threads
+
+    At most ``concurrency`` calls run at the same time and only a small
+    window of results is held in memory, so arbitrarily long inputs can be
+    processed. Results are yielded in the order of ``items``. An exception
+    raised by ``func`` doesn't abort the iteration, it is returned together
+    with the item instead.
+
+    :param func: A callable taking a single item
+    :param items: An iterable of items
+    :param concurrency: The maximum number of concurrent calls. A value
+        lower than 2 processes the items one by one in the calling thread.
+    :returns: A generator of ``(item, result, error)`` tuples where
+        ``error`` is the exception raised by ``func`` or None
+    """
+    if not concurrency or concurrency < 2:
+        for item in items:
+            result, error = _call_safely(func, item)
+            yield item, result, error
+        return
+
+    pending = collections.deque()
+    executor = futures.ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for item in items:
+            pending.append(
+                (item, executor.submit(_call_safely, func, item)))
+            if len(pending) >= concurrency * 2:
+                item, future = pending.popleft()
+                result, error = future.result()
+                yield item, result, error
+        while pending:
+            item, future = pending.popleft()
+            result, error = future.result()
+            yield item, result, error
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def map_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """Apply func to every item using a bounded pool of threads
+
+    :param func: A callable taking a single item
+    :param items: An iterable of items
+    :param concurrency: The maximum number of concurrent calls
+    :returns: A list of ``(item, result, error)`` tuples in the order of
+        ``items``, see :func:`iter_concurrently`
+    """
+    return list(iter_concurrently(func, items, concurrency))
+
+
+def crawl(func, items, description, concurrency=DEFAULT_CONCURRENCY):
+    """Load resources concurrently, leaving out the ones which fail
+
+    The failures are logged as warnings.
+
+    :param func: A callable taking a single item and loading its resource
+    :param items: An iterable of items
+    :param description: What the resources are loaded for, used in the
+        warnings, e.g. ``'the MAC table'``
+    :param concurrency: The maximum number of concurrent calls
+    :returns: A list of ``(item, result)`` tuples in the order of
+        ``items``, without the items which failed
+    """
+    loaded = []
+    for item, result, error in iter_concurrently(func, items, concurrency):
+        if error is not None:
+            LOG.warning('Leaving %(item)s out of %(description)s: '
+                        '%(error)s', {'item': item,
+                                      'description': description,
+                                      'error': error})
+        else:
+            loaded.append((item, result))
+    return loaded
+
+
+def write_json_atomically(path, data):
+    """Write data to a JSON file, replacing the file atomically
+
+    The data is written to a temporary file of the same directory which is
+    then renamed, so readers never see a partially written file.
+
+    :param path: The path of the file
+    :param data: The JSON serializable data
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, sort_keys=True)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def call_with_retry(func, retryable, retries=2, retry_interval=1):
+    """Call func, calling it again when it fails with a transient error
+
+    :param func: A callable taking no argument
+    :param retryable: A callable telling whether an exception raised by
+        ``func`` is transient
+    :param retries: The maximum number of times ``func`` is called again
+    :param retry_interval: The number of seconds to wait before the first
+        retry, doubled before each following one
+    :returns: The value returned by ``func``
+    :raises: The exception raised by the last call of ``func``
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not retryable(e):
+                raise
+            attempt += 1
+            LOG.debug('Retrying after %(error)s, attempt %(attempt)d of '
+                      '%(retries)d', {'error': e, 'attempt': attempt,
+                                      'retries': retries})
+            time.sleep(retry_interval * 2 ** (attempt - 1))
+
+
+def is_service_unavailable(error):
+    """Tell whether a request failed with 503 Service Unavailable
+
+    Only a 503 guarantees that the service didn't process the request, so
+    it is the only error a non idempotent request can be retried on.
+
+    :param error: The exception raised by the request
+    :returns: True if the service answered 503
+    """
+    if not isinstance(error, exceptions.ServerSideError):
+        return False
+    return error.status_code == 503
+
+
+class RateLimiter(object):
+    """A thread safe limiter spacing out calls evenly over time"""
+
+    def __init__(self, rate):
+        """A class representing a rate limiter
+
+        :param rate: The maximum number of calls per second, None or 0 to
+            not limit the calls
+        """
+        self._interval = 1.0 / rate if rate else 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next call is allowed"""
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class LazyModule(object):
+    """A proxy importing a module the first time one of its attributes is used
+
+    Attributes are always looked up on the module registered in
+    ``sys.modules``, so patching the real module is seen through the proxy.
+    """
+
+    def __init__(self, name):
+        """A class representing a lazily imported module
+
+        :param name: The absolute name of the module
+        """
+        self.__name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self.__name), attr)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self.__name
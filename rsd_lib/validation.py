@@ -0,0 +1,89 @@
+# Copyright 2018 Intel, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import json
+import threading
+
+from jsonschema import validators
+
+# Note: Validators compiled from the request schemas, keyed by the canonical
+# JSON dump of the schema so that the identical schemas declared by each API
+# version share a validator.
+_VALIDATORS = {}
+# Note: The validator of each schema dict, keyed by the id of the dict. The
+# schema itself is kept in the entry so that the id can't be reused by another
+# dict while the entry exists.
+_SCHEMAS = {}
+_LOCK = threading.Lock()
+
+_local = threading.local()
+
+
+def get_validator(schema):
+    """Return the validator compiled from a JSON schema
+
+    The schema is checked and compiled the first time it is seen, the same
+    validator is returned for every later call with the same or an equal
+    schema.
+
+    :param schema: The JSON schema dict
+    :returns: A jsonschema validator instance
+    :raises: SchemaError if the schema itself is invalid
+    """
+    entry = _SCHEMAS.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+
+    key = json.dumps(schema, sort_keys=True)
+    with _LOCK:
+        validator = _VALIDATORS.get(key)
+        if validator is None:
+            cls = validators.validator_for(schema)
+            cls.check_schema(schema)
+            validator = _VALIDATORS[key] = cls(schema)
+        _SCHEMAS[id(schema)] = (schema, validator)
+    return validator
+
+
+@contextlib.contextmanager
+def trusted():
+    """Skip request validation in the current thread
+
+    Meant for internal callers building requests from data which was
+    already validated, e.g. specs checked once before a bulk operation.
+    """
+    previous = getattr(_local, 'trusted', False)
+    _local.trusted = True
+    try:
+        yield
+    finally:
+        _local.trusted = previous
+
+
+def validate(instance, schema):
+    """Validate an instance against a JSON schema
+
+    This behaves like ``jsonschema.validate()`` but reuses the validator
+    compiled from ``schema``. Nothing is validated inside a ``trusted()``
+    block.
+
+    :param instance: The instance to validate
+    :param schema: The JSON schema dict
+    :raises: ValidationError if the instance is invalid
+    """
+    if getattr(_local, 'trusted', False):
+        return
+    get_validator(schema).validate(instance)